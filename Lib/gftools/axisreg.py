@@ -1,27 +1,118 @@
-from pkg_resources import resource_filename
 from gftools.axes_pb2 import AxisProto, FallbackProto
+from gftools.util import cache as disk_cache
+from gftools.util.resources import resource_path
 from google.protobuf import text_format
+from collections.abc import Mapping
 from glob import glob
+import marshal
 import os
 
 
 __all__ = ["axis_registry"]
 
 
+# Bump when the layout of the cached registry changes
+_CACHE_VERSION = 1
+
+
+def _parse_axis(proto_file):
+    axis = AxisProto()
+    with open(proto_file, "rb") as textproto:
+        text_format.Parse(textproto.read(), axis)
+    # Remove spaces from names
+    for fallback in axis.fallback:
+        fallback.name = fallback.name.replace(" ", "")
+    return axis
+
+
+def _load_cached_axes(cache_path, stamps):
+    try:
+        with open(cache_path, "rb") as cached:
+            version, cached_stamps, serialized = marshal.load(cached)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if (version, cached_stamps) != (_CACHE_VERSION, stamps):
+        return None
+    results = {}
+    for tag, data in serialized:
+        axis = AxisProto()
+        axis.ParseFromString(data)
+        results[tag] = axis
+    return results
+
+
 def AxisRegistry():
-    """Parse all axes in the Google Fonts axis registry"""
+    """Parse all axes in the Google Fonts axis registry.
+
+    The parsed axes are stored as binary protobufs in the gftools cache dir
+    and only parsed from the textproto files again when a file is added,
+    removed or modified."""
+    axis_reg_dir = resource_path("gftools", "axisregistry")
+    proto_files = sorted(glob(os.path.join(axis_reg_dir, "*.textproto")))
+    stamps = tuple((f, disk_cache.file_stamp(f)) for f in proto_files)
+
+    cache_dir = disk_cache.cache_dir("axisregistry")
+    cache_path = cache_dir and os.path.join(cache_dir, "axes.bin")
+    if cache_path:
+        results = _load_cached_axes(cache_path, stamps)
+        if results is not None:
+            return results
+
     results = {}
-    axis_reg_dir = resource_filename("gftools", "axisregistry")
-    proto_files = glob(os.path.join(axis_reg_dir, "*.textproto"))
     for proto_file in proto_files:
-        axis = AxisProto()
-        with open(proto_file, "rb") as textproto:
-            text_format.Parse(textproto.read(), axis)
-            results[axis.tag] = axis
-            # Remove spaces from names
-            for fallback in results[axis.tag].fallback:
-                fallback.name = fallback.name.replace(" ", "")
+        axis = _parse_axis(proto_file)
+        results[axis.tag] = axis
+    if cache_path:
+        serialized = tuple((tag, a.SerializeToString()) for tag, a in results.items())
+        disk_cache.write_atomic(
+            cache_path, marshal.dumps((_CACHE_VERSION, stamps, serialized))
+        )
     return results
 
 
-axis_registry = AxisRegistry()
+class _LazyAxisRegistry(Mapping):
+    """Read only {axis tag: AxisProto} mapping of the axis registry which is
+    only loaded once it is first used."""
+
+    def __init__(self, loader=AxisRegistry):
+        self._loader = loader
+        self._axes = None
+        self._fallbacks = None
+
+    def _load(self):
+        if self._axes is None:
+            self._axes = self._loader()
+        return self._axes
+
+    def __getitem__(self, tag):
+        return self._load()[tag]
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+    def __repr__(self):
+        if self._axes is None:
+            return "<axis registry (not loaded)>"
+        return f"<axis registry {sorted(self._axes)}>"
+
+    @property
+    def fallbacks_by_name(self):
+        """{fallback name: (axis tag, fallback value)}.
+
+        Some names are used by several axes, e.g "Normal" or "Roman". The
+        registered (lowercase) axes then win over custom (uppercase) ones
+        and ties are broken by tag, so "Roman" resolves to ital, not CRSV."""
+        if self._fallbacks is None:
+            fallbacks = {}
+            axes = self._load()
+            for axis_tag in sorted(axes, key=lambda t: (not t.islower(), t)):
+                for fallback in axes[axis_tag].fallback:
+                    fallbacks.setdefault(fallback.name, (axis_tag, fallback.value))
+            self._fallbacks = fallbacks
+        return self._fallbacks
+
+
+axis_registry = _LazyAxisRegistry()
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# Copyright 2020 The Google Font Tools Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Record the changes gftools.fix makes to fonts without saving them.
+
+A dry run fixes fonts in memory and compares the tables the fixes declare
+they write with the original tables. The differences are stored in a
+Changeset, which can be saved as JSON, reviewed, and later applied to the
+original fonts without running the fixes again.
+
+Each change is a dict:
+
+{"op": "set", "table": "OS/2", "attr": "fsType", "old": 8, "new": 0}
+{"op": "add_name", "record": [nameID, platformID, platEncID, langID, string]}
+{"op": "remove_name", "record": [nameID, platformID, platEncID, langID, string]}
+{"op": "add_table", "table": "gasp", "data": base64 of the compiled table}
+{"op": "replace_table", "table": "fvar", "data": base64 of the compiled table}
+{"op": "remove_table", "table": "MVAR"}
+
+Attributes of nested objects are dotted, e.g "panose.bProportion". Tables
+whose changes can't be described attribute by attribute, such as fvar
+instances, are replaced as a whole.
+"""
+import base64
+import json
+import os
+from collections import OrderedDict
+from fontTools.ttLib import newTable
+from gftools.fix import fix_family, open_font, save_font, tables_written
+from gftools.utils import NameIndex
+
+
+__all__ = [
+    "ChangesetConflict",
+    "Changeset",
+    "record_changes",
+    "apply_changes",
+    "dry_run_family",
+]
+
+
+class ChangesetConflict(Exception):
+    """Raised when a font no longer has the values a changeset expects."""
+
+
+_PLAIN_TYPES = (type(None), bool, int, float, str)
+
+
+class _Unrepresentable(Exception):
+    pass
+
+
+def _as_json(value):
+    if isinstance(value, (list, tuple)):
+        return [_as_json(v) for v in value]
+    return value
+
+
+def _is_plain(value):
+    if isinstance(value, _PLAIN_TYPES):
+        return True
+    if isinstance(value, (list, tuple)):
+        return all(_is_plain(v) for v in value)
+    return False
+
+
+def _diff_values(old, new, path, changes):
+    """Append (path, old, new) for every plain value which differs between
+    old and new. Raise _Unrepresentable if they differ in a way which
+    can't be described with plain values."""
+    if _is_plain(old) and _is_plain(new):
+        if old != new:
+            changes.append((path, old, new))
+        return
+    if (
+        type(old) is type(new)
+        and hasattr(old, "__dict__")
+        and not isinstance(old, (list, tuple, dict))
+    ):
+        old_attrs, new_attrs = vars(old), vars(new)
+        if set(old_attrs) != set(new_attrs):
+            raise _Unrepresentable(path)
+        for attr in sorted(old_attrs):
+            _diff_values(
+                old_attrs[attr], new_attrs[attr], f"{path}.{attr}", changes
+            )
+        return
+    if old != new:
+        raise _Unrepresentable(path)
+
+
+def _table_changes(tag, original, fixed):
+    changes = []
+    try:
+        old_attrs, new_attrs = vars(original[tag]), vars(fixed[tag])
+        if set(old_attrs) != set(new_attrs):
+            raise _Unrepresentable(tag)
+        for attr in sorted(old_attrs):
+            _diff_values(old_attrs[attr], new_attrs[attr], attr, changes)
+    except _Unrepresentable:
+        # e.g a fix replaced the table with an identical new one
+        if fixed.getTableData(tag) == original.reader[tag]:
+            return []
+        return [_table_data_change("replace_table", tag, fixed)]
+    return [
+        {"op": "set", "table": tag, "attr": path, "old": old, "new": new}
+        for path, old, new in changes
+    ]
+
+
+def _table_data_change(op, tag, ttFont):
+    data = ttFont.getTableData(tag)
+    return {"op": op, "table": tag, "data": base64.b64encode(data).decode("ascii")}
+
+
+def _name_records(ttFont):
+    return set(
+        (r.nameID, r.platformID, r.platEncID, r.langID, r.toUnicode())
+        for r in ttFont["name"].names
+    )
+
+
+def record_changes(original, fixed, tables):
+    """Return the changes which turn original into fixed.
+
+    Args:
+        original: TTFont instance of the unmodified font.
+        fixed: TTFont instance of the same font after fixes.
+        tables: tags of the tables which may have been modified, see
+            gftools.fix.tables_written. Added and removed tables are
+            always found.
+
+    Returns:
+        list of change dicts, see the module docstring.
+    """
+    changes = []
+    old_tags = set(original.keys()) - {"GlyphOrder"}
+    new_tags = set(fixed.keys()) - {"GlyphOrder"}
+    for tag in sorted(old_tags - new_tags):
+        changes.append({"op": "remove_table", "table": tag})
+    for tag in sorted(new_tags - old_tags):
+        changes.append(_table_data_change("add_table", tag, fixed))
+    for tag in sorted(set(tables) & old_tags & new_tags):
+        if not fixed.isLoaded(tag):
+            continue
+        if tag == "name":
+            old_names, new_names = _name_records(original), _name_records(fixed)
+            for record in sorted(old_names - new_names):
+                changes.append({"op": "remove_name", "record": list(record)})
+            for record in sorted(new_names - old_names):
+                changes.append({"op": "add_name", "record": list(record)})
+            continue
+        changes.extend(_table_changes(tag, original, fixed))
+    return changes
+
+
+def _resolve(table, path):
+    *parents, attr = path.split(".")
+    obj = table
+    for parent in parents:
+        obj = getattr(obj, parent)
+    return obj, attr
+
+
+def apply_changes(ttFont, changes):
+    """Apply changes made by record_changes to a font.
+
+    Returns:
+        set of the tags of the tables which were written.
+
+    Raises:
+        ChangesetConflict: if the font doesn't have the old value of a
+            change, e.g because it was modified after the dry run.
+    """
+    written = set()
+    names = None
+    for change in changes:
+        op = change["op"]
+        if op == "set":
+            obj, attr = _resolve(ttFont[change["table"]], change["attr"])
+            current = _as_json(getattr(obj, attr))
+            if current != change["old"]:
+                raise ChangesetConflict(
+                    f"{change['table']}.{change['attr']} is {current!r}, "
+                    f"expected {change['old']!r}"
+                )
+            new = change["new"]
+            if isinstance(getattr(obj, attr), tuple):
+                new = tuple(new)
+            setattr(obj, attr, new)
+            written.add(change["table"])
+        elif op in ("add_name", "remove_name"):
+            if names is None:
+                names = NameIndex(ttFont)
+            nameID, platformID, platEncID, langID, string = change["record"]
+            key = (nameID, platformID, platEncID, langID)
+            if op == "remove_name":
+                if names.get_string(*key) != string:
+                    raise ChangesetConflict(f"name record {key} is not {string!r}")
+                names.remove(*key)
+            else:
+                names.set(string, *key)
+            written.add("name")
+        elif op in ("add_table", "replace_table"):
+            tag = change["table"]
+            table = newTable(tag)
+            table.decompile(base64.b64decode(change["data"]), ttFont)
+            ttFont[tag] = table
+            written.add(tag)
+        elif op == "remove_table":
+            if change["table"] not in ttFont:
+                raise ChangesetConflict(f"font has no {change['table']} table")
+            del ttFont[change["table"]]
+        else:
+            raise ValueError(f"Unknown change {op}")
+    if names is not None:
+        names.commit()
+    return written
+
+
+class Changeset:
+    """Changes to a collection of fonts, keyed by font path.
+
+    Attributes:
+        fonts: OrderedDict of {font path: list of change dicts}
+    """
+
+    def __init__(self, fonts=None):
+        self.fonts = OrderedDict(fonts or {})
+
+    def __len__(self):
+        return sum(len(changes) for changes in self.fonts.values())
+
+    def update(self, other):
+        self.fonts.update(other.fonts)
+
+    def to_json(self):
+        return json.dumps({"fonts": self.fonts}, indent=2)
+
+    @classmethod
+    def from_json(cls, string):
+        return cls(json.loads(string, object_pairs_hook=OrderedDict)["fonts"])
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as doc:
+            doc.write(self.to_json())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as doc:
+            return cls.from_json(doc.read())
+
+    def apply(self, inplace=False, out=None, root=None):
+        """Apply the changes to the fonts and save them.
+
+        Args:
+            inplace: overwrite the fonts.
+            out: save the fonts to this dir instead, at their paths relative
+                to root. If neither inplace nor out is given, fonts are
+                saved next to the originals with a .fix suffix.
+            root: dir the fonts are kept relative to under out. Defaults to
+                the deepest dir holding all their family dirs, like
+                gftools.fixbatch.families_root, so fonts with the same name
+                in different families don't overwrite each other.
+
+        Returns:
+            list of the saved paths.
+        """
+        paths = [path for path, changes in self.fonts.items() if changes]
+        if out and paths and root is None:
+            root = os.path.commonpath(
+                [os.path.dirname(os.path.dirname(os.path.abspath(p))) for p in paths]
+            )
+        saved = []
+        for path in paths:
+            ttFont = open_font(path)
+            written = apply_changes(ttFont, self.fonts[path])
+            if inplace:
+                out_path = path
+            elif out:
+                out_path = os.path.join(
+                    out, os.path.relpath(os.path.abspath(path), root)
+                )
+                os.makedirs(os.path.dirname(out_path), exist_ok=True)
+            else:
+                out_path = path + ".fix"
+            save_font(ttFont, out_path, written)
+            saved.append(out_path)
+        return saved
+
+
+def dry_run_family(paths, include_source_fixes=False):
+    """Run fix_family on fonts in memory and return the changes it makes.
+
+    Args:
+        paths: paths of the fonts in the family.
+        include_source_fixes: passed to fix_family.
+
+    Returns:
+        Changeset
+    """
+    fonts = [open_font(p) for p in paths]
+    fix_family(fonts, include_source_fixes)
+    tables = tables_written([fix_family])
+    changeset = Changeset()
+    for path, fixed in zip(paths, fonts):
+        changeset.fonts[path] = record_changes(open_font(path), fixed, tables)
+    return changeset
@@ -21,12 +21,17 @@ from gftools.utils import (
     typo_metrics_enabled,
     validate_family,
     unique_name,
+    NameIndex,
 )
 from gftools.util.styles import (get_stylename, is_regular, is_bold, is_italic)
 
+from collections import OrderedDict, namedtuple
+from io import BytesIO
 from os.path import basename
 from copy import deepcopy
+import heapq
 import logging
+import time
 
 
 log = logging.getLogger(__name__)
@@ -53,8 +58,21 @@ __all__ = [
     "fix_isFixedPitch",
     "drop_mac_names",
     "drop_superfluous_mac_names",
+    "fix_os2_version",
     "fix_font",
     "fix_family",
+    "Fix",
+    "FixResult",
+    "FIX_REGISTRY",
+    "FONT_FIXES",
+    "SOURCE_FIXES",
+    "register_fix",
+    "order_fixes",
+    "run_fixes",
+    "fix_tables",
+    "tables_written",
+    "open_font",
+    "save_font",
 ]
 
 
@@ -82,6 +100,73 @@ UNWANTED_TABLES = frozenset(
 )
 
 
+def fix_tables(reads=(), writes=()):
+    """Decorator which declares the tables a fix reads and writes.
+
+    Fonts are opened lazily, so a table is only decompiled if a fix reads
+    it. save_font uses the declarations to copy the tables which no fix
+    writes straight from the original file instead of compiling them again.
+    Removing a table doesn't need to be declared.
+
+    Args:
+        reads: tags of the tables the fix reads but doesn't modify.
+        writes: tags of the tables the fix may modify or add.
+    """
+    def decorator(fix):
+        fix.reads = frozenset(reads)
+        fix.writes = frozenset(writes)
+        return fix
+    return decorator
+
+
+def tables_written(fixes):
+    """Return the tables the fixes may write, or None if any of the fixes
+    doesn't declare them with fix_tables."""
+    written = set()
+    for fix in fixes:
+        writes = getattr(fix, "writes", None)
+        if writes is None:
+            return None
+        written |= writes
+    return frozenset(written)
+
+
+def open_font(path):
+    """Open a font for fixing. Tables are only read from the file once they
+    are accessed."""
+    return TTFont(path, lazy=True)
+
+
+def save_font(ttFont, path, written=None):
+    """Save a font, copying the tables which weren't written byte for byte
+    from the original file.
+
+    fontTools compiles every table which has been loaded when it saves a
+    font. Tables which were only read are dropped from the loaded tables
+    first so they are written from the original data. This also stops a
+    read of hmtx, which loads maxp, from recalculating maxp from every
+    glyph in glyf.
+
+    Args:
+        ttFont: a TTFont instance
+        path: output path, may be the path the font was read from.
+        written: tags of the tables which may have been modified, see
+            tables_written. If None, all loaded tables are compiled.
+    """
+    if written is not None and ttFont.reader is not None:
+        for tag in list(ttFont.tables):
+            if tag in written or tag not in ttFont.reader:
+                continue
+            del ttFont.tables[tag]
+    # A lazy font cannot be saved to the file it reads from, so save it to
+    # memory first
+    buf = BytesIO()
+    ttFont.save(buf)
+    with open(path, "wb") as doc:
+        doc.write(buf.getvalue())
+
+
+@fix_tables()
 def remove_tables(ttFont, tables=None):
     """Remove unwanted tables from a font. The unwanted tables must belong
     to the UNWANTED_TABLES set.
@@ -108,12 +193,14 @@ def remove_tables(ttFont, tables=None):
 
     tables_to_remove = UNWANTED_TABLES & font_tables & tables_to_remove
     if not tables_to_remove:
-        return
+        return False
     log.info(f"Removing tables '{list(tables_to_remove)}' from font")
     for tbl in tables_to_remove:
         del ttFont[tbl]
+    return True
 
 
+@fix_tables(writes=["DSIG"])
 def add_dummy_dsig(ttFont):
     """Add a dummy dsig table to a font. Older versions of MS Word
     require this table.
@@ -127,8 +214,16 @@ def add_dummy_dsig(ttFont):
     newDSIG.usNumSigs = 0
     newDSIG.signatureRecords = []
     ttFont.tables["DSIG"] = newDSIG
+    return True
+
+
+UNHINTED_GASP_RANGE = {0xFFFF: 15}
+UNHINTED_PREP_ASSEMBLY = [
+    "PUSHW[]", "511", "SCANCTRL[]", "PUSHB[]", "4", "SCANTYPE[]"
+]
 
 
+@fix_tables(writes=["gasp", "prep"])
 def fix_unhinted_font(ttFont):
     """Improve the appearance of an unhinted font on Win platforms by:
         - Add a new GASP table with a newtable that has a single
@@ -140,19 +235,20 @@ def fix_unhinted_font(ttFont):
     """
     gasp = newTable("gasp")
     # Set GASP so all sizes are smooth
-    gasp.gaspRange = {0xFFFF: 15}
+    gasp.gaspRange = dict(UNHINTED_GASP_RANGE)
 
     program = ttProgram.Program()
-    assembly = ["PUSHW[]", "511", "SCANCTRL[]", "PUSHB[]", "4", "SCANTYPE[]"]
-    program.fromAssembly(assembly)
+    program.fromAssembly(UNHINTED_PREP_ASSEMBLY)
 
     prep = newTable("prep")
     prep.program = program
 
     ttFont["gasp"] = gasp
     ttFont["prep"] = prep
+    return True
 
 
+@fix_tables(writes=["head"])
 def fix_hinted_font(ttFont):
     """Improve the appearance of a hinted font on Win platforms by enabling
     the head table's flag 3.
@@ -167,6 +263,7 @@ def fix_hinted_font(ttFont):
     return ttFont["head"].flags != old
 
 
+@fix_tables(writes=["OS/2"])
 def fix_fs_type(ttFont):
     """Set the OS/2 table's fsType flag to 0 (Installable embedding).
 
@@ -178,16 +275,18 @@ def fix_fs_type(ttFont):
     return old != 0
 
 
-def fix_weight_class(ttFont):
+@fix_tables(reads=["name"], writes=["OS/2"])
+def fix_weight_class(ttFont, stylename=None):
     """Set the OS/2 table's usWeightClass so it conforms to GF's supported
     styles table:
     https://github.com/googlefonts/gf-docs/tree/master/Spec#supported-styles
 
     Args:
         ttFont: a TTFont instance
+        stylename: the font's stylename, read from the name table if omitted
     """
     old_weight_class = ttFont["OS/2"].usWeightClass
-    stylename = font_stylename(ttFont)
+    stylename = stylename or font_stylename(ttFont)
     tokens = stylename.split()
     # Order WEIGHT_NAMES so longest names are first
     for style in sorted(WEIGHT_NAMES, key=lambda k: len(k), reverse=True):
@@ -205,15 +304,17 @@ def fix_weight_class(ttFont):
     )
 
 
-def fix_fs_selection(ttFont):
+@fix_tables(reads=["name"], writes=["OS/2"])
+def fix_fs_selection(ttFont, stylename=None):
     """Fix the OS/2 table's fsSelection so it conforms to GF's supported
     styles table:
     https://github.com/googlefonts/gf-docs/tree/master/Spec#supported-styles
 
     Args:
         ttFont: a TTFont instance
+        stylename: the font's stylename, read from the name table if omitted
     """
-    stylename = font_stylename(ttFont)
+    stylename = stylename or font_stylename(ttFont)
     tokens = set(stylename.split())
     old_selection = fs_selection = ttFont["OS/2"].fsSelection
 
@@ -231,31 +332,37 @@ def fix_fs_selection(ttFont):
     return old_selection != fs_selection
 
 
-def fix_mac_style(ttFont):
+@fix_tables(reads=["name"], writes=["head"])
+def fix_mac_style(ttFont, stylename=None):
     """Fix the head table's macStyle so it conforms to GF's supported
     styles table:
     https://github.com/googlefonts/gf-docs/tree/master/Spec#supported-styles
 
     Args:
         ttFont: a TTFont instance
+        stylename: the font's stylename, read from the name table if omitted
     """
-    stylename = font_stylename(ttFont)
+    stylename = stylename or font_stylename(ttFont)
     tokens = set(stylename.split())
     mac_style = 0
     if "Italic" in tokens:
         mac_style |= 1 << 1
     if "Bold" in tokens:
         mac_style |= 1 << 0
+    old_mac_style = ttFont["head"].macStyle
     ttFont["head"].macStyle = mac_style
+    return old_mac_style != mac_style
 
 
-def fix_fvar_instances(ttFont):
+@fix_tables(writes=["fvar", "name"])
+def fix_fvar_instances(ttFont, stylename=None):
     """Replace a variable font's fvar instances with a set of new instances
     that conform to the Google Fonts instance spec:
     https://github.com/googlefonts/gf-docs/tree/master/Spec#fvar-instances
 
     Args:
         ttFont: a TTFont instance
+        stylename: the font's stylename, read from the name table if omitted
     """
     if "fvar" not in ttFont:
         raise ValueError("ttFont is not a variable font")
@@ -263,7 +370,7 @@ def fix_fvar_instances(ttFont):
     fvar = ttFont["fvar"]
     default_axis_vals = {a.axisTag: a.defaultValue for a in fvar.axes}
 
-    stylename = font_stylename(ttFont)
+    stylename = stylename or font_stylename(ttFont)
     is_italic = "Italic" in stylename
     is_roman_and_italic = any(a for a in ("slnt", "ital") if a in default_axis_vals)
 
@@ -301,8 +408,10 @@ def fix_fvar_instances(ttFont):
     else:
         instances += gen_instances(is_italic=False)
     fvar.instances = instances
+    return True
 
 
+@fix_tables(reads=["head", "OS/2"], writes=["name"])
 def update_nametable(ttFont, family_name=None, style_name=None):
     """Update a static font's name table. The updated name table will conform
     to the Google Fonts support styles table:
@@ -331,38 +440,33 @@ def update_nametable(ttFont, family_name=None, style_name=None):
     """
     if "fvar" in ttFont:
         raise ValueError("Cannot update the nametable for a variable font")
-    nametable = ttFont["name"]
+    names = NameIndex(ttFont)
 
     # Remove nametable records which are not Win US English
     # TODO this is too greedy. We should preserve multilingual
     # names in the future. Please note, this has always been an issue.
-    platforms = set()
-    for rec in nametable.names:
-        platforms.add((rec.platformID, rec.platEncID, rec.langID))
-    platforms_to_remove = platforms ^ set([(3, 1, 0x409)])
+    platforms_to_remove = names.platforms() ^ set([NameIndex.WIN_ENGLISH])
     if platforms_to_remove:
         log.warning(
             f"Removing records which are not Win US English, {list(platforms_to_remove)}"
         )
         for platformID, platEncID, langID in platforms_to_remove:
-            nametable.removeNames(
-                platformID=platformID, platEncID=platEncID, langID=langID
-            )
+            names.remove(platformID=platformID, platEncID=platEncID, langID=langID)
 
     # Remove any name records which contain linebreaks
-    contains_linebreaks = []
-    for r in nametable.names:
-        for char in ("\n", "\r"):
-            if char in r.toUnicode():
-                contains_linebreaks.append(r.nameID)
-    for nameID in contains_linebreaks:
-        nametable.removeNames(nameID)
+    names.remove_where(lambda key, string: "\n" in string or "\r" in string)
+
+    current_family_name = names.get_string(16) or names.get_string(1)
+    if not current_family_name:
+        raise ValueError("Cannot find record with nameID 16 or 1")
 
     if not family_name:
-        family_name = font_familyname(ttFont)
+        family_name = current_family_name
 
     if not style_name:
-        style_name = font_stylename(ttFont)
+        style_name = names.get_string(17) or names.get_string(2)
+        if not style_name:
+            raise ValueError("Cannot find record with nameID 17 or 2")
 
     is_ribbi = style_name in ("Regular", "Bold", "Italic", "Bold Italic")
 
@@ -389,49 +493,52 @@ def update_nametable(ttFont, family_name=None, style_name=None):
     # create NameIDs 3, 4, 6
     nameids[4] = f"{family_name} {style_name}"
     nameids[6] = f"{family_name.replace(' ', '')}-{style_name.replace(' ', '')}"
-    nameids[3] = unique_name(ttFont, nameids)
+    nameids[3] = unique_name(ttFont, nameids, names=names)
 
     # Pass through all records and replace occurences of the old family name
     # with the new family name
-    current_family_name = font_familyname(ttFont)
-    for record in nametable.names:
-        string = record.toUnicode()
-        if current_family_name in string:
-            nametable.setName(
-                string.replace(current_family_name, family_name),
-                record.nameID,
-                record.platformID,
-                record.platEncID,
-                record.langID,
-            )
+    names.replace(current_family_name, family_name)
 
     # Remove previous typographic names
-    for nameID in (16, 17):
-        nametable.removeNames(nameID=nameID)
+    names.remove_where(lambda key, _: key[0] in (16, 17))
 
     # Update nametable with new names
     for nameID, string in nameids.items():
-        nametable.setName(string, nameID, 3, 1, 0x409)
+        names.set(string, nameID, *NameIndex.WIN_ENGLISH)
+    names.commit()
 
 
-def fix_nametable(ttFont):
+@fix_tables(reads=["head", "OS/2"], writes=["name"])
+def fix_nametable(ttFont, familyname=None, stylename=None):
     """Fix a static font's name table so it conforms to the Google Fonts
     supported styles table:
     https://github.com/googlefonts/gf-docs/tree/master/Spec#supported-styles
 
     Args:
         ttFont: a TTFont instance
+        familyname: the font's familyname, read from the name table if omitted
+        stylename: the font's stylename, read from the name table if omitted
     """
     if "fvar" in ttFont:
         # TODO, regen the nametable so it reflects the default fvar axes
         # coordinates. Implement once https://github.com/fonttools/fonttools/pull/2078
         # is merged.
-        return
-    family_name = font_familyname(ttFont)
-    style_name = font_stylename(ttFont)
+        return False
+    family_name = familyname or font_familyname(ttFont)
+    style_name = stylename or font_stylename(ttFont)
+    old_names = _name_records(ttFont)
     update_nametable(ttFont, family_name, style_name)
+    return _name_records(ttFont) != old_names
+
+
+def _name_records(ttFont):
+    return sorted(
+        (r.nameID, r.platformID, r.platEncID, r.langID, r.toUnicode())
+        for r in ttFont["name"].names
+    )
 
 
+@fix_tables(reads=["name"], writes=["OS/2", "hhea"])
 def inherit_vertical_metrics(ttFonts, family_name=None):
     """Inherit the vertical metrics from the same family which is
     hosted on Google Fonts.
@@ -461,6 +568,7 @@ def inherit_vertical_metrics(ttFonts, family_name=None):
             font["OS/2"].fsSelection |= 1 << 7
 
 
+@fix_tables(reads=["name", "head"], writes=["OS/2", "hhea"])
 def fix_vertical_metrics(ttFonts):
     """Fix a family's vertical metrics based on:
     https://github.com/googlefonts/gf-docs/tree/master/VerticalMetrics
@@ -511,21 +619,26 @@ def copy_vertical_metrics(src_font, dst_font):
         setattr(dst_font[table], key, val)
 
 
-def fix_italic_angle(ttFont):
-    style_name = font_stylename(ttFont)
+@fix_tables(reads=["name"], writes=["post"])
+def fix_italic_angle(ttFont, stylename=None):
+    style_name = stylename or font_stylename(ttFont)
     if "Italic" not in style_name and ttFont["post"].italicAngle != 0:
         ttFont["post"].italicAngle = 0
+        return True
     # TODO (Marc F) implement for italic fonts
+    return False
 
 
+@fix_tables(writes=["name"])
 def fix_ascii_fontmetadata(font):
     """Fixes TTF 'name' table strings to be ascii only"""
-    for name in font['name'].names:
-        title = name.string.decode(name.getEncoding())
-        title = normalize_unicode_marks(title)
-        name.string = title.encode(name.getEncoding())
+    names = NameIndex(font)
+    changed = names.rewrite(lambda key, string: normalize_unicode_marks(string))
+    names.commit()
+    return bool(changed)
 
 
+@fix_tables(writes=["cmap"])
 def convert_cmap_subtables_to_v4(font):
   """Converts all cmap subtables to format 4.
 
@@ -547,15 +660,18 @@ def convert_cmap_subtables_to_v4(font):
   return converted
 
 
+@fix_tables(writes=["cmap"])
 def drop_nonpid0_cmap(font, report=True):
   keep, drop = partition_cmap(font, lambda table: table.platformID == 0, report)
   return drop
 
 
+@fix_tables(writes=["cmap"])
 def drop_mac_cmap(font, report=True):
   keep, drop = partition_cmap(font, lambda table: table.platformID != 1 or table.platEncID != 0, report)
   return drop
 
+@fix_tables(reads=["post"], writes=["cmap"])
 def fix_pua(font):
     unencoded_glyphs = get_unencoded_glyphs(font)
     if not unencoded_glyphs:
@@ -591,6 +707,7 @@ def fix_pua(font):
     return True
 
 
+@fix_tables(reads=["hmtx"], writes=["post", "OS/2", "hhea"])
 def fix_isFixedPitch(ttfont):
 
     same_width = set()
@@ -660,6 +777,7 @@ def fix_isFixedPitch(ttfont):
     return changed, messages
 
 
+@fix_tables(writes=["name"])
 def drop_superfluous_mac_names(ttfont):
     """Drop superfluous Mac nameIDs.
 
@@ -682,67 +800,306 @@ def drop_superfluous_mac_names(ttfont):
     such as Word 2011. IDs 1-6 are very common, > 16 are edge cases.
 
     https://www.microsoft.com/typography/otspec/name.htm"""
-    keep_ids = [1, 2, 3, 4, 5, 6, 16, 17, 18, 20, 21, 22, 25]
-    changed = False
-    for n in range(255):
-        if n not in keep_ids:
-            name = ttfont['name'].getName(n, 1, 0, 0)
-            if name:
-                changed = True
-                ttfont['name'].names.remove(name)
-    return changed
+    keep_ids = frozenset([1, 2, 3, 4, 5, 6, 16, 17, 18, 20, 21, 22, 25])
+    names = NameIndex(ttfont)
+    changed = names.remove_where(
+        lambda key, _: key[1:] == NameIndex.MAC_ROMAN and key[0] not in keep_ids
+    )
+    names.commit()
+    return bool(changed)
 
 
+@fix_tables(writes=["name"])
 def drop_mac_names(ttfont):
     """Drop all mac names"""
-    changed = False
-    for n in range(255):
-        name = ttfont['name'].getName(n, 1, 0, 0)
-        if name:
-            ttfont['name'].names.remove(name)
-            changed = True
-    return changed
+    names = NameIndex(ttfont)
+    changed = names.remove(platformID=1, platEncID=0, langID=0)
+    names.commit()
+    return bool(changed)
 
 
-def fix_font(font, include_source_fixes=False):
-    font["OS/2"].version = 4
-    if "DSIG" not in font:
-        add_dummy_dsig(font)
+@fix_tables(writes=["OS/2"])
+def fix_os2_version(ttFont):
+    """Set the OS/2 table's version to 4.
 
-    if "fpgm" in font:
-        fix_hinted_font(font)
-    else:
-        fix_unhinted_font(font)
+    Args:
+        ttFont: a TTFont instance
+    """
+    old = ttFont["OS/2"].version
+    ttFont["OS/2"].version = 4
+    return old != 4
+
+
+# Values derived from a font which several fixes need. Each is computed once
+# per font and recomputed only after a fix writes one of its tables.
+# {name: (function, tables it is derived from)}
+DERIVED_VALUES = {
+    "stylename": (font_stylename, frozenset(["name"])),
+    "familyname": (font_familyname, frozenset(["name"])),
+}
+
+
+class Fix:
+    """A fix in the fix registry.
+
+    Args:
+        func: the fix function, declared with fix_tables. It takes a TTFont,
+            the values named in inputs as keyword arguments, and returns
+            True if it changed the font, or (changed, messages).
+        name: unique name of the fix, defaults to the function name.
+        inputs: names of DERIVED_VALUES the fix takes.
+        applies: optional predicate, the fix only runs on fonts for which
+            applies(ttFont) is True.
+        conformant: optional predicate, the fix is skipped for fonts for
+            which conformant(ttFont) is True.
+        kwargs: extra keyword arguments for func.
+    """
+
+    def __init__(self, func, name=None, inputs=(), applies=None,
+                 conformant=None, kwargs=None):
+        self.func = func
+        self.name = name or func.__name__
+        self.inputs = tuple(inputs)
+        self.applies = applies
+        self.conformant = conformant
+        self.kwargs = kwargs or {}
+        self.reads = frozenset(func.reads).union(
+            *(DERIVED_VALUES[i][1] for i in self.inputs)
+        )
+        self.writes = frozenset(func.writes)
+
+    def __repr__(self):
+        return f"<Fix {self.name}>"
+
+
+FixResult = namedtuple(
+    "FixResult",
+    [
+        "name",     # name of the fix
+        "changed",  # True if the fix changed the font
+        "skipped",  # None, or why the fix didn't run
+        "seconds",  # time taken
+        "messages", # list of messages from the fix
+    ]
+)
+
+
+FIX_REGISTRY = OrderedDict()
+
+
+def register_fix(fix):
+    """Add a Fix to FIX_REGISTRY. When fixes depend on each other in both
+    directions, the fix registered first runs first."""
+    if fix.name in FIX_REGISTRY:
+        raise ValueError(f"A fix named '{fix.name}' is already registered")
+    FIX_REGISTRY[fix.name] = fix
+    return fix
 
-    if "fvar" in font:
-        remove_tables(font, ["MVAR"])
 
+def _is_hinted(ttFont):
+    return "fpgm" in ttFont
+
+
+def _has_unhinted_gasp_prep(ttFont):
+    if "gasp" not in ttFont or "prep" not in ttFont:
+        return False
+    if ttFont["gasp"].gaspRange != UNHINTED_GASP_RANGE:
+        return False
+    program = ttProgram.Program()
+    program.fromAssembly(UNHINTED_PREP_ASSEMBLY)
+    return ttFont["prep"].program.getBytecode() == program.getBytecode()
+
+
+def _is_variable(ttFont):
+    return "fvar" in ttFont
+
+
+for _fix in [
+    Fix(fix_os2_version, conformant=lambda f: f["OS/2"].version == 4),
+    Fix(add_dummy_dsig, applies=lambda f: "DSIG" not in f),
+    Fix(fix_hinted_font, applies=_is_hinted,
+        conformant=lambda f: f["head"].flags & (1 << 3)),
+    Fix(fix_unhinted_font, applies=lambda f: not _is_hinted(f),
+        conformant=_has_unhinted_gasp_prep),
+    Fix(remove_tables, name="remove_mvar", applies=_is_variable,
+        conformant=lambda f: "MVAR" not in f, kwargs={"tables": ["MVAR"]}),
+    # source fixes
+    Fix(remove_tables,
+        conformant=lambda f: not UNWANTED_TABLES & frozenset(f.keys())),
+    Fix(fix_nametable, inputs=["familyname", "stylename"],
+        applies=lambda f: not _is_variable(f)),
+    Fix(fix_fs_type, conformant=lambda f: f["OS/2"].fsType == 0),
+    Fix(fix_fs_selection, inputs=["stylename"]),
+    Fix(fix_mac_style, inputs=["stylename"]),
+    Fix(fix_weight_class, inputs=["stylename"]),
+    Fix(fix_italic_angle, inputs=["stylename"],
+        conformant=lambda f: f["post"].italicAngle == 0),
+    Fix(fix_fvar_instances, inputs=["stylename"], applies=_is_variable),
+]:
+    register_fix(_fix)
+del _fix
+
+
+FONT_FIXES = [
+    "fix_os2_version",
+    "add_dummy_dsig",
+    "fix_hinted_font",
+    "fix_unhinted_font",
+    "remove_mvar",
+]
+SOURCE_FIXES = [
+    "remove_tables",
+    "fix_nametable",
+    "fix_fs_type",
+    "fix_fs_selection",
+    "fix_mac_style",
+    "fix_weight_class",
+    "fix_italic_angle",
+    "fix_fvar_instances",
+]
+
+
+def order_fixes(names):
+    """Return the registered fixes in the order they must run.
+
+    A fix which writes a table another fix reads runs first. Fixes which
+    don't depend on each other, or depend on each other in both directions,
+    run in registration order."""
+    fixes = [FIX_REGISTRY[n] for n in OrderedDict.fromkeys(names)]
+    index = {fix.name: i for i, fix in enumerate(FIX_REGISTRY.values())}
+    fixes.sort(key=lambda fix: index[fix.name])
+
+    depends_on = {fix.name: set() for fix in fixes}
+    for a in fixes:
+        for b in fixes:
+            if a is b or not a.writes & b.reads:
+                continue
+            if b.writes & a.reads and index[b.name] < index[a.name]:
+                continue
+            depends_on[b.name].add(a.name)
+
+    ordered = []
+    ready = [(index[n], n) for n, deps in depends_on.items() if not deps]
+    heapq.heapify(ready)
+    while ready:
+        _, name = heapq.heappop(ready)
+        ordered.append(FIX_REGISTRY[name])
+        for other, deps in depends_on.items():
+            if name in deps:
+                deps.remove(name)
+                if not deps:
+                    heapq.heappush(ready, (index[other], other))
+    if len(ordered) != len(fixes):
+        raise ValueError("Fixes have cyclic dependencies")
+    return ordered
+
+
+class _DerivedValues:
+    """Lazily computed DERIVED_VALUES for a font."""
+
+    def __init__(self, ttFont):
+        self.ttFont = ttFont
+        self._values = {}
+
+    def __getitem__(self, name):
+        if name not in self._values:
+            func, _ = DERIVED_VALUES[name]
+            self._values[name] = func(self.ttFont)
+        return self._values[name]
+
+    def invalidate(self, tables):
+        for name in list(self._values):
+            if DERIVED_VALUES[name][1] & tables:
+                del self._values[name]
+
+
+def run_fixes(ttFont, names):
+    """Run registered fixes on a font.
+
+    Args:
+        ttFont: a TTFont instance
+        names: names of the fixes in FIX_REGISTRY to run. They are run in
+            the order given by order_fixes.
+
+    Returns:
+        list of FixResult, in the order the fixes ran.
+    """
+    derived = _DerivedValues(ttFont)
+    results = []
+    for fix in order_fixes(names):
+        start = time.perf_counter()
+        messages = []
+        changed = False
+        if fix.applies and not fix.applies(ttFont):
+            skipped = "not applicable"
+        elif fix.conformant and fix.conformant(ttFont):
+            skipped = "conformant"
+        else:
+            skipped = None
+            kwargs = dict(fix.kwargs)
+            kwargs.update((i, derived[i]) for i in fix.inputs)
+            rv = fix.func(ttFont, **kwargs)
+            if isinstance(rv, tuple) and len(rv) == 2:
+                changed, messages = rv
+            else:
+                changed = rv
+            changed = bool(changed)
+            if changed:
+                derived.invalidate(fix.writes)
+        results.append(
+            FixResult(fix.name, changed, skipped, time.perf_counter() - start, messages)
+        )
+    return results
+
+
+def _fix_tables(names, key):
+    return frozenset().union(*(getattr(FIX_REGISTRY[n], key) for n in names))
+
+
+@fix_tables(
+    reads=_fix_tables(FONT_FIXES + SOURCE_FIXES, "reads"),
+    writes=_fix_tables(FONT_FIXES + SOURCE_FIXES, "writes"),
+)
+def fix_font(font, include_source_fixes=False):
+    """Fix a font so it conforms to the Google Fonts specification.
+
+    Args:
+        font: a TTFont instance
+        include_source_fixes: also run SOURCE_FIXES, which fix issues that
+            should be fixed in the source files.
+
+    Returns:
+        list of FixResult
+    """
+    fixes = list(FONT_FIXES)
     if include_source_fixes:
         log.warning(
             "include-source-fixes is enabled. Please consider fixing the "
             "source files instead."
         )
-        remove_tables(font)
-        fix_nametable(font)
-        fix_fs_type(font)
-        fix_fs_selection(font)
-        fix_mac_style(font)
-        fix_weight_class(font)
-        fix_italic_angle(font)
-
-        if "fvar" in font:
-            fix_fvar_instances(font)
-            # TODO (Marc F) add gen-stat once merged
-            # https://github.com/googlefonts/gftools/pull/263
+        fixes += SOURCE_FIXES
+        # TODO (Marc F) add gen-stat once merged
+        # https://github.com/googlefonts/gftools/pull/263
+    return run_fixes(font, fixes)
 
 
+@fix_tables(
+    reads=fix_font.reads | {"head"},
+    writes=fix_font.writes | {"hhea"},
+)
 def fix_family(fonts, include_source_fixes=False):
-    """Fix all fonts in a family"""
+    """Fix all fonts in a family
+
+    Returns:
+        list with the list of FixResult of each font
+    """
     validate_family(fonts)
     family_name = font_familyname(fonts[0])
 
-    for font in fonts:
+    results = [
         fix_font(font, include_source_fixes=include_source_fixes)
+        for font in fonts
+    ]
 
     if include_source_fixes:
         try:
@@ -759,11 +1116,12 @@ def fix_family(fonts, include_source_fixes=False):
                 "fix fonts. See Repo readme to add keys."
             )
         fix_vertical_metrics(fonts)
+    return results
 
 
 class FontFixer():
     def __init__(self, path, report=True, verbose=False, **kwargs):
-        self.font = TTFont(path)
+        self.font = open_font(path)
         self.path = path
         self.font_filename = basename(path)
         self.saveit = False
@@ -781,13 +1139,16 @@ class FontFixer():
         if self.saveit:
             if self.verbose:
                 print('Saving %s to %s.fix' % (self.font_filename, self.path))
-            self.font.save(self.path + ".fix")
+            save_font(self.font, self.path + ".fix", self.tables_written())
         elif self.verbose:
             print('There were no changes needed on %s!' % self.font_filename)
 
     def show(self):
         pass
 
+    def tables_written(self):
+        return tables_written(self.fixes)
+
     def fix(self):
         for f in self.fixes:
             rv = f(self.font)
@@ -802,6 +1163,9 @@ class FontFixer():
 
 class GaspFixer(FontFixer):
 
+    def tables_written(self):
+        return frozenset(["gasp"])
+
     def fix(self, value=15):
         try:
             table = self.font.get('gasp')
@@ -810,7 +1174,7 @@ class GaspFixer(FontFixer):
         except:
             print(('ER: {}: no table gasp... '
                   'Creating new table. ').format(self.path))
-            table = ttLib.newTable('gasp')
+            table = newTable('gasp')
             table.gaspRange = {65535: value}
             self.font['gasp'] = table
             self.saveit = True
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# Copyright 2020 The Google Font Tools Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Run gftools.fix.fix_family over many families in parallel.
+
+A family is a directory holding font files, e.g a family dir in the
+google/fonts repo. Each family is fixed in a worker process, so a family
+which fails or takes long doesn't hold up or break the others.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import logging
+import os
+import time
+from fontTools.ttLib import TTFont
+from gftools.changeset import dry_run_family
+from gftools.fix import fix_family, open_font, save_font, tables_written
+
+
+log = logging.getLogger(__name__)
+
+
+__all__ = [
+    "find_families",
+    "read_manifest",
+    "families_root",
+    "fix_family_dir",
+    "fix_families",
+]
+
+
+FONT_EXTENSIONS = (".ttf", ".otf")
+
+
+def _font_files(family_dir):
+    return sorted(
+        os.path.join(family_dir, f)
+        for f in os.listdir(family_dir)
+        if f.endswith(FONT_EXTENSIONS)
+    )
+
+
+def find_families(root):
+    """Return the sorted list of directories in root, including root,
+    which directly contain font files."""
+    families = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        if any(f.endswith(FONT_EXTENSIONS) for f in filenames):
+            families.append(dirpath)
+    return sorted(families)
+
+
+def read_manifest(path):
+    """Return the family directories listed in a manifest file.
+
+    The manifest lists one family directory per line. Relative paths are
+    relative to the manifest's directory. Blank lines and lines starting
+    with # are ignored."""
+    manifest_dir = os.path.dirname(os.path.abspath(path))
+    families = []
+    with open(path, encoding="utf-8") as doc:
+        for line in doc:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            families.append(os.path.join(manifest_dir, line))
+    return families
+
+
+def _table_data(reader):
+    tables = {tag: reader[tag] for tag in reader.keys()}
+    # Saving always updates head.checkSumAdjustment and head.modified,
+    # mask them so head is only reported if something else changed
+    head = tables.get("head")
+    if head is not None and len(head) >= 36:
+        tables["head"] = head[:8] + bytes(4) + head[12:28] + bytes(8) + head[36:]
+    return tables
+
+
+def families_root(family_dirs):
+    """Return the deepest dir holding all the family dirs, e.g "fonts" for
+    fonts/ofl/foo and fonts/apache/foo."""
+    return os.path.commonpath(
+        [os.path.dirname(os.path.abspath(d)) for d in family_dirs]
+    )
+
+
+def _output_path(path, family_dir, inplace=False, out=None, root=None):
+    if inplace:
+        return path
+    if out:
+        family_dir = os.path.abspath(family_dir)
+        if root is None:
+            root = os.path.dirname(family_dir)
+        family_out = os.path.join(out, os.path.relpath(family_dir, root))
+        os.makedirs(family_out, exist_ok=True)
+        return os.path.join(family_out, os.path.basename(path))
+    return path + ".fix"
+
+
+def fix_family_dir(
+    family_dir,
+    include_source_fixes=False,
+    inplace=False,
+    out=None,
+    dry_run=False,
+    root=None,
+):
+    """Fix the fonts in a family directory and save them.
+
+    Args:
+        family_dir: directory holding the family's font files.
+        include_source_fixes: passed to fix_family.
+        inplace: overwrite the fonts.
+        out: save the fonts to out/{family dir relative to root}/ instead.
+            If neither inplace nor out is given, fonts are saved next to the
+            originals with a .fix suffix.
+        dry_run: don't save the fonts, record the changes the fixes would
+            make instead, see gftools.changeset.
+        root: dir the family dir is kept relative to under out, see
+            families_root. Defaults to the family dir's parent.
+
+    Returns:
+        dict which can be serialized to JSON:
+        {"family": family_dir,
+         "fonts": {font path: {"saved_to": path,
+                               "changed": [tags],
+                               "added": [tags],
+                               "removed": [tags],
+                               "fixes": [FixResult as a dict]}},
+         "error": None or an error message,
+         "seconds": time taken}
+        For dry runs, each font's dict is {"changes": [change dicts]}.
+    """
+    start = time.perf_counter()
+    result = {"family": family_dir, "fonts": {}, "error": None}
+    try:
+        paths = _font_files(family_dir)
+        if not paths:
+            raise ValueError(f"No fonts found in {family_dir}")
+        if dry_run:
+            changeset = dry_run_family(paths, include_source_fixes)
+            for path, changes in changeset.fonts.items():
+                result["fonts"][path] = {"changes": changes}
+        else:
+            result["fonts"] = _fix_and_save(
+                family_dir, paths, include_source_fixes, inplace, out, root
+            )
+    except Exception as e:
+        log.debug("Failed to fix %s", family_dir, exc_info=True)
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def _fix_and_save(family_dir, paths, include_source_fixes, inplace, out, root):
+    fonts = [open_font(p) for p in paths]
+    before = [_table_data(f.reader) for f in fonts]
+    fix_results = fix_family(fonts, include_source_fixes)
+    written = tables_written([fix_family])
+    results = {}
+    for path, font, old_tables, font_fixes in zip(paths, fonts, before, fix_results):
+        saved_to = _output_path(path, family_dir, inplace, out, root)
+        save_font(font, saved_to, written)
+        with TTFont(saved_to) as saved:
+            new_tables = _table_data(saved.reader)
+        results[path] = {
+            "saved_to": saved_to,
+            "changed": sorted(
+                t for t in new_tables
+                if t in old_tables and new_tables[t] != old_tables[t]
+            ),
+            "added": sorted(set(new_tables) - set(old_tables)),
+            "removed": sorted(set(old_tables) - set(new_tables)),
+            "fixes": [r._asdict() for r in font_fixes],
+        }
+    return results
+
+
+def fix_families(family_dirs, jobs=None, **kwargs):
+    """Fix families in a process pool and yield the results of
+    fix_family_dir as the families finish.
+
+    Args:
+        family_dirs: list of family directories.
+        jobs: number of worker processes, defaults to the number of CPUs.
+            If jobs is 1, the families are fixed in this process.
+        kwargs: passed to fix_family_dir. With out, the families keep
+            their paths relative to families_root under out, so families
+            with the same name in different dirs don't overwrite each
+            other.
+    """
+    family_dirs = list(family_dirs)
+    if kwargs.get("out") and family_dirs:
+        kwargs.setdefault("root", families_root(family_dirs))
+    if jobs == 1:
+        for family_dir in family_dirs:
+            yield fix_family_dir(family_dir, **kwargs)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            pool.submit(fix_family_dir, family_dir, **kwargs): family_dir
+            for family_dir in family_dirs
+        }
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                # The worker itself died, e.g it ran out of memory
+                yield {
+                    "family": futures[future],
+                    "fonts": {},
+                    "error": f"{type(e).__name__}: {e}",
+                    "seconds": None,
+                }
@@ -54,8 +54,9 @@ else:
 
 CATEGORIES = ['DISPLAY', 'SERIF', 'SANS_SERIF', 'HANDWRITING', 'MONOSPACE']
 
-from pkg_resources import resource_filename
-with open(resource_filename('gftools', 'template.upstream.yaml')) as f:
+from gftools.util.resources import resource_path
+from gftools.util import http_cache
+with open(resource_path('gftools', 'template.upstream.yaml')) as f:
   upstream_yaml_template = f.read()
   # string.format fails if we use other instances of {variables}
   # without adding them to the call to format (KeyError).
@@ -145,10 +146,11 @@ def _get_github_api_token() -> str:
   # $ export GH_TOKEN={the GitHub API token}
   return os.environ['GH_TOKEN']
 
-def _post_github(url: str, payload: typing.Dict):
+def _post_github(url: str, payload: typing.Dict, max_age: int = 0):
   github_api_token = _get_github_api_token()
   headers = {'Authorization': f'bearer {github_api_token}'}
-  response = requests.post(url, json=payload, headers=headers)
+  response = http_cache.default_session().post(url, json=payload,
+                                               headers=headers, max_age=max_age)
   if response.status_code == requests.codes.unprocessable:
     # has a helpful response.json with an 'errors' key.
     pass
@@ -160,9 +162,14 @@ def _post_github(url: str, payload: typing.Dict):
     raise Exception(f'GitHub POST query failed to url {url}:\n {errors}')
   return json
 
+# GraphQL queries are POST requests, which can't be revalidated, so
+# answers are reused for a short while only.
+GITHUB_GRAPHQL_QUERY_MAX_AGE = 60
+
 def _run_gh_graphql_query(query, variables):
   payload = {'query': query, 'variables': variables}
-  return _post_github(GITHUB_GRAPHQL_API, payload)
+  return _post_github(GITHUB_GRAPHQL_API, payload,
+                      max_age=GITHUB_GRAPHQL_QUERY_MAX_AGE)
 
 def _family_name_normal(family_name: str) -> str:
   return family_name.lower()\
@@ -199,12 +206,16 @@ def _git_tree_iterate(path, tree, topdown):
 def _git_tree_walk(path, tree, topdown=True):
   yield from _git_tree_iterate(path.split(os.sep), tree[path], topdown)
 
+GITHUB_BLOB_MAX_AGE = 365 * 24 * 60 * 60
+
 def get_github_blob(repo_owner, repo_name, file_sha):
   url = f'{GITHUB_V3_REST_API}/repos/{repo_owner}/{repo_name}/git/blobs/{file_sha}'
   headers = {
     'Accept': 'application/vnd.github.v3.raw'
   }
-  response = requests.get(url, headers=headers)
+  # A blob never changes, its url is the hash of its contents.
+  response = http_cache.default_session().get(url, headers=headers,
+                                              max_age=GITHUB_BLOB_MAX_AGE)
   # print(f'response headers: {pprint.pformat(response.headers, indent=2)}')
   # raises requests.exceptions.HTTPError
   response.raise_for_status()
@@ -1213,7 +1224,7 @@ def get_github_open_pull_requests(repo_owner: str, repo_name: str,
   github_api_token = _get_github_api_token()
   headers = {'Authorization': f'bearer {github_api_token}'}
 
-  response = requests.get(url, headers=headers)
+  response = http_cache.default_session().get(url, headers=headers)
   # print(f'response headers: {pprint.pformat(response.headers, indent=2)}')
   # raises requests.exceptions.HTTPError
   response.raise_for_status()
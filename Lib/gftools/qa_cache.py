@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# Copyright 2020 The Google Font Tools Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Reuse the results of gftools qa checks whose inputs haven't changed.
+
+The results of each check, or of each instance for checks which run per
+instance, are stored in a hidden dir inside the qa output dir. They are
+keyed by the check's name and version, the sha256 of the fonts before
+and after, and the check's settings. When qa runs again on the same
+output dir, a check whose key is stored copies the stored results
+instead of running.
+
+Every check reused or run is listed in qa_cache.json in the output dir,
+along with why it was reused or run.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from gftools.util.cache import file_stamp
+from gftools.util.resources import version
+
+
+__all__ = ["ResultCache", "clean_out_dir", "tool_version"]
+
+
+CACHE_DIR_NAME = ".qa_cache"
+MANIFEST_NAME = "qa_cache.json"
+
+
+_hashes = {}
+
+
+def file_sha256(path):
+    """Return the sha256 of a file's contents. Hashes are kept in memory
+    while the file is unchanged."""
+    memo_key = (os.path.abspath(path), file_stamp(path))
+    if memo_key not in _hashes:
+        sha256 = hashlib.sha256()
+        with open(path, "rb") as doc:
+            for chunk in iter(lambda: doc.read(1024 * 1024), b""):
+                sha256.update(chunk)
+        _hashes[memo_key] = sha256.hexdigest()
+    return _hashes[memo_key]
+
+
+def tool_version(distribution):
+    """Return the installed version of a check's distribution, e.g
+    "fontbakery", or "unknown" if it isn't installed."""
+    try:
+        return version(distribution)
+    # PackageNotFoundError is an ImportError, in importlib.metadata and its
+    # backport alike
+    except ImportError:
+        return "unknown"
+
+
+def clean_out_dir(out):
+    """Create the qa output dir, or empty it apart from the result cache."""
+    os.makedirs(out, exist_ok=True)
+    for name in os.listdir(out):
+        if name == CACHE_DIR_NAME:
+            continue
+        path = os.path.join(out, name)
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
+
+
+class ResultCache:
+    """Stored check results inside a qa output dir.
+
+    Args:
+        out: the qa output dir.
+    """
+
+    def __init__(self, out):
+        self.out = out
+        self.root = os.path.join(out, CACHE_DIR_NAME)
+        os.makedirs(self.root, exist_ok=True)
+        self.manifest = []
+        self._lock = threading.Lock()
+
+    def key(self, check, check_version, fonts_before=(), fonts_after=(), settings=None):
+        """Return the key of a check's results.
+
+        Args:
+            check: name of the check, e.g "diffenator".
+            check_version: version of the check, see tool_version.
+            fonts_before: paths of the fonts before.
+            fonts_after: paths of the fonts after.
+            settings: anything else the results depend on, which can be
+                serialized to JSON. Other objects are keyed by their str().
+        """
+        data = json.dumps(
+            {
+                "check": check,
+                "version": check_version,
+                # the gftools code driving the check matters too
+                "gftools": version(),
+                "fonts_before": [file_sha256(p) for p in fonts_before],
+                "fonts_after": [file_sha256(p) for p in fonts_after],
+                "settings": settings,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def _entry(self, key):
+        return os.path.join(self.root, key)
+
+    def restore(self, key, dst):
+        """Copy the stored results of key to dst, replacing it.
+
+        Returns:
+            the time the results were stored, or None if there are none.
+        """
+        entry = self._entry(key)
+        try:
+            with open(os.path.join(entry, "meta.json"), encoding="utf-8") as doc:
+                stored = json.load(doc)["stored"]
+        except (OSError, ValueError, KeyError):
+            return None
+        if os.path.isdir(dst):
+            shutil.rmtree(dst)
+        shutil.copytree(os.path.join(entry, "result"), dst)
+        return stored
+
+    def store(self, key, src):
+        """Store the results in src under key."""
+        tmp = tempfile.mkdtemp(dir=self.root, prefix=".tmp-")
+        try:
+            shutil.copytree(src, os.path.join(tmp, "result"))
+            with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as doc:
+                json.dump({"stored": time.time()}, doc)
+            entry = self._entry(key)
+            if os.path.isdir(entry):
+                shutil.rmtree(entry)
+            os.rename(tmp, entry)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+    def record(self, check, item, key, stored=None):
+        """Add a check to the manifest.
+
+        Args:
+            check: name of the check.
+            item: what the check ran on, e.g an instance name.
+            key: the key of the results.
+            stored: the time the reused results were stored, or None if
+                the check ran.
+        """
+        if stored is None:
+            reason = "ran, no results were stored for these fonts and settings"
+        else:
+            reason = "reused results stored {}, the fonts and settings are unchanged".format(
+                time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(stored))
+            )
+        with self._lock:
+            self.manifest.append(
+                {
+                    "check": check,
+                    "item": item,
+                    "key": key,
+                    "reused": stored is not None,
+                    "reason": reason,
+                }
+            )
+            self.manifest.sort(key=lambda e: (e["check"], e["item"]))
+            with open(os.path.join(self.out, MANIFEST_NAME), "w", encoding="utf-8") as doc:
+                json.dump(self.manifest, doc, indent=2)
+
+    def cached(self, check, item, key, dst, func):
+        """Restore the results of key to dst, or call func to write them
+        to dst and store them.
+
+        Returns:
+            True if the results were reused.
+        """
+        stored = self.restore(key, dst)
+        if stored is None:
+            func()
+            self.store(key, dst)
+        self.record(check, item, key, stored)
+        return stored is not None
+
+    def prune(self):
+        """Remove the stored results which weren't used by this run."""
+        used = set(e["key"] for e in self.manifest)
+        for name in os.listdir(self.root):
+            if name not in used:
+                shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# Copyright 2020 The Google Font Tools Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Units of work of gftools qa which run in worker processes.
+
+Each task is a dict which can be pickled, holding font paths and the
+output dir of the task, so a worker opens the fonts it needs itself.
+The diffenator dependencies are imported inside the tasks since they are
+optional.
+
+What a task logs in a worker is sent back with its result and logged
+again in the thread which ran the tasks, so it ends up in the same log
+files as the rest of the QA stage.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import logging
+import os
+import threading
+import traceback
+
+
+log = logging.getLogger(__name__)
+
+
+__all__ = ["TaskErrors", "run_tasks", "split_tasks", "diff_instance", "plot_glyphs"]
+
+
+class TaskErrors(Exception):
+    """Raised once all tasks have run if some of them failed.
+
+    Attributes:
+        errors: dict of {task name: formatted traceback}
+    """
+
+    def __init__(self, label, errors):
+        self.errors = errors
+        super().__init__(
+            "{} failed for {}: {}".format(label, len(errors), ", ".join(sorted(errors)))
+        )
+
+
+def _run_task(func, task):
+    try:
+        return func(task), None
+    except Exception:
+        return None, traceback.format_exc()
+
+
+class _RecordCollector(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        # The args and exc_info may not pickle, so format them now
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        self.records.append(record)
+
+
+def _run_task_in_worker(func, task, level):
+    root = logging.getLogger()
+    handlers, root_level = root.handlers, root.level
+    collector = _RecordCollector()
+    # A forked worker inherits the parent's handlers, only collect
+    root.handlers = [collector]
+    root.setLevel(level)
+    try:
+        result, error = _run_task(func, task)
+    finally:
+        root.handlers = handlers
+        root.setLevel(root_level)
+    return result, error, collector.records
+
+
+def _log_records(records):
+    thread_name = threading.current_thread().name
+    for record in records:
+        logger = logging.getLogger(record.name)
+        if logger.isEnabledFor(record.levelno):
+            record.threadName = thread_name
+            logger.handle(record)
+
+
+def run_tasks(func, tasks, jobs=None, label="QA"):
+    """Run func(task) for each task in a process pool.
+
+    A failing task doesn't stop the others. Once they have all run, the
+    failures are logged and raised together.
+
+    Args:
+        func: module level function, so it can be sent to the workers.
+        tasks: list of task dicts, each with a unique "name".
+        jobs: number of worker processes, defaults to the number of CPUs.
+            If jobs is 1, the tasks run in this process.
+        label: name of the work used in log and error messages.
+
+    Returns:
+        dict of {task name: func(task)}, in the order of tasks.
+
+    Raises:
+        TaskErrors: if any task raised an exception.
+    """
+    outcomes = {}
+    if jobs == 1 or len(tasks) <= 1:
+        for task in tasks:
+            outcomes[task["name"]] = _run_task(func, task)
+    else:
+        level = min(
+            logging.getLogger().getEffectiveLevel(),
+            logging.getLogger("gftools").getEffectiveLevel(),
+        )
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {
+                pool.submit(_run_task_in_worker, func, task, level): task["name"]
+                for task in tasks
+            }
+            for future in as_completed(futures):
+                try:
+                    result, error, records = future.result()
+                except Exception:
+                    # The worker itself died, e.g it ran out of memory
+                    outcomes[futures[future]] = (None, traceback.format_exc())
+                    continue
+                _log_records(records)
+                outcomes[futures[future]] = (result, error)
+    results = {}
+    errors = {}
+    for task in tasks:
+        result, error = outcomes[task["name"]]
+        if error:
+            log.error("%s failed for %s:\n%s", label, task["name"], error)
+            errors[task["name"]] = error
+        else:
+            results[task["name"]] = result
+    if errors:
+        raise TaskErrors(label, errors)
+    return results
+
+
+def split_tasks(items, parts):
+    """Split items into at most parts lists of consecutive items whose
+    lengths differ by one at most."""
+    parts = max(1, min(parts, len(items)))
+    size, extra = divmod(len(items), parts)
+    chunks = []
+    start = 0
+    for i in range(parts):
+        end = start + size + (1 if i < extra else 0)
+        chunks.append(items[start:end])
+        start = end
+    return [c for c in chunks if c]
+
+
+def diff_instance(task):
+    """Diff an instance of the fonts before and after with Diffenator.
+
+    Args:
+        task: dict with the keys
+            name: instance name, e.g "BoldItalic".
+            font_before: path of the font before holding the instance.
+            font_after: path of the font after holding the instance.
+            coordinates: the instance's fvar coordinates, used if both
+                fonts are variable.
+            out: dir the reports and images are written to.
+
+    Returns:
+        the out dir.
+    """
+    from diffenator.diff import DiffFonts
+    from diffenator.font import DFont
+
+    font_before = DFont(task["font_before"])
+    font_after = DFont(task["font_after"])
+    if font_after.is_variable and not font_before.is_variable:
+        font_after.set_variations_from_static(font_before)
+
+    elif not font_after.is_variable and font_before.is_variable:
+        font_before.set_variations_from_static(font_after)
+
+    elif font_after.is_variable and font_before.is_variable:
+        font_after.set_variations(task["coordinates"])
+        font_before.set_variations(task["coordinates"])
+
+    out = task["out"]
+    # TODO add settings
+    diff = DiffFonts(font_before, font_after, {"render_diffs": True})
+    diff.to_gifs(dst=out)
+    diff.to_txt(20, os.path.join(out, "report.txt"))
+    diff.to_md(20, os.path.join(out, "report.md"))
+    diff.to_html(20, os.path.join(out, "report.html"), image_dir=".")
+    return out
+
+
+def _glyph_pages(dfont, limit, page_size):
+    from diffenator import DFontTableIMG
+
+    rows = list(dfont.glyphs)[:limit]
+    for start in range(0, len(rows), page_size):
+        end = min(start + page_size, len(rows))
+        # Diffenator labels the image "{table name}: {rows on the image}"
+        page = DFontTableIMG(
+            dfont, "glyphs {}-{} of {}".format(start + 1, end, len(rows)),
+            renderable=True,
+        )
+        for row in rows[start:end]:
+            page.append(row)
+        yield page
+
+
+def plot_glyphs(task):
+    """Plot the glyphs of a font, or of some of its instances, to pngs.
+
+    The font is loaded once and set to each instance in turn.
+
+    Args:
+        task: dict with the keys
+            name: unique task name.
+            font: path of the font.
+            images: list of (image path without extension, instance
+                coordinates). The coordinates are None for a static font.
+            limit: maximum number of glyphs plotted per image, or per
+                instance if the plot is paged.
+            page_size: if not None, each image shows this many glyphs
+                at most, and images are numbered image_1.png, image_2.png
+                etc. Otherwise each image shows all the glyphs up to limit
+                on a single canvas.
+
+    Returns:
+        list of the paths of the pngs.
+    """
+    from diffenator.font import DFont
+
+    dfont = DFont(task["font"])
+    pngs = []
+    for image, coords in task["images"]:
+        if coords is not None:
+            dfont.set_variations(coords)
+        if task["page_size"] is None:
+            png = image + ".png"
+            dfont.glyphs.to_png(png, limit=task["limit"])
+            pngs.append(png)
+            continue
+        for number, page in enumerate(
+            _glyph_pages(dfont, task["limit"], task["page_size"]), 1
+        ):
+            png = "{}_{}.png".format(image, number)
+            page.to_png(png, limit=task["page_size"])
+            pngs.append(png)
+    return pngs
@@ -104,7 +104,7 @@ def stylename_to_axes(font_style, axis_reg=axis_registry):
 
     tokens = font_style.split()
     for token in tokens:
-        axis = style_token_to_axis(token)
+        axis = style_token_to_axis(token, axis_reg)
         if axis:
             axes.append(axis)
         else:
@@ -121,6 +121,9 @@ def stylename_to_axes(font_style, axis_reg=axis_registry):
 
 def style_token_to_axis(string, axis_reg=axis_registry):
     # Condensed --> width
+    fallbacks = getattr(axis_reg, "fallbacks_by_name", None)
+    if fallbacks is not None:
+        return fallbacks.get(string, (None, None))[0]
     for axis_tag, axis in axis_reg.items():
         for fallback in axis.fallback:
             if fallback.name == string:
@@ -135,7 +138,9 @@ def _append_non_fvar_axes_to_stat(
     familyname = font_familyname(ttFont)
     style = f"{familyname} {stylename}"
     # {"wght": "Regular", "ital": "Roman", ...}
-    font_axes_in_namerecords = {style_token_to_axis(t): t for t in style.split()}
+    font_axes_in_namerecords = {
+        style_token_to_axis(t, axis_reg): t for t in style.split()
+    }
 
     # Add axes to ttFont which exist across the family but are not in the
     # ttFont's fvar
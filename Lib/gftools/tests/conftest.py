@@ -0,0 +1,36 @@
+import threading
+from http.server import HTTPServer
+from socketserver import ThreadingMixIn
+import pytest
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    # http.server.ThreadingHTTPServer is new in Python 3.7
+    daemon_threads = True
+
+
+@pytest.fixture
+def serve():
+    """Start local HTTP servers which are shut down after the test.
+
+    serve(handler, state) starts a threaded server for a
+    BaseHTTPRequestHandler class and returns it. The server's url is the
+    http://127.0.0.1:{port} it listens on, its state the state passed in,
+    which the handler can share with the test.
+    """
+    servers = []
+
+    def start(handler, state=None):
+        # Keep the request log out of the test output
+        quiet = type(handler.__name__, (handler,), {"log_message": lambda *args: None})
+        httpd = ThreadingHTTPServer(("127.0.0.1", 0), quiet)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        httpd.url = "http://127.0.0.1:%s" % httpd.server_port
+        httpd.state = state
+        servers.append(httpd)
+        return httpd
+
+    yield start
+    for httpd in servers:
+        httpd.shutdown()
+        httpd.server_close()
@@ -0,0 +1,109 @@
+import os
+import shutil
+import pytest
+from fontTools.ttLib import TTFont
+from gftools.changeset import (
+    Changeset,
+    ChangesetConflict,
+    apply_changes,
+    dry_run_family,
+    record_changes,
+)
+from gftools.fix import fix_family
+
+
+TEST_DATA = os.path.join("data", "test")
+
+
+@pytest.fixture
+def font_path(tmp_path):
+    # A font with a few issues for fix_family to fix
+    font = TTFont(os.path.join(TEST_DATA, "mavenpro", "MavenPro-Bold.ttf"))
+    font["OS/2"].fsType = 4
+    font["OS/2"].panose.bProportion = 3
+    font["name"].setName("Weird\nName", 3, 3, 1, 0x409)
+    del font["gasp"]
+    path = str(tmp_path / "MavenPro-Bold.ttf")
+    font.save(path)
+    return path
+
+
+def test_record_changes(font_path):
+    original, fixed = TTFont(font_path), TTFont(font_path)
+    fixed["OS/2"].fsType = 0
+    fixed["OS/2"].panose.bProportion = 9
+    fixed["name"].setName("Foo", 1, 3, 1, 0x409)
+    del fixed["DSIG"]
+    changes = record_changes(original, fixed, ["OS/2", "name", "head"])
+    assert {"op": "remove_table", "table": "DSIG"} in changes
+    assert {
+        "op": "set", "table": "OS/2", "attr": "fsType", "old": 4, "new": 0
+    } in changes
+    assert {
+        "op": "set", "table": "OS/2", "attr": "panose.bProportion", "old": 3, "new": 9
+    } in changes
+    assert {"op": "add_name", "record": [1, 3, 1, 0x409, "Foo"]} in changes
+    # head was declared but not touched
+    assert not any(c.get("table") == "head" for c in changes)
+
+
+def test_dry_run_does_not_write(font_path):
+    with open(font_path, "rb") as doc:
+        before = doc.read()
+    changeset = dry_run_family([font_path], include_source_fixes=True)
+    with open(font_path, "rb") as doc:
+        assert doc.read() == before
+    assert not os.path.exists(font_path + ".fix")
+    ops = set(c["op"] for c in changeset.fonts[font_path])
+    assert ops >= {"set", "add_table", "add_name", "remove_name"}
+
+
+def test_apply_matches_fix_family(font_path, tmp_path):
+    changeset = dry_run_family([font_path], include_source_fixes=True)
+    changeset = Changeset.from_json(changeset.to_json())
+    applied_path, = changeset.apply(out=str(tmp_path / "applied"))
+
+    fixed = TTFont(font_path)
+    fix_family([fixed], include_source_fixes=True)
+    fixed_path = str(tmp_path / "fixed.ttf")
+    fixed.save(fixed_path)
+
+    applied, fixed = TTFont(applied_path), TTFont(fixed_path)
+    assert sorted(applied.keys()) == sorted(fixed.keys())
+    for tag in ("OS/2", "name", "gasp", "prep", "post", "hhea"):
+        assert applied.getTableData(tag) == fixed.getTableData(tag), tag
+
+
+def test_apply_out_keeps_family_paths(font_path, tmp_path):
+    fonts = tmp_path / "fonts"
+    paths = []
+    for licence in ("ofl", "apache"):
+        family_dir = fonts / licence / "mavenpro"
+        family_dir.mkdir(parents=True)
+        paths.append(str(shutil.copy(font_path, family_dir)))
+    changeset = Changeset()
+    for path in paths:
+        changeset.update(dry_run_family([path], include_source_fixes=True))
+
+    out = tmp_path / "out"
+    saved = changeset.apply(out=str(out))
+    assert sorted(saved) == [
+        str(out / "apache" / "mavenpro" / "MavenPro-Bold.ttf"),
+        str(out / "ofl" / "mavenpro" / "MavenPro-Bold.ttf"),
+    ]
+
+
+def test_apply_conflict(font_path):
+    changes = dry_run_family([font_path], include_source_fixes=True).fonts[font_path]
+    font = TTFont(font_path)
+    font["OS/2"].fsType = 8
+    with pytest.raises(ChangesetConflict):
+        apply_changes(font, changes)
+
+
+def test_changeset_save_load(font_path, tmp_path):
+    changeset = dry_run_family([font_path])
+    path = str(tmp_path / "changes.json")
+    changeset.save(path)
+    assert Changeset.load(path).fonts == changeset.fonts
+    assert len(Changeset.load(path)) == len(changeset)
@@ -0,0 +1,52 @@
+from gftools.util.coverage import FamilyCoverage
+import itertools
+import random
+import pytest
+
+
+PATHS = ["A.ttf", "B.ttf", "C.ttf", "D.ttf"]
+
+
+def _brute_force_worst(codepoints, subset):
+    worst = (None, None, 0)
+    for (p1, c1), (p2, c2) in itertools.combinations(zip(PATHS, codepoints), 2):
+        diff = abs(len(subset & c1) - len(subset & c2))
+        if diff > worst[2]:
+            worst = (p1, p2, diff)
+    return worst
+
+
+@pytest.fixture
+def codepoints():
+    rnd = random.Random(1)
+    return [set(rnd.sample(range(0x20, 0x200), 300)) for _ in PATHS]
+
+
+def test_max_pairwise_difference(codepoints):
+    coverage = FamilyCoverage(PATHS, codepoints)
+    rnd = random.Random(2)
+    for _ in range(20):
+        subset = set(rnd.sample(range(0x0, 0x300), 100))
+        assert coverage.max_pairwise_difference(subset) == \
+            _brute_force_worst(codepoints, subset)
+
+
+def test_max_pairwise_difference_equal_support():
+    coverage = FamilyCoverage(PATHS, [{0x41, 0x42}] * 4)
+    assert coverage.max_pairwise_difference({0x41}) == (None, None, 0)
+
+
+def test_gaps(codepoints):
+    coverage = FamilyCoverage(PATHS, codepoints)
+    union = set().union(*codepoints)
+    gaps = coverage.gaps()
+    for path, cps in zip(PATHS, codepoints):
+        assert gaps[path] == sorted(union - cps)
+
+
+def test_subset_percentages(codepoints):
+    coverage = FamilyCoverage(PATHS, codepoints)
+    subset = set(range(0x100, 0x180)) | {0x10000}
+    pcts = coverage.subset_percentages(subset)
+    for path, cps in zip(PATHS, codepoints):
+        assert pcts[path] == pytest.approx(100.0 * len(cps & subset) / len(subset))
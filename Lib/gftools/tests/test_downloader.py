@@ -0,0 +1,71 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+import pytest
+import requests
+from gftools.util.downloader import Downloader
+
+
+@pytest.fixture
+def server(serve):
+    state = {"active": 0, "max_active": 0, "failures": {}, "lock": threading.Lock()}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with state["lock"]:
+                state["active"] += 1
+                state["max_active"] = max(state["max_active"], state["active"])
+                failures = state["failures"].get(self.path, 0)
+                if failures:
+                    state["failures"][self.path] = failures - 1
+            try:
+                time.sleep(0.05)
+                if failures:
+                    self.send_error(503)
+                    return
+                body = self.path.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            finally:
+                with state["lock"]:
+                    state["active"] -= 1
+
+    return serve(Handler, state)
+
+
+def test_download(server, tmp_path):
+    jobs = [
+        (f"{server.url}/font{i}.ttf", str(tmp_path / f"font{i}.ttf"))
+        for i in range(12)
+    ]
+    downloader = Downloader(max_workers=8, per_host=3)
+    assert downloader.download(jobs) == [dst for _, dst in jobs]
+    for i, (_, dst) in enumerate(jobs):
+        with open(dst) as doc:
+            assert doc.read() == f"/font{i}.ttf"
+    assert 1 < server.state["max_active"] <= 3
+
+
+def test_download_retries(server, tmp_path):
+    server.state["failures"]["/flaky.ttf"] = 2
+    downloader = Downloader(retries=2, backoff=0.01)
+    dst = str(tmp_path / "flaky.ttf")
+    downloader.download([(f"{server.url}/flaky.ttf", dst)])
+    with open(dst) as doc:
+        assert doc.read() == "/flaky.ttf"
+
+
+def test_download_gives_up(server, tmp_path):
+    server.state["failures"]["/broken.ttf"] = 5
+    downloader = Downloader(retries=1, backoff=0.01)
+    jobs = [
+        (f"{server.url}/broken.ttf", str(tmp_path / "broken.ttf")),
+        (f"{server.url}/ok.ttf", str(tmp_path / "ok.ttf")),
+    ]
+    with pytest.raises(requests.HTTPError):
+        downloader.download(jobs)
+    assert not (tmp_path / "broken.ttf").exists()
+    assert (tmp_path / "ok.ttf").exists()
+    assert [p.name for p in tmp_path.iterdir()] == ["ok.ttf"]
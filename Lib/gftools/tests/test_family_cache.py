@@ -0,0 +1,193 @@
+import io
+import os
+import threading
+import zipfile
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
+import pytest
+from gftools import utils
+from gftools.util import family_cache
+from gftools.util.family_cache import FamilyCache
+
+
+TEST_DATA = os.path.join("data", "test")
+
+
+def _zip(files):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as fonts_zip:
+        for name, path in files.items():
+            fonts_zip.write(path, name)
+    return buf.getvalue()
+
+
+MAVEN = os.path.join(TEST_DATA, "mavenpro")
+FAMILIES = {
+    "Maven Pro": {
+        "MavenPro-Bold.ttf": os.path.join(MAVEN, "MavenPro-Bold.ttf"),
+        "static/MavenPro-Black.ttf": os.path.join(MAVEN, "MavenPro-Black.ttf"),
+        "OFL.txt": os.path.join(TEST_DATA, "Lora-Regular.ttf"),
+    },
+    # Shares a font with Maven Pro
+    "Maven Pro Bold": {
+        "MavenPro-Bold.ttf": os.path.join(MAVEN, "MavenPro-Bold.ttf"),
+    },
+    "Lora": {"Lora-Regular.ttf": os.path.join(TEST_DATA, "Lora-Regular.ttf")},
+}
+
+
+@pytest.fixture
+def server():
+    requests_seen = []
+    # family: function which breaks the family's zip
+    corrupt = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            family = parse_qs(urlparse(self.path).query)["family"][0]
+            requests_seen.append(family)
+            if family not in FAMILIES:
+                self.send_error(404)
+                return
+            body = _zip(FAMILIES[family])
+            if family in corrupt:
+                body = corrupt[family](body)
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = "http://127.0.0.1:%s/download?family={}" % httpd.server_port
+    httpd.requests_seen = requests_seen
+    httpd.corrupt = corrupt
+    yield httpd
+    httpd.shutdown()
+
+
+def _cache(tmp_path, server, **kwargs):
+    return FamilyCache(str(tmp_path / "cache"), url=server.url, **kwargs)
+
+
+def test_fonts_are_cached(tmp_path, server):
+    cache = _cache(tmp_path, server)
+    fonts = cache.fonts("Maven Pro")
+    assert [name for name, _ in fonts] == [
+        "MavenPro-Bold.ttf", "static/MavenPro-Black.ttf"
+    ]
+    with open(fonts[0][1], "rb") as cached, open(
+        FAMILIES["Maven Pro"]["MavenPro-Bold.ttf"], "rb"
+    ) as original:
+        assert cached.read() == original.read()
+    assert cache.fonts("Maven Pro") == fonts
+    assert server.requests_seen == ["Maven Pro"]
+
+
+def test_identical_fonts_are_shared(tmp_path, server):
+    cache = _cache(tmp_path, server)
+    maven = dict(cache.fonts("Maven Pro"))
+    maven_bold = dict(cache.fonts("Maven Pro Bold"))
+    assert maven["MavenPro-Bold.ttf"] == maven_bold["MavenPro-Bold.ttf"]
+    assert cache.size() == sum(
+        os.path.getsize(p) for p in set(maven.values()) | set(maven_bold.values())
+    )
+
+
+def test_expired_family_is_downloaded_again(tmp_path, server):
+    cache = _cache(tmp_path, server, ttl=0)
+    cache.fonts("Lora")
+    cache.fonts("Lora")
+    assert server.requests_seen == ["Lora", "Lora"]
+
+
+def test_expired_family_is_used_if_download_fails(tmp_path, server):
+    cache = _cache(tmp_path, server)
+    fonts = cache.fonts("Lora")
+    stale = _cache(tmp_path, server, ttl=0)
+    stale.url = server.url.replace("family=", "family=Missing")
+    assert stale.fonts("Lora") == fonts
+
+
+def _corrupt_last_font(body):
+    # Flip a byte in the last font's data so reading it fails its CRC check
+    with zipfile.ZipFile(io.BytesIO(body)) as fonts_zip:
+        last = [i for i in fonts_zip.infolist() if i.filename.endswith(".ttf")][-1]
+    offset = body.index(last.filename.encode(), last.header_offset)
+    offset += len(last.filename) + last.compress_size // 2
+    return body[:offset] + bytes([body[offset] ^ 0xFF]) + body[offset + 1:]
+
+
+def test_expired_family_is_used_if_download_is_corrupt(tmp_path, server):
+    cache = _cache(tmp_path, server)
+    fonts = cache.fonts("Lora")
+    server.corrupt["Lora"] = lambda body: body[: len(body) // 2]
+    stale = _cache(tmp_path, server, ttl=0)
+    assert stale.fonts("Lora") == fonts
+    assert server.requests_seen == ["Lora", "Lora"]
+
+
+def test_corrupt_download_drops_its_fonts(tmp_path, server):
+    cache = _cache(tmp_path, server)
+    server.corrupt["Maven Pro"] = _corrupt_last_font
+    with pytest.raises(zipfile.BadZipFile):
+        cache.fonts("Maven Pro")
+    assert cache.size() == 0
+
+
+def test_missing_family(tmp_path, server):
+    cache = _cache(tmp_path, server)
+    with pytest.raises(Exception):
+        cache.fonts("Missing")
+
+
+def test_least_recently_used_family_is_evicted(tmp_path, server):
+    lora_size = os.path.getsize(FAMILIES["Lora"]["Lora-Regular.ttf"])
+    maven_size = sum(
+        os.path.getsize(p) for n, p in FAMILIES["Maven Pro"].items()
+        if n.endswith(".ttf")
+    )
+    cache = _cache(tmp_path, server, max_size=maven_size + lora_size)
+    cache.fonts("Maven Pro")
+    lora = cache.fonts("Lora")
+    # Make Maven Pro the least recently used
+    os.utime(cache._index_path("Maven Pro"), (0, 0))
+    # Maven Pro Bold only adds an index, so nothing is evicted
+    cache.fonts("Maven Pro Bold")
+    assert cache._read_index("Maven Pro") is not None
+
+    bold_size = os.path.getsize(FAMILIES["Maven Pro Bold"]["MavenPro-Bold.ttf"])
+    cache.max_size = bold_size + lora_size
+    cache.evict(keep="Maven Pro Bold")
+    assert cache._read_index("Maven Pro") is None
+    assert cache._read_index("Maven Pro Bold") is not None
+    # Evicting Maven Pro only removed the font no other family uses
+    assert all(os.path.isfile(p) for _, p in lora)
+    assert cache.size() == bold_size + lora_size
+
+
+def test_download_family_from_cache(tmp_path, server, monkeypatch):
+    cache = _cache(tmp_path, server)
+    monkeypatch.setattr(family_cache, "default_cache", lambda: cache)
+    fonts = utils.download_family_from_Google_Fonts("Maven Pro")
+    assert sorted(f.name for f in fonts) == [
+        "MavenPro-Bold.ttf",
+        "static/MavenPro-Black.ttf",
+    ]
+    with open(os.path.join(MAVEN, "MavenPro-Bold.ttf"), "rb") as doc:
+        expected = doc.read()
+    assert [f.read() for f in fonts if f.name == "MavenPro-Bold.ttf"] == [expected]
+    # Copies, like the fonts of an uncached download, not open cache files
+    assert all(isinstance(f, utils.SpooledFile) for f in fonts)
+    for font in fonts:
+        font.close()
+
+    dst = tmp_path / "fonts"
+    dst.mkdir()
+    assert utils.download_family_from_Google_Fonts("Maven Pro", str(dst)) == [
+        str(dst / "MavenPro-Bold.ttf")
+    ]
@@ -0,0 +1,99 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import pytest
+from gftools.util import family_index, http_cache
+from gftools.util.family_index import (
+    FamilyIndex,
+    FamilyIndexError,
+    load_family_index,
+)
+
+
+ITEMS = [
+    {"family": "Open Sans", "variants": ["regular", "700", "italic"], "category": "sans-serif"},
+    {"family": "Lora", "variants": ["regular"], "category": "serif"},
+]
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setenv("GFTOOLS_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.delenv("GFTOOLS_NO_CACHE", raising=False)
+    monkeypatch.setattr(family_index, "_indexes", {})
+    monkeypatch.setattr(http_cache, "_default_session", None)
+    seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            seen.append(self.headers.get("If-None-Match"))
+            if "key=bad" in self.path:
+                body = json.dumps(
+                    {"error": {"errors": [{"reason": "keyInvalid"}]}}
+                ).encode("utf-8")
+                self.send_response(400)
+            elif self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.end_headers()
+                return
+            else:
+                body = json.dumps({"items": ITEMS}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("ETag", '"v1"')
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = "http://127.0.0.1:%s/webfonts?key={}" % httpd.server_port
+    httpd.seen = seen
+    yield httpd
+    httpd.shutdown()
+
+
+def test_family_index():
+    index = FamilyIndex(ITEMS)
+    assert len(index) == 2
+    assert "Open Sans" in index
+    # Family names match exactly, as Google Fonts spells them
+    assert "open sans" not in index
+    assert "Roboto" not in index
+    assert index.get("Lora")["category"] == "serif"
+    assert index.get("LORA") is None
+    assert index.get("Roboto") is None
+    assert index.variants("Open Sans") == {"regular", "700", "italic"}
+    assert index.has_variant("Lora", "regular")
+    assert not index.has_variant("Roboto", "regular")
+
+
+def test_load_family_index_once_per_process(server):
+    index = load_family_index("key", url=server.url)
+    assert load_family_index("key", url=server.url) is index
+    assert "Lora" in index
+    assert server.seen == [None]
+
+
+def test_load_family_index_revalidates(server, monkeypatch):
+    load_family_index("key", url=server.url, max_age=0)
+    # A new process has an empty in memory cache
+    monkeypatch.setattr(family_index, "_indexes", {})
+    index = load_family_index("key", url=server.url, max_age=0)
+    assert server.seen == [None, '"v1"']
+    assert "Open Sans" in index
+
+
+def test_load_family_index_uses_fresh_copy(server, monkeypatch):
+    load_family_index("key", url=server.url)
+    monkeypatch.setattr(family_index, "_indexes", {})
+    load_family_index("key", url=server.url)
+    assert server.seen == [None]
+
+
+def test_load_family_index_invalid_key(server):
+    with pytest.raises(FamilyIndexError, match="invalid"):
+        load_family_index("bad", url=server.url)
@@ -345,3 +345,107 @@ def test_fix_vertical_metrics_typo_metrics_enabled(static_fonts):
         assert font["OS/2"].sTypoDescender == -300
         assert font["OS/2"].sTypoLineGap == 0
     _check_vertical_metrics(static_fonts)
+
+
+def test_tables_written():
+    assert tables_written([fix_fs_type, fix_mac_style]) == {"OS/2", "head"}
+    assert tables_written([remove_tables]) == frozenset()
+    assert tables_written([fix_fs_type, lambda font: True]) is None
+
+
+def test_save_font_passes_through_read_tables(tmp_path):
+    src = os.path.join(TEST_DATA, "Lora-Regular.ttf")
+    out = str(tmp_path / "Lora-Regular.ttf")
+    font = open_font(src)
+    fix_isFixedPitch(font)
+    assert font.isLoaded("hmtx") and font.isLoaded("maxp")
+    save_font(font, out, tables_written([fix_isFixedPitch]))
+    assert not font.isLoaded("glyf")
+
+    original, fixed = TTFont(src), TTFont(out)
+    for tag in ("glyf", "loca", "hmtx", "maxp", "cmap", "GSUB"):
+        assert fixed.reader[tag] == original.reader[tag]
+    assert fixed["post"].isFixedPitch == 0
+    assert fixed["OS/2"].panose.bProportion == 0
+
+
+def test_save_font_inplace(tmp_path):
+    path = str(tmp_path / "Lora-Regular.ttf")
+    with open(os.path.join(TEST_DATA, "Lora-Regular.ttf"), "rb") as src:
+        with open(path, "wb") as dst:
+            dst.write(src.read())
+    font = open_font(path)
+    fix_fs_type(font)
+    save_font(font, path, tables_written([fix_fs_type]))
+    assert TTFont(path)["OS/2"].fsType == 0
+
+
+def test_order_fixes():
+    order = [f.name for f in order_fixes(SOURCE_FIXES + FONT_FIXES)]
+    assert sorted(order) == sorted(SOURCE_FIXES + FONT_FIXES)
+    # Fixes which read the stylename run after the name table is fixed
+    for name in ("fix_fs_selection", "fix_mac_style", "fix_weight_class"):
+        assert order.index("fix_nametable") < order.index(name)
+    # fix_os2_version writes OS/2 which fix_nametable reads
+    assert order.index("fix_os2_version") < order.index("fix_nametable")
+
+
+def test_run_fixes(static_font):
+    static_font["OS/2"].fsType = 4
+    results = {r.name: r for r in run_fixes(static_font, FONT_FIXES + ["fix_fs_type"])}
+    assert results["fix_fs_type"].changed
+    assert results["fix_fs_type"].skipped is None
+    assert results["remove_mvar"].skipped == "not applicable"
+    assert results["fix_hinted_font"].skipped == "not applicable"
+    assert all(r.seconds >= 0 for r in results.values())
+    # Second run, the font is now conformant
+    results = {r.name: r for r in run_fixes(static_font, ["fix_fs_type"])}
+    assert results["fix_fs_type"].skipped == "conformant"
+    assert not results["fix_fs_type"].changed
+
+
+def test_run_fixes_unhinted_font_conformant(static_font, static_fonts):
+    # mavenpro already has the gasp and prep fix_unhinted_font writes
+    results = {r.name: r for r in run_fixes(static_fonts[0], ["fix_unhinted_font"])}
+    assert results["fix_unhinted_font"].skipped == "conformant"
+    assert not results["fix_unhinted_font"].changed
+
+    # Lora has no gasp or prep
+    results = {r.name: r for r in run_fixes(static_font, ["fix_unhinted_font"])}
+    assert results["fix_unhinted_font"].changed
+
+
+def test_run_fixes_derived_values_invalidated(static_font):
+    stylenames = []
+
+    def record_stylename(ttFont, stylename=None):
+        stylenames.append(stylename)
+        return False
+
+    @fix_tables(reads=["head"], writes=["name"])
+    def rename_style(ttFont):
+        ttFont["name"].setName("Bold", 2, 3, 1, 0x409)
+        return True
+
+    fixes = [
+        # before and rename_style depend on each other, so the registration
+        # order wins
+        Fix(fix_tables(writes=["head"])(record_stylename), name="before",
+            inputs=["stylename"]),
+        Fix(rename_style),
+        Fix(fix_tables()(record_stylename), name="after", inputs=["stylename"]),
+    ]
+    registry = FIX_REGISTRY.copy()
+    try:
+        for fix in fixes:
+            register_fix(fix)
+        run_fixes(static_font, ["after", "rename_style", "before"])
+    finally:
+        FIX_REGISTRY.clear()
+        FIX_REGISTRY.update(registry)
+    assert stylenames == ["Regular", "Bold"]
+
+
+def test_register_fix_duplicate_name():
+    with pytest.raises(ValueError):
+        register_fix(Fix(fix_fs_type))
@@ -0,0 +1,89 @@
+import os
+import shutil
+import pytest
+from gftools.fixbatch import (
+    families_root,
+    find_families,
+    fix_families,
+    fix_family_dir,
+    read_manifest,
+)
+
+
+TEST_DATA = os.path.join("data", "test")
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "ofl"
+    shutil.copytree(os.path.join(TEST_DATA, "mavenpro"), root / "mavenpro")
+    shutil.copytree(os.path.join(TEST_DATA, "cabin_multi"), root / "cabin")
+    (root / "lora").mkdir()
+    shutil.copy(os.path.join(TEST_DATA, "Lora-Regular.ttf"), root / "lora")
+    (root / "empty").mkdir()
+    return root
+
+
+def test_find_families(tree):
+    assert find_families(str(tree)) == [
+        str(tree / "cabin"),
+        str(tree / "lora"),
+        str(tree / "mavenpro"),
+    ]
+
+
+def test_read_manifest(tree):
+    manifest = tree / "families.txt"
+    manifest.write_text("# families to fix\nmavenpro\n\nlora\n")
+    assert read_manifest(str(manifest)) == [
+        str(tree / "mavenpro"),
+        str(tree / "lora"),
+    ]
+
+
+def test_fix_family_dir(tree, tmp_path):
+    out = tmp_path / "out"
+    result = fix_family_dir(str(tree / "lora"), out=str(out))
+    assert result["error"] is None
+    font_result = result["fonts"][str(tree / "lora" / "Lora-Regular.ttf")]
+    assert font_result["saved_to"] == str(out / "lora" / "Lora-Regular.ttf")
+    assert os.path.isfile(font_result["saved_to"])
+    # Lora-Regular.ttf is unhinted and has no DSIG
+    assert font_result["added"] == ["DSIG", "gasp", "prep"]
+    assert font_result["removed"] == []
+
+
+def test_fix_family_dir_error(tree):
+    result = fix_family_dir(str(tree / "empty"))
+    assert result["error"].startswith("ValueError")
+    assert result["fonts"] == {}
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_fix_families(tree, jobs):
+    families = [str(tree / "mavenpro"), str(tree / "lora"), str(tree / "empty")]
+    results = list(fix_families(families, jobs=jobs))
+    assert sorted(r["family"] for r in results) == sorted(families)
+    errors = {r["family"]: r["error"] for r in results}
+    assert errors[str(tree / "mavenpro")] is None
+    assert errors[str(tree / "empty")] is not None
+    assert os.path.isfile(tree / "mavenpro" / "MavenPro-Bold.ttf.fix")
+
+
+def test_fix_families_out_keeps_family_paths(tmp_path):
+    fonts = tmp_path / "fonts"
+    for licence in ("ofl", "apache"):
+        (fonts / licence / "lora").mkdir(parents=True)
+        shutil.copy(os.path.join(TEST_DATA, "Lora-Regular.ttf"), fonts / licence / "lora")
+    families = [str(fonts / "ofl" / "lora"), str(fonts / "apache" / "lora")]
+    assert families_root(families) == str(fonts)
+
+    out = tmp_path / "out"
+    results = list(fix_families(families, jobs=1, out=str(out)))
+    saved = sorted(
+        f["saved_to"] for r in results for f in r["fonts"].values()
+    )
+    assert saved == [
+        str(out / "apache" / "lora" / "Lora-Regular.ttf"),
+        str(out / "ofl" / "lora" / "Lora-Regular.ttf"),
+    ]
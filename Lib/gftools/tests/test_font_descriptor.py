@@ -0,0 +1,46 @@
+import os
+import pytest
+from fontTools.ttLib import TTFont
+from gftools.util.font_descriptor import FontDescriptor, describe_fonts
+
+
+TEST_DATA = os.path.join("data", "test")
+
+
+@pytest.mark.parametrize(
+    "filename",
+    ["Lora-Regular.ttf", "Raleway[wght].ttf", "Inconsolata[wdth,wght].ttf"],
+)
+def test_descriptor_matches_ttfont(filename):
+    path = os.path.join(TEST_DATA, filename)
+    ttfont = TTFont(path)
+    name = ttfont["name"]
+    expected_family = (name.getName(16, 3, 1, 1033) or name.getName(1, 3, 1, 1033)).toUnicode()
+
+    font = FontDescriptor(path)
+    assert font.filename == filename
+    assert font.family_name == expected_family
+    assert font.weight_class == ttfont["OS/2"].usWeightClass
+    assert font.is_variable == ("fvar" in ttfont)
+    if "fvar" in ttfont:
+        assert [(i.name, i.coordinates) for i in font.instances] == [
+            (name.getName(i.subfamilyNameID, 3, 1, 1033).toUnicode(), i.coordinates)
+            for i in ttfont["fvar"].instances
+        ]
+    else:
+        assert font.instances == []
+
+
+def test_descriptor_reads_lazily(tmp_path):
+    font = FontDescriptor(str(tmp_path / "Missing-Regular.ttf"))
+    assert font.filename == "Missing-Regular.ttf"
+    with pytest.raises(FileNotFoundError):
+        font.family_name
+
+
+def test_describe_fonts():
+    paths = [
+        os.path.join(TEST_DATA, "Lora-Regular.ttf"),
+        os.path.join(TEST_DATA, "OFL.txt"),
+    ]
+    assert [f.path for f in describe_fonts(paths)] == paths[:1]
@@ -0,0 +1,50 @@
+from gftools.util import glyphdata
+import pytest
+
+
+GLYPHDATA_XML = {
+    "GlyphData.xml": """<?xml version="1.0" encoding="UTF-8"?>
+<glyphData>
+  <glyph unicode="0041" name="A" category="Letter"/>
+  <glyph unicode="00C5" name="Aring" production="Aring" category="Letter"/>
+  <glyph name="a.sc" production="a.sc" category="Letter"/>
+</glyphData>
+""",
+    "GlyphData_Ideographs.xml": """<?xml version="1.0" encoding="UTF-8"?>
+<glyphData>
+  <glyph unicode="4E00" name="uni4E00" category="Letter"/>
+</glyphData>
+""",
+}
+
+
+@pytest.fixture
+def glyphdata_files(tmp_path, monkeypatch):
+    paths = []
+    for filename in glyphdata.GLYPHDATA_FILES:
+        path = tmp_path / filename
+        path.write_text(GLYPHDATA_XML[filename])
+        paths.append(str(path))
+    monkeypatch.setattr(glyphdata, "_glyphdata_paths", lambda: paths)
+    monkeypatch.setenv("GFTOOLS_CACHE_DIR", str(tmp_path / "cache"))
+    return paths
+
+
+def test_lazy_data(glyphdata_files):
+    data = glyphdata._LazyGlyphData()
+    assert data._data is None
+    expected = glyphdata._build_data(glyphdata._fetch_all_glyphs())
+    assert data.by_name == expected.by_name
+    assert data.by_unicode[0x41] == glyphdata.GlyphInfo("A", "A", 0x41)
+    assert data.by_prodname["a.sc"].unicode is None
+    assert data.by_unicode[0x4E00].name == "uni4E00"
+    by_name, by_unicode, by_prodname = data
+    assert by_unicode == expected.by_unicode
+
+
+def test_compiled_data_is_reused(glyphdata_files, monkeypatch):
+    glyphdata._LazyGlyphData().by_name
+    def fail():
+        raise AssertionError("glyph data should not be parsed again")
+    monkeypatch.setattr(glyphdata, "_fetch_all_glyphs", fail)
+    assert "Aring" in glyphdata._LazyGlyphData().by_name
@@ -0,0 +1,130 @@
+from absl import flags
+from fontTools.ttLib import TTFont
+from gftools.util import google_fonts as fonts
+from gftools.util import cmap_reader
+from glob import glob
+import pytest
+import os
+
+
+TEST_DATA = os.path.join("data", "test")
+# google_fonts reads --nam_dir, use its default value
+flags.FLAGS.mark_as_parsed()
+
+
+@pytest.fixture
+def font_path():
+    return os.path.join(TEST_DATA, "cabin", "Cabin-Regular.ttf")
+
+
+def _subsets_for_codepoint_by_scan(cp):
+    return [
+        s for s in fonts.ListSubsets()
+        if cp in (fonts.CodepointsInSubset(s, unique_glyphs=True) or ())
+    ]
+
+
+@pytest.mark.parametrize(
+    "cp",
+    [0x41, 0x0410, 0x0391, 0x1E00, 0x4E00, 0x0E01, 0x1780, 0x10FFFF]
+)
+def test_subsets_for_codepoint(cp):
+    assert fonts.SubsetsForCodepoint(cp) == _subsets_for_codepoint_by_scan(cp)
+
+
+def test_subset_for_codepoint():
+    assert fonts.SubsetForCodepoint(0x41) == "latin"
+    assert fonts.SubsetForCodepoint(0x10FFFF) is None
+
+
+def test_subsets_for_codepoints(font_path):
+    cps = fonts.CodepointsInFont(font_path)
+    by_subset = fonts.SubsetsForCodepoints(cps)
+    assert "latin" in by_subset
+    for subset, subset_cps in by_subset.items():
+        assert subset_cps <= cps
+        assert subset_cps == cps & fonts.CodepointsInSubset(
+            subset, unique_glyphs=True
+        )
+
+
+def test_subsets_in_font(font_path):
+    results = fonts.SubsetsInFont(font_path, 0)
+    subsets = [r[0] for r in results]
+    assert "latin" in subsets
+    for subset, supported, total in results:
+        subset_cps = fonts.CodepointsInSubset(subset, unique_glyphs=True)
+        assert total == len(subset_cps)
+        assert supported == len(subset_cps & fonts.CodepointsInFont(font_path))
+
+
+@pytest.fixture
+def namelists(tmp_path):
+    base = tmp_path / "base.nam"
+    base.write_text("#$ include child.nam\n0x0041 A\n0x0042 B\n")
+    child = tmp_path / "child.nam"
+    child.write_text("0x0043 C\n      uni0043.alt\n")
+    return str(base), str(child)
+
+
+def test_read_namelist_uses_compiled_cache(namelists, tmp_path, monkeypatch):
+    monkeypatch.setenv("GFTOOLS_CACHE_DIR", str(tmp_path / "cache"))
+    base, child = namelists
+    cold = fonts.ReadNameList(base)
+    assert cold["charset"] == {0x41, 0x42, 0x43}
+    assert cold["noCharcode"] == {"uni0043.alt"}
+
+    def fail(filename):
+        raise AssertionError(f"{filename} should not be parsed")
+    monkeypatch.setattr(fonts, "ParseNamelist", fail)
+    warm = fonts.ReadNameList(base)
+    assert warm["charset"] == cold["charset"]
+    assert warm["header"] == cold["header"]
+    assert warm["noCharcode"] == cold["noCharcode"]
+
+
+def test_compiled_namelist_cache_invalidation(namelists, tmp_path, monkeypatch):
+    monkeypatch.setenv("GFTOOLS_CACHE_DIR", str(tmp_path / "cache"))
+    base, child = namelists
+    fonts.ReadNameList(base)
+    with open(child, "a") as f:
+        f.write("0x0044 D\n")
+    # keep the test independent from the mtime resolution of the fs
+    os.utime(child, ns=(1, 1))
+
+    parsed = []
+    parse = fonts.ParseNamelist
+    def spy(filename):
+        parsed.append(os.path.basename(filename))
+        return parse(filename)
+    monkeypatch.setattr(fonts, "ParseNamelist", spy)
+    assert fonts.CodepointsInNamelist(base) == {0x41, 0x42, 0x43, 0x44}
+    assert parsed == ["child.nam"]
+
+
+def test_codepoints_as_ranges(font_path):
+    ranges = fonts.CodepointsInSubset("japanese", as_ranges=True)
+    assert ranges == fonts.CodepointsInSubset("japanese")
+    assert len(ranges.ranges()) < len(ranges)
+    assert fonts.CodepointsInFont(font_path, as_ranges=True) == \
+        fonts.CodepointsInFont(font_path)
+
+
+@pytest.mark.parametrize(
+    "path",
+    glob(os.path.join(TEST_DATA, "**", "*.ttf"), recursive=True)
+)
+def test_cmap_reader_matches_fonttools(path):
+    expected = set()
+    with TTFont(path) as font:
+        for table in fonts.UnicodeCmapTables(font):
+            expected.update(table.cmap.keys())
+    assert cmap_reader.codepoints_in_cmap(path) == expected
+    assert cmap_reader.codepoints_in_cmap(path, as_ranges=True) == expected
+
+
+def test_cmap_reader_unsupported(tmp_path):
+    woff = tmp_path / "font.woff"
+    woff.write_bytes(b"wOFF" + b"\0" * 40)
+    with pytest.raises(cmap_reader.UnsupportedFontError):
+        cmap_reader.codepoints_in_cmap(str(woff))
@@ -0,0 +1,148 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlparse
+import pytest
+from gftools import utils
+from gftools.util import http_cache
+from gftools.util.http_cache import CachedSession, RateLimiter
+
+
+@pytest.fixture
+def cache_root(tmp_path, monkeypatch):
+    monkeypatch.setenv("GFTOOLS_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.delenv("GFTOOLS_NO_CACHE", raising=False)
+    monkeypatch.setattr(http_cache, "_default_session", None)
+
+
+@pytest.fixture
+def server(cache_root, serve):
+    state = {"seen": [], "limited": 0, "files": {}}
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, body=b"", headers=()):
+            self.send_response(status)
+            for header in headers:
+                self.send_header(*header)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            path = urlparse(self.path).path
+            state["seen"].append((path, self.headers.get("If-None-Match")))
+            if path == "/limited" and state["limited"]:
+                state["limited"] -= 1
+                reset = str(int(time.time()) + 1)
+                self._send(
+                    403,
+                    headers=[("X-RateLimit-Remaining", "0"), ("X-RateLimit-Reset", reset)],
+                )
+            elif path in state["files"]:
+                body = state["files"][path]
+                if isinstance(body, (list, dict)):
+                    body = json.dumps(body).encode("utf-8")
+                self._send(200, body)
+            elif self.headers.get("If-None-Match") == '"v1"':
+                self._send(304)
+            else:
+                self._send(200, b'{"path": "%s"}' % path.encode(), [("ETag", '"v1"')])
+
+        def do_POST(self):
+            state["seen"].append((self.path, None))
+            self._send(200, self.rfile.read(int(self.headers["Content-Length"])))
+
+    return serve(Handler, state)
+
+
+def test_get_revalidates(server):
+    session = CachedSession()
+    first = session.get(server.url + "/repo", headers={"Authorization": "token a"})
+    assert not first.from_cache
+    second = CachedSession().get(server.url + "/repo", headers={"Authorization": "token a"})
+    assert second.from_cache
+    assert second.json() == first.json() == {"path": "/repo"}
+    assert server.state["seen"] == [("/repo", None), ("/repo", '"v1"')]
+
+
+def test_get_is_keyed_by_credentials(server):
+    CachedSession().get(server.url + "/repo", headers={"Authorization": "token a"})
+    CachedSession().get(server.url + "/repo", headers={"Authorization": "token b"})
+    assert server.state["seen"] == [("/repo", None), ("/repo", None)]
+
+
+def test_get_max_age(server):
+    CachedSession().get(server.url + "/repo", max_age=60)
+    response = CachedSession().get(server.url + "/repo", max_age=60)
+    assert response.from_cache
+    assert server.state["seen"] == [("/repo", None)]
+
+
+def test_post_max_age(server):
+    session = CachedSession()
+    assert session.post(server.url + "/graphql", json={"query": "a"}).json() == {"query": "a"}
+    session.post(server.url + "/graphql", json={"query": "a"})
+    assert len(server.state["seen"]) == 2
+    session.post(server.url + "/graphql", json={"query": "b"}, max_age=60)
+    response = session.post(server.url + "/graphql", json={"query": "b"}, max_age=60)
+    assert response.from_cache and response.json() == {"query": "b"}
+    assert len(server.state["seen"]) == 3
+
+
+def test_stale_if_error(server):
+    url = server.url + "/repo"
+    CachedSession().get(url)
+    server.shutdown()
+    server.server_close()
+    response = CachedSession().get(url, stale_if_error=True)
+    assert response.from_cache and response.json() == {"path": "/repo"}
+
+
+def test_rate_limit_waits_for_reset(server):
+    server.state["limited"] = 1
+    server.state["files"]["/limited"] = b"ok"
+    session = CachedSession(limiter=RateLimiter(max_wait=5))
+    response = session.get(server.url + "/limited")
+    assert response.status_code == 200
+    assert [p for p, _ in server.state["seen"]] == ["/limited", "/limited"]
+
+
+def test_rate_limiter_max_concurrent():
+    limiter = RateLimiter(max_concurrent=2)
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def request():
+        with limiter.slot("https://api.github.com/repos"):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=request) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak[0] == 2
+
+
+def test_download_files_in_github_dir(server, tmp_path, monkeypatch):
+    monkeypatch.setenv("GH_TOKEN", "token")
+    monkeypatch.setattr(utils, "GITHUB_API", server.url)
+    server.state["files"].update({
+        "/repos/google/fonts/contents/ofl/lora": [
+            {"type": "file", "path": "ofl/lora/Lora.ttf",
+             "download_url": server.url + "/raw/Lora.ttf"},
+            {"type": "dir", "path": "ofl/lora/static", "download_url": None},
+        ],
+        "/raw/Lora.ttf": b"font",
+    })
+    dst = str(tmp_path / "out")
+    url = "https://github.com/google/fonts/tree/main/ofl/lora"
+    assert utils.download_files_in_github_dir(url, dst) == [
+        str(tmp_path / "out" / "ofl" / "lora" / "Lora.ttf")
+    ]
+    assert (tmp_path / "out" / "ofl" / "lora" / "Lora.ttf").read_bytes() == b"font"
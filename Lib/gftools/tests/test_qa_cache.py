@@ -0,0 +1,92 @@
+import json
+import os
+import shutil
+import pytest
+from gftools.qa_cache import CACHE_DIR_NAME, MANIFEST_NAME, ResultCache, clean_out_dir
+
+
+TEST_DATA = os.path.join("data", "test")
+
+
+@pytest.fixture
+def fonts(tmp_path):
+    paths = []
+    for name in ("Lora-Regular.ttf", "Raleway[wght].ttf"):
+        path = str(tmp_path / name)
+        shutil.copy(os.path.join(TEST_DATA, name), path)
+        paths.append(path)
+    return paths
+
+
+def _write_report(dst, text, calls):
+    def run():
+        calls.append(text)
+        os.makedirs(dst, exist_ok=True)
+        with open(os.path.join(dst, "report.md"), "w") as doc:
+            doc.write(text)
+    return run
+
+
+def test_key(tmp_path, fonts):
+    cache = ResultCache(str(tmp_path / "out"))
+    key = cache.key("diffenator", "1.0", [fonts[0]], [fonts[1]], {"render_diffs": True})
+    assert key == cache.key("diffenator", "1.0", [fonts[0]], [fonts[1]], {"render_diffs": True})
+    assert key != cache.key("diffenator", "1.1", [fonts[0]], [fonts[1]], {"render_diffs": True})
+    assert key != cache.key("diffenator", "1.0", [fonts[0]], [fonts[1]], {"render_diffs": False})
+    assert key != cache.key("diffenator", "1.0", [fonts[1]], [fonts[0]], {"render_diffs": True})
+    # The key follows the font's contents, not its path
+    with open(fonts[1], "ab") as doc:
+        doc.write(b"\0")
+    assert key != cache.key("diffenator", "1.0", [fonts[0]], [fonts[1]], {"render_diffs": True})
+
+
+def test_cached(tmp_path, fonts):
+    out = str(tmp_path / "out")
+    dst = os.path.join(out, "Fontbakery")
+    calls = []
+
+    cache = ResultCache(out)
+    key = cache.key("fontbakery", "1.0", fonts_after=fonts)
+    assert not cache.cached("fontbakery", "all", key, dst, _write_report(dst, "first", calls))
+
+    # A second run on the same out dir reuses the results
+    clean_out_dir(out)
+    assert not os.path.exists(dst)
+    cache = ResultCache(out)
+    key = cache.key("fontbakery", "1.0", fonts_after=fonts)
+    assert cache.cached("fontbakery", "all", key, dst, _write_report(dst, "second", calls))
+    assert calls == ["first"]
+    with open(os.path.join(dst, "report.md")) as doc:
+        assert doc.read() == "first"
+    with open(os.path.join(out, MANIFEST_NAME)) as doc:
+        manifest = json.load(doc)
+    assert [(e["check"], e["item"], e["reused"]) for e in manifest] == [
+        ("fontbakery", "all", True)
+    ]
+    assert manifest[0]["reason"].startswith("reused results stored")
+
+
+def test_prune(tmp_path, fonts):
+    out = str(tmp_path / "out")
+    cache = ResultCache(out)
+    keys = []
+    for font in fonts:
+        dst = os.path.join(out, "plot_glyphs", os.path.basename(font))
+        keys.append(cache.key("plot_glyphs", "1.0", fonts_after=[font]))
+        cache.cached("plot_glyphs", font, keys[-1], dst, _write_report(dst, font, []))
+
+    cache = ResultCache(out)
+    dst = os.path.join(out, "plot_glyphs", "Lora")
+    cache.cached("plot_glyphs", "Lora", keys[0], dst, _write_report(dst, "", []))
+    cache.prune()
+    assert os.listdir(os.path.join(out, CACHE_DIR_NAME)) == [keys[0]]
+    assert cache.restore(keys[1], dst) is None
+
+
+def test_clean_out_dir(tmp_path):
+    out = tmp_path / "out"
+    (out / CACHE_DIR_NAME).mkdir(parents=True)
+    (out / "Diffenator").mkdir()
+    (out / "stages.json").write_text("[]")
+    clean_out_dir(str(out))
+    assert os.listdir(str(out)) == [CACHE_DIR_NAME]
@@ -0,0 +1,74 @@
+import logging
+import os
+import threading
+import pytest
+from gftools.qa_tasks import TaskErrors, run_tasks, split_tasks
+
+
+TEST_DATA = os.path.join("data", "test")
+
+
+def _font_size(task):
+    return os.path.getsize(task["path"])
+
+
+def _log_font_size(task):
+    logging.getLogger("gftools.tests.qa_tasks").info("%s is being measured", task["name"])
+    logging.getLogger("gftools.tests.qa_tasks").debug("debug message")
+    return os.path.getsize(task["path"])
+
+
+def _tasks(*names):
+    return [{"name": name, "path": os.path.join(TEST_DATA, name)} for name in names]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_run_tasks(jobs):
+    tasks = _tasks("Lora-Regular.ttf", "Raleway[wght].ttf", "Inconsolata[wdth,wght].ttf")
+    results = run_tasks(_font_size, tasks, jobs=jobs)
+    assert list(results) == [t["name"] for t in tasks]
+    assert results["Lora-Regular.ttf"] == os.path.getsize(tasks[0]["path"])
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_run_tasks_errors(jobs):
+    tasks = _tasks("Missing-Bold.ttf", "Lora-Regular.ttf", "Missing-Regular.ttf")
+    with pytest.raises(TaskErrors) as e:
+        run_tasks(_font_size, tasks, jobs=jobs, label="Sizes")
+    assert sorted(e.value.errors) == ["Missing-Bold.ttf", "Missing-Regular.ttf"]
+    assert "FileNotFoundError" in e.value.errors["Missing-Bold.ttf"]
+    assert str(e.value) == "Sizes failed for 2: Missing-Bold.ttf, Missing-Regular.ttf"
+
+
+def test_split_tasks():
+    assert split_tasks(list(range(7)), 3) == [[0, 1, 2], [3, 4], [5, 6]]
+    assert split_tasks(list(range(2)), 4) == [[0], [1]]
+    assert split_tasks(list(range(3)), 0) == [[0, 1, 2]]
+    assert split_tasks([], 2) == []
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_run_tasks_logs(jobs):
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    logger = logging.getLogger("gftools")
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    thread = threading.Thread(
+        target=run_tasks,
+        args=(_log_font_size, _tasks("Lora-Regular.ttf", "Raleway[wght].ttf"), jobs),
+        name="stage-plot_glyphs",
+    )
+    try:
+        thread.start()
+        thread.join()
+    finally:
+        logger.removeHandler(handler)
+        logger.setLevel(logging.NOTSET)
+    # Records logged in the workers come back to the thread running the tasks
+    assert sorted(r.getMessage() for r in records) == [
+        "Lora-Regular.ttf is being measured",
+        "Raleway[wght].ttf is being measured",
+    ]
+    assert all(r.threadName == "stage-plot_glyphs" for r in records)
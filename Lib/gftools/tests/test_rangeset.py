@@ -0,0 +1,45 @@
+from gftools.util.rangeset import RangeSet
+import random
+import pytest
+
+
+def _random_ints(seed, size=200, max_value=400):
+    rnd = random.Random(seed)
+    return set(rnd.randrange(max_value) for _ in range(size))
+
+
+def test_ranges():
+    assert RangeSet([5, 1, 2, 3, 7, 6]).ranges() == [(1, 3), (5, 7)]
+    assert RangeSet.from_ranges([(5, 9), (1, 2), (3, 4), (8, 12)]).ranges() == [
+        (1, 12)
+    ]
+    assert RangeSet().ranges() == []
+
+
+def test_invalid_range():
+    with pytest.raises(ValueError):
+        RangeSet.from_ranges([(3, 1)])
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_operations_match_set(seed):
+    a = _random_ints(seed)
+    b = _random_ints(seed + 100)
+    ra, rb = RangeSet(a), RangeSet(b)
+    assert len(ra) == len(a)
+    assert set(ra) == a
+    assert (ra | rb).to_set() == a | b
+    assert (ra & rb).to_set() == a & b
+    assert (ra - rb).to_set() == a - b
+    assert (rb - ra).to_set() == b - a
+    assert (ra ^ rb).to_set() == a ^ b
+    assert all((i in ra) == (i in a) for i in range(-1, 402))
+
+
+def test_interop_with_set():
+    r = RangeSet.from_ranges([(10, 20)])
+    assert r == set(range(10, 21))
+    assert set(range(15, 30)) & r == RangeSet.from_ranges([(15, 20)])
+    assert set(range(15, 30)) - r == RangeSet.from_ranges([(21, 29)])
+    assert r <= set(range(0, 100))
+    assert not r <= set(range(11, 100))
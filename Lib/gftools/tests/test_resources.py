@@ -0,0 +1,60 @@
+import os
+import subprocess
+import sys
+import pytest
+from gftools.util import resources
+from gftools.util.resources import resource_path, version
+
+
+def test_resource_path():
+    encodings = resource_path("gftools", "encodings")
+    assert os.path.isdir(encodings)
+    assert os.path.isfile(
+        resource_path("gftools", "encodings", "latin_unique-glyphs.nam")
+    )
+    assert os.path.isdir(resource_path("gftools", "axisregistry"))
+
+
+def test_resource_path_without_importlib_files():
+    # Python < 3.9
+    expected = resource_path("gftools", "encodings", "latin_unique-glyphs.nam")
+    path = resources._module_resource_path(
+        "gftools", "encodings", "latin_unique-glyphs.nam"
+    )
+    assert os.path.samefile(path, expected)
+
+
+def test_version():
+    assert version()
+
+
+@pytest.mark.parametrize(
+    "module",
+    [
+        "gftools.util.google_fonts",
+        "gftools.axisreg",
+        "gftools.util.glyphdata",
+        "gftools.stat",
+        "gftools.fix",
+        "gftools.utils",
+        "gftools.util.resources",
+    ]
+)
+def test_common_imports_skip_pkg_resources(module):
+    # pkg_resources scans every installed distribution when it is imported,
+    # it must stay off the paths every gftools command goes through.
+    code = (
+        f"import sys, {module}; "
+        "from gftools.util.resources import resource_path, version; "
+        "resource_path('gftools', 'encodings'); version(); "
+        "sys.exit('pkg_resources' in sys.modules)"
+    )
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    assert result.returncode == 0, result.stderr or "pkg_resources was imported"
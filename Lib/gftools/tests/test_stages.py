@@ -0,0 +1,92 @@
+import logging
+import threading
+import time
+import pytest
+from gftools.util.stages import SkipStage, StageGraph
+
+
+log = logging.getLogger("gftools.tests.stages")
+
+
+def test_stages_run_after_their_deps():
+    order = []
+    graph = StageGraph()
+    graph.add("download", lambda: order.append("download"))
+    graph.add("load", lambda: order.append("load"), deps=["download"])
+    graph.add("check", lambda: order.append("check") or 42, deps=["load"])
+    results = graph.run()
+    assert order == ["download", "load", "check"]
+    assert list(results) == ["download", "load", "check"]
+    assert results["check"].status == "ok"
+    assert results["check"].value == 42
+
+
+def test_independent_stages_run_concurrently():
+    barrier = threading.Barrier(2, timeout=5)
+    graph = StageGraph()
+    graph.add("load", lambda: None)
+    # Both checks must be running at once to get past the barrier
+    graph.add("fontbakery", barrier.wait, deps=["load"])
+    graph.add("diffenator", barrier.wait, deps=["load"])
+    results = graph.run(workers=2)
+    assert all(r.status == "ok" for r in results.values())
+
+
+def test_worker_limit():
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def stage():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+
+    graph = StageGraph()
+    for i in range(5):
+        graph.add(f"check{i}", stage)
+    graph.run(workers=2)
+    assert peak[0] == 2
+
+
+def test_failures_skip_dependents():
+    def fail():
+        raise ValueError("broken font")
+
+    def skip():
+        raise SkipStage("no fonts")
+
+    graph = StageGraph()
+    graph.add("load", fail)
+    graph.add("other", skip)
+    graph.add("check", lambda: None, deps=["load"])
+    graph.add("other_check", lambda: None, deps=["other"])
+    graph.add("independent", lambda: None)
+    results = graph.run()
+    assert results["load"].status == "failed"
+    assert "ValueError: broken font" in results["load"].error
+    assert results["check"].status == "skipped"
+    assert results["check"].error == "load didn't succeed"
+    assert results["other"].status == "skipped"
+    assert results["other"].error == "no fonts"
+    assert results["other_check"].status == "skipped"
+    assert results["independent"].status == "ok"
+
+
+def test_stage_logs(tmp_path):
+    log.setLevel(logging.INFO)
+    graph = StageGraph()
+    graph.add("a", lambda: log.info("message from a"))
+    graph.add("b", lambda: log.info("message from b"))
+    results = graph.run(workers=2, log_dir=str(tmp_path))
+    with open(results["a"].log) as doc:
+        text = doc.read()
+    assert "message from a" in text
+    assert "message from b" not in text
+
+
+def test_add_unknown_dep():
+    graph = StageGraph()
+    with pytest.raises(ValueError):
+        graph.add("check", lambda: None, deps=["load"])
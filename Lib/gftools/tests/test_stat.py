@@ -2,6 +2,7 @@ import pytest
 import os
 from glob import glob
 from gftools.stat import *
+from gftools.stat import style_token_to_axis
 from fontTools.ttLib import TTFont
 
 
@@ -332,3 +333,33 @@ def test_gen_stat_nameid_25_vf_postscript_name_4(var_fonts3):
     roman, italic = var_fonts3
     assert roman['name'].getName(25, 3, 1, 0x409).toUnicode() == "CabinRoman"
     assert italic['name'].getName(25, 3, 1, 0x409).toUnicode() == "CabinItalic"
+
+
+@pytest.mark.parametrize(
+    "token, axis",
+    [
+        ("Condensed", "wdth"),
+        ("Bold", "wght"),
+        ("Roman", "ital"),
+        ("Normal", "wdth"),
+        ("Foobar", None),
+    ]
+)
+def test_style_token_to_axis(token, axis):
+    from gftools.axisreg import AxisRegistry
+    assert style_token_to_axis(token) == axis
+    # plain dict registries are still supported for unambiguous tokens
+    if token not in ("Roman", "Normal"):
+        assert style_token_to_axis(token, AxisRegistry()) == axis
+
+
+def test_axis_registry_cache(tmp_path, monkeypatch):
+    from gftools import axisreg
+    monkeypatch.setenv("GFTOOLS_CACHE_DIR", str(tmp_path))
+    parsed = axisreg.AxisRegistry()
+    def fail(proto_file):
+        raise AssertionError("textprotos should be read from the cache")
+    monkeypatch.setattr(axisreg, "_parse_axis", fail)
+    registry = axisreg._LazyAxisRegistry()
+    assert registry._axes is None
+    assert dict(registry) == parsed
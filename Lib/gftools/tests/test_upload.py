@@ -0,0 +1,126 @@
+import email.parser
+import io
+import os
+import threading
+import zipfile
+from http.server import BaseHTTPRequestHandler
+import pytest
+from gftools.util.upload import MultipartBody, UploadFile, upload, zip_dir_chunks
+
+
+TEST_DATA = os.path.join("data", "test")
+
+
+def _read_chunked(rfile):
+    body = b""
+    while True:
+        size = int(rfile.readline().split(b";")[0], 16)
+        if not size:
+            rfile.readline()
+            return body
+        body += rfile.read(size)
+        rfile.readline()
+
+
+@pytest.fixture
+def server(serve):
+    state = {"requests": [], "failures": 0, "lock": threading.Lock()}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = _read_chunked(self.rfile)
+            with state["lock"]:
+                state["requests"].append((dict(self.headers), body))
+                fail = state["failures"] > 0
+                state["failures"] -= 1
+            if fail:
+                self.send_error(503)
+                return
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+    return serve(Handler, state)
+
+
+def _parts(headers, body):
+    message = email.parser.BytesParser().parsebytes(
+        "Content-Type: {}\r\n\r\n".format(headers["Content-Type"]).encode() + body
+    )
+    return {
+        part.get_param("name", header="content-disposition"): part
+        for part in message.get_payload()
+    }
+
+
+@pytest.fixture
+def qa_out(tmp_path):
+    out = tmp_path / "qa"
+    (out / "Diffenator" / "Regular").mkdir(parents=True)
+    (out / ".qa_cache").mkdir()
+    (out / ".qa_cache" / "stored").write_bytes(b"cached")
+    (out / "Diffenator" / "Regular" / "report.md").write_text("# Diffenator")
+    with open(os.path.join(TEST_DATA, "Lora-Regular.ttf"), "rb") as doc:
+        (out / "Lora-Regular.ttf").write_bytes(doc.read())
+    return str(out)
+
+
+def test_zip_dir_chunks(qa_out):
+    chunks = list(zip_dir_chunks(qa_out, exclude=[".qa_cache"], chunk_size=4096))
+    assert len(chunks) > 2
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+        assert archive.namelist() == [
+            "Lora-Regular.ttf",
+            "Diffenator/Regular/report.md",
+        ]
+        assert archive.read("Diffenator/Regular/report.md") == b"# Diffenator"
+        with open(os.path.join(TEST_DATA, "Lora-Regular.ttf"), "rb") as doc:
+            assert archive.read("Lora-Regular.ttf") == doc.read()
+
+
+def test_multipart_body_is_reiterable():
+    body = MultipartBody(
+        [("uuid", "1234")],
+        [UploadFile("files", "qa.zip", "application/zip", lambda: iter([b"ab", b"cd"]))],
+        boundary="XXXX",
+    )
+    assert b"".join(body) == b"".join(body)
+    assert b"".join(body).endswith(b"abcd\r\n--XXXX--\r\n")
+
+
+def test_upload(server, qa_out):
+    sent = []
+    zipped = UploadFile(
+        "files", "qa.zip", "application/zip",
+        lambda: zip_dir_chunks(qa_out, exclude=[".qa_cache"]),
+    )
+    response = upload(
+        server.url + "/api/upload-media",
+        fields=[("uuid", "1234")],
+        files=[zipped],
+        headers={"Access-Token": "secret"},
+        progress=sent.append,
+    )
+    assert response.json() == {}
+    (headers, body), = server.state["requests"]
+    assert headers["Transfer-Encoding"] == "chunked"
+    assert headers["Access-Token"] == "secret"
+    assert sent[-1] == len(body)
+    parts = _parts(headers, body)
+    assert parts["uuid"].get_payload() == "1234"
+    assert parts["files"].get_filename() == "qa.zip"
+    with zipfile.ZipFile(io.BytesIO(parts["files"].get_payload(decode=True))) as archive:
+        assert "Diffenator/Regular/report.md" in archive.namelist()
+
+
+def test_upload_retries(server, qa_out):
+    server.state["failures"] = 2
+    zipped = UploadFile(
+        "files", "qa.zip", "application/zip", lambda: zip_dir_chunks(qa_out)
+    )
+    upload(server.url + "/api/upload-media", files=[zipped], backoff=0.01)
+    bodies = [body for _, body in server.state["requests"]]
+    assert len(bodies) == 3
+    # Each attempt streams the whole body again
+    assert len(set(len(b) for b in bodies)) == 1
@@ -0,0 +1,160 @@
+import os
+import threading
+import zipfile
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import pytest
+from fontTools.ttLib import TTFont
+from gftools import utils
+from gftools.utils import (
+    NameIndex,
+    download_file,
+    fonts_from_zip,
+    has_mac_names,
+)
+
+
+TEST_DATA = os.path.join("data", "test")
+
+
+@pytest.fixture
+def font():
+    return TTFont(os.path.join(TEST_DATA, "Lora-Regular.ttf"))
+
+
+def _records(font):
+    return sorted(
+        (r.nameID, r.platformID, r.platEncID, r.langID, r.toUnicode())
+        for r in font["name"].names
+    )
+
+
+def test_name_index_lookup(font):
+    names = NameIndex(font)
+    assert names.get_string(1) == font["name"].getName(1, 3, 1, 0x409).toUnicode()
+    assert names.get(1, 3, 1, 0x409) is font["name"].getName(1, 3, 1, 0x409)
+    assert names.get(300) is None
+    assert names.get_string(300) is None
+    assert (1, 3, 1, 0x409) in names
+    assert len(names) == len(font["name"].names)
+    assert NameIndex.WIN_ENGLISH in names.platforms()
+
+
+def test_name_index_edits_are_committed_once(font):
+    before = _records(font)
+    names = NameIndex(font)
+    names.set("Foo", 1)
+    names.remove(nameID=5)
+    # Nothing is written to the name table until commit
+    assert _records(font) == before
+    names.commit()
+    assert font["name"].getName(1, 3, 1, 0x409).toUnicode() == "Foo"
+    assert not font["name"].getName(5, 3, 1, 0x409)
+
+
+def test_name_index_set_unchanged(font):
+    names = NameIndex(font)
+    names.set(names.get_string(1), 1)
+    assert not names.changed
+
+
+def test_name_index_remove(font):
+    names = NameIndex(font)
+    mac_records = [k for k in names if k[1:] == NameIndex.MAC_ROMAN]
+    assert names.remove(platformID=1, platEncID=0, langID=0) == len(mac_records)
+    names.commit()
+    assert not has_mac_names(font)
+
+
+def test_name_index_replace(font):
+    names = NameIndex(font)
+    family = names.get_string(1)
+    assert names.replace(family, "Bar") > 0
+    assert names.get_string(1) == "Bar"
+    names.commit()
+    assert all(family not in r[-1] for r in _records(font))
+
+
+def test_name_index_rewrite_removes_none(font):
+    names = NameIndex(font)
+    names.rewrite(lambda key, string: None if key[0] == 2 else string)
+    names.commit()
+    assert all(r[0] != 2 for r in _records(font))
+
+
+@pytest.fixture
+def fonts_zip(tmp_path):
+    path = str(tmp_path / "fonts.zip")
+    with zipfile.ZipFile(path, "w") as doc:
+        doc.write(os.path.join(TEST_DATA, "Lora-Regular.ttf"), "Lora-Regular.ttf")
+        doc.write(
+            os.path.join(TEST_DATA, "mavenpro", "MavenPro-Bold.ttf"),
+            "static/MavenPro-Bold.ttf",
+        )
+        doc.writestr("OFL.txt", "license")
+    return path
+
+
+def test_fonts_from_zip(fonts_zip, monkeypatch):
+    # Spool fonts bigger than Maven Pro Bold to disk
+    size = os.path.getsize(os.path.join(TEST_DATA, "mavenpro", "MavenPro-Bold.ttf"))
+    monkeypatch.setattr(utils, "SPOOL_MAX_SIZE", size)
+    with zipfile.ZipFile(fonts_zip) as doc:
+        fonts = fonts_from_zip(doc)
+    assert [f.name for f in fonts] == ["Lora-Regular.ttf", "static/MavenPro-Bold.ttf"]
+    lora, maven = fonts
+    assert lora._rolled and not maven._rolled
+    assert TTFont(lora)["name"].getDebugName(1) == "Lora"
+    assert TTFont(maven)["name"].getDebugName(1) == "Maven Pro"
+
+
+def test_fonts_from_zip_dst(fonts_zip, tmp_path):
+    dst = str(tmp_path / "out")
+    with zipfile.ZipFile(fonts_zip) as doc:
+        fonts = fonts_from_zip(doc, dst)
+    assert fonts == [
+        os.path.join(dst, "Lora-Regular.ttf"),
+        os.path.join(dst, "static", "MavenPro-Bold.ttf"),
+    ]
+    assert all(os.path.isfile(f) for f in fonts)
+
+
+@pytest.fixture
+def file_server(fonts_zip):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/fonts.zip":
+                self.send_error(404)
+                return
+            with open(fonts_zip, "rb") as doc:
+                body = doc.read()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:%s" % httpd.server_port
+    httpd.shutdown()
+
+
+def test_download_file(file_server, fonts_zip, tmp_path):
+    with open(fonts_zip, "rb") as doc:
+        expected = doc.read()
+    downloaded = download_file(file_server + "/fonts.zip")
+    assert downloaded.read() == expected
+    dst = str(tmp_path / "downloaded.zip")
+    download_file(file_server + "/fonts.zip", dst)
+    with open(dst, "rb") as doc:
+        assert doc.read() == expected
+    with zipfile.ZipFile(download_file(file_server + "/fonts.zip")) as doc:
+        assert len(fonts_from_zip(doc)) == 2
+
+
+def test_download_file_error(file_server):
+    with pytest.raises(Exception):
+        download_file(file_server + "/missing.zip")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# Copyright 2020 The Google Font Tools Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Helpers for the on-disk caches shared between gftools commands.
+
+Caches live in $GFTOOLS_CACHE_DIR, or in $XDG_CACHE_HOME/gftools
+(~/.cache/gftools) if it isn't set. Set GFTOOLS_NO_CACHE=1 to disable
+them.
+"""
+import os
+import tempfile
+
+
+__all__ = ["cache_dir", "file_stamp", "write_atomic"]
+
+
+def cache_dir(*parts):
+    """Return the path to a gftools cache directory, creating it if needed.
+
+    Args:
+        parts: path segments of the cache inside the gftools cache root,
+            e.g "namelists".
+
+    Returns:
+        str, or None if caching is disabled or the directory cannot be
+        created.
+    """
+    if os.environ.get("GFTOOLS_NO_CACHE"):
+        return None
+    root = os.environ.get("GFTOOLS_CACHE_DIR")
+    if not root:
+        xdg_cache = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+            os.path.expanduser("~"), ".cache"
+        )
+        root = os.path.join(xdg_cache, "gftools")
+    path = os.path.join(root, *parts)
+    try:
+        os.makedirs(path, exist_ok=True)
+    except OSError:
+        return None
+    return path
+
+
+def file_stamp(path):
+    """Return a (mtime_ns, size) tuple used to detect changes to a file."""
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def write_atomic(path, data):
+    """Write bytes to path so readers never see a partially written file.
+
+    Failures are ignored since a cache which cannot be written is just a
+    cache miss on the next run.
+    """
+    dirname = os.path.dirname(path)
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=dirname, prefix=".tmp-")
+    except OSError:
+        return False
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+    return True
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# Copyright 2020 The Google Font Tools Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Read the Unicode codepoints of a font without building a TTFont.
+
+Only the sfnt table directory and the Windows Unicode (3, 1) and (3, 10)
+cmap subtables are read, straight from a memory mapped file. Format 4 and
+12 subtables are decoded by range, so a CJK font with tens of thousands of
+codepoints costs a few hundred range operations.
+
+Fonts this module doesn't handle (collections, WOFF/WOFF2, other cmap
+subtable formats) raise UnsupportedFontError so callers can fall back to
+fontTools.
+"""
+from array import array
+import mmap
+import os
+import struct
+import sys
+from gftools.util.rangeset import RangeSet
+
+
+__all__ = ["UnsupportedFontError", "unicode_cmap_ranges", "codepoints_in_cmap"]
+
+
+_SFNT_VERSIONS = (b"\x00\x01\x00\x00", b"OTTO", b"true")
+_UNICODE_SUBTABLES = ((3, 1), (3, 10))
+
+
+class UnsupportedFontError(Exception):
+    """Raised for fonts which need a full fontTools parse."""
+
+
+def _be_array(typecode, data):
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder != "big":
+        values.byteswap()
+    return values
+
+
+def _format_4_ranges(data):
+    seg_count = struct.unpack(">H", data[6:8])[0] // 2
+    end = 14
+    end_codes = _be_array("H", data[end : end + seg_count * 2])
+    start = end + seg_count * 2 + 2  # skip reservedPad
+    start_codes = _be_array("H", data[start : start + seg_count * 2])
+    delta = start + seg_count * 2
+    id_deltas = _be_array("H", data[delta : delta + seg_count * 2])
+    range_offset = delta + seg_count * 2
+    length = struct.unpack(">H", data[2:4])[0]
+    words = _be_array("H", data[range_offset : length - (length % 2)])
+    id_range_offsets = words[:seg_count]
+
+    ranges = []
+    # the last segment is the mandatory 0xFFFF one, like fontTools skip it
+    for i in range(seg_count - 1):
+        first, last = start_codes[i], end_codes[i]
+        if first > last:
+            continue
+        id_delta = id_deltas[i]
+        offset = id_range_offsets[i]
+        if offset == 0:
+            # Only the code which wraps around to glyph 0 is unmapped
+            missing = (-id_delta) & 0xFFFF
+            if first <= missing <= last:
+                if first < missing:
+                    ranges.append((first, missing - 1))
+                if missing < last:
+                    ranges.append((missing + 1, last))
+            else:
+                ranges.append((first, last))
+            continue
+        # idRangeOffset is relative to its own position in the words array
+        base = i + offset // 2 - first
+        for code in range(first, last + 1):
+            index = base + code
+            if not 0 <= index < len(words):
+                raise UnsupportedFontError(
+                    "cmap format 4 glyph index array offset out of range"
+                )
+            glyph = words[index]
+            if glyph and (glyph + id_delta) & 0xFFFF:
+                ranges.append((code, code))
+    return ranges
+
+
+def _format_12_ranges(data):
+    n_groups = struct.unpack(">L", data[12:16])[0]
+    groups = _be_array("I", data[16 : 16 + n_groups * 12])
+    ranges = []
+    last_end = 0
+    for first, last, glyph in zip(*[iter(groups)] * 3):
+        last = min(last, 0x10FFFF)
+        # skip broken groups the same way fontTools does
+        if first > last or first < last_end:
+            continue
+        last_end = last
+        if glyph == 0:
+            first += 1
+        if first <= last:
+            ranges.append((first, last))
+    return ranges
+
+
+def unicode_cmap_ranges(data):
+    """Return the codepoint ranges mapped by the Windows Unicode cmap
+    subtables of an sfnt font.
+
+    Args:
+        data: bytes-like object holding the whole font file.
+
+    Returns:
+        list of (start, end) inclusive ranges, which may overlap.
+    """
+    if len(data) < 12 or bytes(data[:4]) not in _SFNT_VERSIONS:
+        raise UnsupportedFontError("Not an sfnt font")
+    num_tables = struct.unpack(">H", data[4:6])[0]
+    cmap_offset = cmap_length = None
+    for i in range(num_tables):
+        record = 12 + i * 16
+        tag, _, offset, length = struct.unpack(
+            ">4sLLL", data[record : record + 16]
+        )
+        if tag == b"cmap":
+            cmap_offset, cmap_length = offset, length
+            break
+    if cmap_offset is None:
+        raise UnsupportedFontError("Font has no cmap table")
+    cmap = data[cmap_offset : cmap_offset + cmap_length]
+
+    ranges = []
+    num_subtables = struct.unpack(">H", cmap[2:4])[0]
+    for i in range(num_subtables):
+        platform_id, enc_id, offset = struct.unpack(
+            ">HHL", cmap[4 + i * 8 : 12 + i * 8]
+        )
+        if (platform_id, enc_id) not in _UNICODE_SUBTABLES:
+            continue
+        fmt = struct.unpack(">H", cmap[offset : offset + 2])[0]
+        if fmt == 4:
+            length = struct.unpack(">H", cmap[offset + 2 : offset + 4])[0]
+            ranges.extend(_format_4_ranges(cmap[offset : offset + length]))
+        elif fmt == 12:
+            length = struct.unpack(">L", cmap[offset + 4 : offset + 8])[0]
+            ranges.extend(_format_12_ranges(cmap[offset : offset + length]))
+        else:
+            raise UnsupportedFontError(f"Unsupported cmap subtable format {fmt}")
+    return ranges
+
+
+def codepoints_in_cmap(path, as_ranges=False):
+    """Return the codepoints mapped by the Unicode cmap subtables of a font.
+
+    Args:
+        path: path to a ttf or otf file.
+        as_ranges: return a RangeSet instead of a set.
+
+    Returns:
+        set of ints or RangeSet.
+
+    Raises:
+        UnsupportedFontError: if the font must be read with fontTools.
+    """
+    if not isinstance(path, (str, bytes, os.PathLike)):
+        raise UnsupportedFontError("Only font files on disk can be mapped")
+    with open(path, "rb") as font_file:
+        try:
+            data = mmap.mmap(font_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise UnsupportedFontError("Empty font file")
+        try:
+            ranges = unicode_cmap_ranges(data)
+        except (struct.error, ValueError):
+            raise UnsupportedFontError("Truncated sfnt or cmap data")
+        finally:
+            data.close()
+    if as_ranges:
+        return RangeSet.from_ranges(ranges)
+    codepoints = set()
+    for first, last in ranges:
+        codepoints.update(range(first, last + 1))
+    return codepoints
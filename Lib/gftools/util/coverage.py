@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# Copyright 2020 The Google Font Tools Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Codepoint coverage of a whole font family.
+
+Each font's cmap is read once into a boolean font x codepoint matrix.
+Coverage questions about the family (which fonts differ most on a subset,
+which codepoints a font lacks compared to its siblings, how much of a
+subset each font supports) are then answered with vectorized operations
+instead of re-opening the fonts for every pair.
+"""
+import numpy as np
+from gftools.util import google_fonts as fonts
+
+
+__all__ = ["FamilyCoverage"]
+
+
+class FamilyCoverage:
+    """Coverage matrix for a collection of fonts.
+
+    Args:
+        paths: list of font paths.
+        codepoints: optional list of codepoint collections, one per path.
+            If omitted, the codepoints are read from the fonts' cmaps.
+
+    Attributes:
+        paths: list of font paths, in row order.
+        codepoints: sorted numpy array of every codepoint supported by at
+            least one font, in column order.
+        matrix: boolean numpy array, matrix[i, j] is True if
+            paths[i] supports codepoints[j].
+    """
+
+    def __init__(self, paths, codepoints=None):
+        self.paths = list(paths)
+        if codepoints is None:
+            codepoints = [fonts.CodepointsInFont(p) for p in self.paths]
+        rows = [np.fromiter(cps, dtype=np.uint32, count=len(cps))
+                for cps in codepoints]
+        self.codepoints = (
+            np.unique(np.concatenate(rows)) if rows
+            else np.array([], dtype=np.uint32)
+        )
+        self.matrix = np.zeros((len(rows), len(self.codepoints)), dtype=bool)
+        for i, row in enumerate(rows):
+            self.matrix[i, np.searchsorted(self.codepoints, row)] = True
+
+    def _columns(self, codepoints):
+        """Return a boolean column mask for the codepoints which are in
+        the matrix, and the number of codepoints given."""
+        cps = np.fromiter(codepoints, dtype=np.uint32)
+        return np.isin(self.codepoints, cps, assume_unique=True), len(cps)
+
+    def subset_counts(self, subset_cps):
+        """Return an array with the number of subset_cps each font
+        supports."""
+        columns, _ = self._columns(subset_cps)
+        return self.matrix[:, columns].sum(axis=1)
+
+    def subset_percentages(self, subset_cps):
+        """Return {path: percentage of subset_cps supported}."""
+        columns, total = self._columns(subset_cps)
+        if not total:
+            return {p: 0.0 for p in self.paths}
+        counts = self.matrix[:, columns].sum(axis=1)
+        return dict(zip(self.paths, (100.0 * counts / total).tolist()))
+
+    def max_pairwise_difference(self, subset_cps):
+        """Return the pair of fonts whose support of subset_cps differs the
+        most, as (path1, path2, difference in number of codepoints).
+
+        The difference is abs(count1 - count2), so the worst pair is made of
+        a font with the most and a font with the least supported codepoints.
+        Ties are resolved like itertools.combinations(paths, 2) would,
+        (None, None, 0) is returned if all fonts have the same support.
+        """
+        if len(self.paths) < 2:
+            return (None, None, 0)
+        counts = self.subset_counts(subset_cps)
+        high, low = counts.max(), counts.min()
+        diff = int(high - low)
+        if not diff:
+            return (None, None, 0)
+        first = int(np.flatnonzero((counts == high) | (counts == low))[0])
+        other = low if counts[first] == high else high
+        second = int(np.flatnonzero(counts[first + 1:] == other)[0]) + first + 1
+        return (self.paths[first], self.paths[second], diff)
+
+    def gaps(self):
+        """Return {path: sorted list of codepoints which other fonts in the
+        collection support but this font doesn't}."""
+        return {
+            path: self.codepoints[~row].tolist()
+            for path, row in zip(self.paths, self.matrix)
+        }
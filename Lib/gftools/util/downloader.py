@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# Copyright 2020 The Google Font Tools Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Download many files concurrently.
+
+A Downloader shares one requests.Session between a bounded pool of
+threads, so connections to a host are reused instead of opening a new
+one per file. Requests which fail with a connection error or a
+retryable status code (429 and 5xx) are retried with exponential
+backoff, and each host is sent at most a few requests at once.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import os
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+
+
+log = logging.getLogger(__name__)
+
+
+__all__ = ["Downloader"]
+
+
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+
+class Downloader:
+    """Concurrent downloader with connection pooling and retries.
+
+    Args:
+        max_workers: number of downloads in flight at once.
+        per_host: number of downloads in flight to a single host.
+        retries: number of times a failed request is retried.
+        backoff: seconds to wait before the first retry. The wait doubles
+            with each retry.
+        timeout: seconds to wait for the server to respond.
+        session: requests.Session to use, e.g one with auth headers.
+    """
+
+    def __init__(
+        self,
+        max_workers=8,
+        per_host=4,
+        retries=3,
+        backoff=0.5,
+        timeout=60,
+        session=None,
+    ):
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+        self._hosts = {}
+        self._hosts_lock = threading.Lock()
+
+    def _host_slot(self, url):
+        host = urlparse(url).netloc
+        with self._hosts_lock:
+            if host not in self._hosts:
+                self._hosts[host] = threading.BoundedSemaphore(self.per_host)
+            return self._hosts[host]
+
+    def _retry_delay(self, attempt, response=None):
+        delay = self.backoff * 2 ** attempt
+        retry_after = response is not None and response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(int(retry_after), 60))
+        return delay
+
+    def get(self, url):
+        """GET a url, retrying failures, and return the streamed response.
+
+        Raises:
+            requests.RequestException: if the request still fails after
+                the retries.
+        """
+        attempt = 0
+        while True:
+            try:
+                response = self.session.get(url, stream=True, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.retries:
+                    raise
+                delay = self._retry_delay(attempt)
+                log.debug("Retrying %s in %ss: %s", url, delay, e)
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                    response.raise_for_status()
+                    return response
+                delay = self._retry_delay(attempt, response)
+                log.debug("Retrying %s in %ss: %s", url, delay, response.status_code)
+                response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def fetch(self, url, dst_path):
+        """Download a url to dst_path and return dst_path.
+
+        The file is written to a temporary file next to dst_path first, so
+        a failed download never leaves a partial file behind.
+        """
+        with self._host_slot(url):
+            response = self.get(url)
+            fd, tmp_path = tempfile.mkstemp(
+                dir=os.path.dirname(dst_path) or ".", prefix=".tmp-"
+            )
+            try:
+                with response, os.fdopen(fd, "wb") as tmp:
+                    for chunk in response.iter_content(chunk_size=1024 * 1024):
+                        tmp.write(chunk)
+                os.replace(tmp_path, dst_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        return dst_path
+
+    def download(self, jobs):
+        """Download files concurrently.
+
+        Args:
+            jobs: list of (url, dst_path) tuples. The parent dirs of the
+                dst paths must exist.
+
+        Returns:
+            list of the dst paths, in the order of jobs.
+
+        Raises:
+            requests.RequestException: the first failed download, once the
+                other downloads have finished.
+        """
+        jobs = list(jobs)
+        if not jobs:
+            return []
+        workers = min(self.max_workers, len(jobs))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(self.fetch, url, dst) for url, dst in jobs]
+        return [f.result() for f in futures]
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# Copyright 2020 The Google Font Tools Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""On-disk cache of the font families downloaded from Google Fonts.
+
+Fonts are stored once by the sha256 of their contents, so families and
+runs which download the same file share it. Each family has a small JSON
+index listing its files and when it was downloaded:
+
+    gf-families/
+        blobs/ab/ab12...ef
+        families/open-sans.json
+
+A family is downloaded again once its index is older than the TTL. Once
+the blobs take up more than the size limit, the least recently used
+families are evicted.
+
+The TTL (in seconds) and the size limit (in MB) can be set with the
+GFTOOLS_FAMILY_CACHE_TTL and GFTOOLS_FAMILY_CACHE_MB environment
+variables. See gftools.util.cache for where the cache lives.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from urllib.parse import quote
+from zipfile import BadZipFile, ZipFile
+import requests
+from gftools.util import cache as disk_cache
+
+
+log = logging.getLogger(__name__)
+
+
+__all__ = ["FamilyCache", "default_cache"]
+
+
+DOWNLOAD_URL = "https://fonts.google.com/download?family={}"
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_MAX_MB = 2048
+
+
+def _env_number(name, default):
+    value = os.environ.get(name)
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        log.warning("Ignoring %s=%r, it isn't a number", name, value)
+        return default
+
+
+def _slug(family):
+    return re.sub(r"[^a-z0-9]+", "-", family.lower()).strip("-")
+
+
+class FamilyCache:
+    """Content-addressed cache of Google Fonts family downloads.
+
+    Args:
+        root: cache directory.
+        ttl: seconds after which a family is downloaded again. Defaults to
+            $GFTOOLS_FAMILY_CACHE_TTL or one day.
+        max_size: size limit of the cached fonts in bytes. Defaults to
+            $GFTOOLS_FAMILY_CACHE_MB or 2GB.
+        url: download url template, formatted with the quoted family name.
+    """
+
+    def __init__(self, root, ttl=None, max_size=None, url=DOWNLOAD_URL):
+        self.root = root
+        self.ttl = ttl if ttl is not None else _env_number(
+            "GFTOOLS_FAMILY_CACHE_TTL", DEFAULT_TTL
+        )
+        if max_size is None:
+            max_size = _env_number("GFTOOLS_FAMILY_CACHE_MB", DEFAULT_MAX_MB) * 1024 * 1024
+        self.max_size = max_size
+        self.url = url
+        self.blobs_dir = os.path.join(root, "blobs")
+        self.families_dir = os.path.join(root, "families")
+        os.makedirs(self.blobs_dir, exist_ok=True)
+        os.makedirs(self.families_dir, exist_ok=True)
+
+    def _index_path(self, family):
+        return os.path.join(self.families_dir, _slug(family) + ".json")
+
+    def _blob_path(self, digest):
+        return os.path.join(self.blobs_dir, digest[:2], digest)
+
+    def _read_index(self, family):
+        path = self._index_path(family)
+        try:
+            with open(path, encoding="utf-8") as doc:
+                index = json.load(doc)
+        except (OSError, ValueError):
+            return None
+        if index.get("family") != family:
+            return None
+        if not all(os.path.isfile(self._blob_path(f["sha256"])) for f in index["files"]):
+            return None
+        return index
+
+    def _is_fresh(self, index):
+        return time.time() - index["fetched"] < self.ttl
+
+    def fonts(self, family):
+        """Return the fonts of a family, downloading it if it isn't cached
+        or its cache entry has expired.
+
+        Returns:
+            list of (path in the family zip, path to the cached font)
+            tuples.
+        """
+        index = self._read_index(family)
+        if index is None or not self._is_fresh(index):
+            try:
+                index = self._download(family)
+            except (requests.RequestException, OSError, BadZipFile) as e:
+                if index is None:
+                    raise
+                log.warning(
+                    "Couldn't update %s, using the cached copy: %s", family, e
+                )
+            else:
+                self.evict(keep=family)
+        # The index mtime records when the family was last used
+        try:
+            os.utime(self._index_path(family))
+        except OSError:
+            pass
+        return [(f["name"], self._blob_path(f["sha256"])) for f in index["files"]]
+
+    def _download(self, family):
+        url = self.url.format(quote(family))
+        log.debug("Downloading %s", url)
+        files = []
+        with tempfile.TemporaryFile() as zip_file:
+            with requests.get(url, stream=True) as request:
+                request.raise_for_status()
+                for chunk in request.iter_content(chunk_size=1024 * 1024):
+                    zip_file.write(chunk)
+            zip_file.seek(0)
+            try:
+                with ZipFile(zip_file) as fonts_zip:
+                    for name in fonts_zip.namelist():
+                        if name.endswith(".ttf"):
+                            files.append(self._add_blob(fonts_zip, name))
+            except BadZipFile:
+                # A corrupt or truncated download, drop the fonts it added
+                # which no cached family uses
+                used = set().union(*(i[2] for i in self._indexes()))
+                for f in files:
+                    if f["sha256"] not in used:
+                        try:
+                            os.remove(self._blob_path(f["sha256"]))
+                        except OSError:
+                            pass
+                raise
+        index = {"family": family, "fetched": time.time(), "files": files}
+        disk_cache.write_atomic(
+            self._index_path(family), json.dumps(index).encode("utf-8")
+        )
+        return index
+
+    def _add_blob(self, fonts_zip, name):
+        sha256 = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=self.blobs_dir, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as tmp, fonts_zip.open(name) as member:
+                for chunk in iter(lambda: member.read(1024 * 1024), b""):
+                    sha256.update(chunk)
+                    tmp.write(chunk)
+            digest = sha256.hexdigest()
+            blob_path = self._blob_path(digest)
+            if os.path.isfile(blob_path):
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                os.replace(tmp_path, blob_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return {"name": name, "sha256": digest, "size": os.path.getsize(blob_path)}
+
+    def _indexes(self):
+        """Return [(mtime, path, set of digests)] of the cached families,
+        least recently used first."""
+        indexes = []
+        for filename in os.listdir(self.families_dir):
+            path = os.path.join(self.families_dir, filename)
+            if not filename.endswith(".json"):
+                continue
+            try:
+                with open(path, encoding="utf-8") as doc:
+                    digests = set(f["sha256"] for f in json.load(doc)["files"])
+                mtime = os.path.getmtime(path)
+            except (OSError, ValueError, KeyError):
+                continue
+            indexes.append((mtime, path, digests))
+        return sorted(indexes)
+
+    def _blobs(self):
+        blobs = {}
+        for dirpath, _, filenames in os.walk(self.blobs_dir):
+            for filename in filenames:
+                if filename.startswith(".tmp-"):
+                    continue
+                blobs[filename] = os.path.getsize(os.path.join(dirpath, filename))
+        return blobs
+
+    def size(self):
+        """Return the total size of the cached fonts in bytes."""
+        return sum(self._blobs().values())
+
+    def evict(self, keep=None):
+        """Remove the least recently used families until the cache fits in
+        max_size, along with the fonts no other family uses.
+
+        Args:
+            keep: name of a family which must not be evicted, e.g the one
+                which was just downloaded.
+        """
+        keep_path = keep and self._index_path(keep)
+        blobs = self._blobs()
+        indexes = self._indexes()
+        total = sum(blobs.values())
+        evicted = set()
+        while total > self.max_size:
+            victims = [i for i in indexes if i[1] != keep_path]
+            if not victims:
+                break
+            victim = victims[0]
+            indexes.remove(victim)
+            evicted |= victim[2]
+            log.debug("Evicting %s from the family cache", victim[1])
+            try:
+                os.remove(victim[1])
+            except OSError:
+                pass
+            used = set().union(*(i[2] for i in indexes))
+            total = sum(size for digest, size in blobs.items() if digest in used)
+        # Only remove fonts of evicted families, other fonts which aren't in
+        # an index may belong to a family another process is downloading
+        used = set().union(*(i[2] for i in indexes))
+        for digest in evicted - used:
+            try:
+                os.remove(self._blob_path(digest))
+            except OSError:
+                pass
+
+
+def default_cache():
+    """Return the FamilyCache in the gftools cache dir, or None if caching
+    is disabled."""
+    root = disk_cache.cache_dir("gf-families")
+    if root is None:
+        return None
+    return FamilyCache(root)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# Copyright 2020 The Google Font Tools Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Index of the families served by the Google Fonts developer API.
+
+The API response is stored by gftools.util.http_cache. Once the stored
+copy is older than max_age, it is revalidated with a conditional
+request, so an unchanged list isn't downloaded again. Indexes are also
+kept in memory, so a process which checks many families makes a single
+request.
+
+Families are looked up by their exact name, as the API spells it.
+"""
+import requests
+from gftools.util import http_cache
+
+
+__all__ = [
+    "FamilyIndexError",
+    "FamilyIndex",
+    "load_family_index",
+]
+
+
+API_URL = "https://www.googleapis.com/webfonts/v1/webfonts?key={}"
+# Seconds a stored API response is used without revalidating it
+DEFAULT_MAX_AGE = 10 * 60
+
+
+class FamilyIndexError(Exception):
+    """Raised when the API list of families can't be loaded."""
+
+
+class FamilyIndex:
+    """Google Fonts API families keyed by family name.
+
+    Args:
+        items: the "items" of a webfonts API response, dicts with "family",
+            "variants", "subsets", "category" and "files" keys.
+    """
+
+    def __init__(self, items):
+        self.items = list(items)
+        self._families = {item["family"]: item for item in self.items}
+        self._variants = {}
+
+    def __len__(self):
+        return len(self._families)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __contains__(self, family):
+        return family in self._families
+
+    def get(self, family, default=None):
+        """Return the API item of a family, or default if it isn't on
+        Google Fonts."""
+        return self._families.get(family, default)
+
+    def variants(self, family):
+        """Return the set of a family's variants, e.g {"regular", "700italic"}."""
+        if family not in self._variants:
+            item = self._families.get(family)
+            self._variants[family] = frozenset(item["variants"] if item else ())
+        return self._variants[family]
+
+    def has_variant(self, family, variant):
+        return variant in self.variants(family)
+
+
+def _api_error(response):
+    try:
+        error = response.json()["error"]
+    except (ValueError, KeyError, TypeError):
+        return f"Google Fonts API request failed with status {response.status_code}"
+    try:
+        if error["errors"][0]["reason"] == "keyInvalid":
+            return "The Google Fonts API key was rejected as being invalid"
+    except (KeyError, IndexError, TypeError):
+        pass
+    return f"There were errors in the Google Fonts API request: {error}"
+
+
+def _fetch_items(url, max_age):
+    try:
+        response = http_cache.default_session().get(
+            url, max_age=max_age, stale_if_error=True
+        )
+    except requests.RequestException as e:
+        raise FamilyIndexError(f"Couldn't load the Google Fonts family list: {e}")
+    if not response.ok:
+        raise FamilyIndexError(_api_error(response))
+    try:
+        return response.json()["items"]
+    except (ValueError, KeyError):
+        raise FamilyIndexError(
+            "Unable to load and parse list of families from Google Fonts API"
+        )
+
+
+_indexes = {}
+
+
+def load_family_index(api_key, url=API_URL, max_age=DEFAULT_MAX_AGE):
+    """Return the FamilyIndex of the families on Google Fonts.
+
+    Args:
+        api_key: Google Fonts developer API key.
+        url: API url template, formatted with the key.
+        max_age: seconds a stored API response is used without asking the
+            API whether it has changed.
+
+    Raises:
+        FamilyIndexError: if the API rejects the request, or it fails and
+            there is no stored response.
+    """
+    url = url.format(api_key)
+    if url not in _indexes:
+        _indexes[url] = FamilyIndex(_fetch_items(url, max_age))
+    return _indexes[url]
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# Copyright 2020 The Google Font Tools Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Small descriptions of font files.
+
+A FontDescriptor holds a font's path and the few values needed to find
+its family and instances: its family names, OS/2.usWeightClass and fvar
+instances. These are read the first time they are used, by mapping the
+font into memory and decompiling only the name, OS/2 and fvar tables.
+The font isn't kept open, so many fonts can be described at once, and
+the tools which need the whole font open it themselves.
+"""
+from collections import namedtuple
+import mmap
+import os
+from fontTools.ttLib import TTFont
+
+
+__all__ = ["FontInstance", "FontDescriptor", "describe_fonts"]
+
+
+FontInstance = namedtuple("FontInstance", "name coordinates")
+FontInstance.__doc__ = """A named instance of a variable font.
+
+name is the instance's subfamily name, e.g "Bold Italic", or None if the
+name table has no Windows English record for it. coordinates is a dict of
+{axis tag: value}."""
+
+
+def _name(ttfont, name_id):
+    record = ttfont["name"].getName(name_id, 3, 1, 1033)
+    return record.toUnicode() if record else None
+
+
+class FontDescriptor:
+    """Path and metadata of a font file.
+
+    Args:
+        path: path of a ttf or otf file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._info = None
+
+    def __repr__(self):
+        return "<FontDescriptor {}>".format(self.path)
+
+    def _load(self):
+        if self._info is not None:
+            return self._info
+        with open(self.path, "rb") as doc, \
+                mmap.mmap(doc.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            ttfont = TTFont(data, lazy=True)
+            info = {
+                "family_name": _name(ttfont, 1),
+                "typo_family_name": _name(ttfont, 16),
+                "weight_class": ttfont["OS/2"].usWeightClass if "OS/2" in ttfont else None,
+                "instances": [],
+                "is_variable": "fvar" in ttfont,
+            }
+            if info["is_variable"]:
+                info["instances"] = [
+                    FontInstance(_name(ttfont, i.subfamilyNameID), dict(i.coordinates))
+                    for i in ttfont["fvar"].instances
+                ]
+            ttfont.close()
+        self._info = info
+        return info
+
+    @property
+    def filename(self):
+        return os.path.basename(self.path)
+
+    @property
+    def is_variable(self):
+        return self._load()["is_variable"]
+
+    @property
+    def family_name(self):
+        """Typographic family name, or the family name if there is none."""
+        info = self._load()
+        return info["typo_family_name"] or info["family_name"]
+
+    @property
+    def weight_class(self):
+        return self._load()["weight_class"]
+
+    @property
+    def instances(self):
+        """List of FontInstance, empty for a static font."""
+        return list(self._load()["instances"])
+
+
+def describe_fonts(paths):
+    """Return a FontDescriptor for each ttf and otf path."""
+    return [FontDescriptor(p) for p in paths if p.endswith((".ttf", ".otf"))]
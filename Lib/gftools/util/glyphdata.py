@@ -23,9 +23,11 @@ from __future__ import (print_function,
                         absolute_import,
                         unicode_literals)
 import os
+import marshal
 import xml.etree.ElementTree as etree
 from collections import namedtuple
-from pkg_resources import resource_filename
+from gftools.util import cache as disk_cache
+from gftools.util.resources import resource_path
 
 # Data tables which we put into the generated Python file.
 # See comments in generate_python_source() below for documentation.
@@ -41,13 +43,20 @@ GlyphInfo = namedtuple('GlyphInfo', [
   , 'unicode'
 ])
 
+GLYPHDATA_FILES = ("GlyphData.xml", "GlyphData_Ideographs.xml")
+
+# Bump when the layout of the compiled glyph data changes
+_COMPILED_VERSION = 1
+
+
+def _glyphdata_paths():
+    return [resource_path("gftools.util", "GlyphsInfo", f)
+            for f in GLYPHDATA_FILES]
+
 
 def _fetch_all_glyphs():
     glyphs = {}
-    for filename in ("GlyphData.xml", "GlyphData_Ideographs.xml"):
-        full_filename = resource_filename("gftools.util",
-                                          os.path.join('GlyphsInfo',
-                                                       filename))
+    for full_filename in _glyphdata_paths():
         for glyph in etree.parse(full_filename).findall("glyph"):
             glyphName = glyph.attrib["name"]
             assert glyphName not in glyphs, "multiple entries for " + glyphName
@@ -55,19 +64,93 @@ def _fetch_all_glyphs():
     return glyphs
 
 
+def _compile_glyphs(glyphs):
+    """Flatten the parsed xml into three parallel columns of names,
+    production names and codepoints (-1 if unencoded)."""
+    names, prodnames, unicodes = [], [], []
+    for name, glyph in glyphs.items():
+        unistr = glyph.get("unicode")
+        names.append(name)
+        prodnames.append(glyph.get("production", name))
+        unicodes.append(int(unistr, 16) if unistr else -1)
+    return tuple(names), tuple(prodnames), tuple(unicodes)
+
+
 def _build_data(glyphs):
+    return _build_data_from_columns(*_compile_glyphs(glyphs))
+
+
+def _build_data_from_columns(names, prodnames, unicodes):
     by_name = {}
     by_unicode = {}
     by_prodname = {}
-    for name, glyph in glyphs.items():
-        prodname = glyph.get("production", name)
-        unistr = glyph.get("unicode")
-        charcode = int(unistr, 16) if unistr else None
+    for name, prodname, charcode in zip(names, prodnames, unicodes):
+        if charcode < 0:
+            charcode = None
         glyphInfo = GlyphInfo(name, prodname, charcode)
         by_name[name] = glyphInfo
-        if unistr is not None:
+        if charcode is not None:
             by_unicode[charcode] = glyphInfo
         by_prodname[prodname] = glyphInfo
     return GlyphData(by_name, by_unicode, by_prodname)
 
-DATA = _build_data(_fetch_all_glyphs())
+
+def _load_columns():
+    """Return the compiled glyph data columns.
+
+    The columns are stored with marshal in the gftools cache dir and
+    compiled again from the xml files whenever one of them changes.
+    """
+    paths = _glyphdata_paths()
+    stamps = tuple(disk_cache.file_stamp(p) for p in paths)
+    cache_dir = disk_cache.cache_dir("glyphdata")
+    cache_path = cache_dir and os.path.join(cache_dir, "glyphdata.bin")
+    if cache_path:
+        try:
+            with open(cache_path, "rb") as f:
+                version, cached_paths, cached_stamps, columns = marshal.load(f)
+            if (version, cached_paths, cached_stamps) == (
+                    _COMPILED_VERSION, tuple(paths), stamps):
+                return columns
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+    columns = _compile_glyphs(_fetch_all_glyphs())
+    if cache_path:
+        disk_cache.write_atomic(cache_path, marshal.dumps(
+            (_COMPILED_VERSION, tuple(paths), stamps, columns)))
+    return columns
+
+
+class _LazyGlyphData(object):
+    """Stands in for the GlyphData tuple until it is first used, so
+    importing this module doesn't load the glyph data."""
+
+    def __init__(self):
+        self._data = None
+
+    def _load(self):
+        if self._data is None:
+            self._data = _build_data_from_columns(*_load_columns())
+        return self._data
+
+    def __getattr__(self, attr):
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+        return getattr(self._load(), attr)
+
+    def __getitem__(self, index):
+        return self._load()[index]
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(GlyphData._fields)
+
+    def __repr__(self):
+        if self._data is None:
+            return '<GlyphData (not loaded)>'
+        return '<GlyphData with %d glyphs>' % len(self._data.by_name)
+
+
+DATA = _LazyGlyphData()
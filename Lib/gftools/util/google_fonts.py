@@ -29,15 +29,17 @@ fonts/tools$ python util/google_fonts.py --nam_dir encodings/
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import array
 import codecs
 import collections
 import contextlib
 import errno
+import hashlib
+import marshal
 import os
 import re
 import sys
 import unittest
-from pkg_resources import resource_filename
 from warnings import warn
 
 if __name__ == '__main__':
@@ -49,13 +51,17 @@ import gftools.fonts_public_pb2 as fonts_pb2
 from fontTools import ttLib
 from absl import flags
 from gftools.util import py_subsets
+from gftools.util import cache as disk_cache
+from gftools.util import cmap_reader
+from gftools.util.rangeset import RangeSet
+from gftools.util.resources import resource_path
 from absl import app
 from google.protobuf import text_format
 
 
 FLAGS = flags.FLAGS
 flags.DEFINE_string('nam_dir',
-                    resource_filename("gftools", "encodings"), 'nam file dir')
+                    resource_path("gftools", "encodings"), 'nam file dir')
 
 # See https://www.microsoft.com/typography/otspec/name.htm.
 NAME_COPYRIGHT = 0
@@ -230,6 +236,99 @@ def Metadata(file_or_dir):
   return msg
 
 
+class SubsetIndex(object):
+  """Maps codepoints to the subsets whose unique-glyphs file lists them.
+
+  Each codepoint is stored with a bitmask in which bit i is set if the
+  codepoint belongs to the i-th subset. The namelist files are read once,
+  when the index is built, so lookups don't touch the disk.
+  """
+
+  def __init__(self, subsets, codepoints_for_subset):
+    """Builds the index.
+
+    Args:
+      subsets: Ordered names of the subsets to index, e.g. ListSubsets().
+      codepoints_for_subset: A function returning the set of codepoints of a
+        subset or None if the subset has no codepoint file.
+    """
+    self.subsets = tuple(subsets)
+    self._bits = {}
+    self._sizes = {}
+    self._masks = {}
+    self._mask_subsets = {0: ()}
+    for bit, subset in enumerate(self.subsets):
+      cps = codepoints_for_subset(subset)
+      if not cps:
+        continue
+      flag = 1 << bit
+      self._bits[subset] = flag
+      self._sizes[subset] = len(cps)
+      masks = self._masks
+      for cp in cps:
+        masks[cp] = masks.get(cp, 0) | flag
+
+  def Size(self, subset):
+    """Returns the number of codepoints in subset, 0 if it is unknown."""
+    return self._sizes.get(subset, 0)
+
+  def Codepoints(self, subset):
+    """Returns the set of codepoints in subset."""
+    flag = self._bits.get(subset, 0)
+    return set(cp for cp, mask in self._masks.items() if mask & flag)
+
+  def Mask(self, cp):
+    """Returns the subset bitmask of cp, 0 if it is in no subset."""
+    return self._masks.get(cp, 0)
+
+  def SubsetsForMask(self, mask):
+    """Returns the tuple of subset names encoded in mask, in subset order."""
+    subsets = self._mask_subsets.get(mask)
+    if subsets is None:
+      subsets = tuple(s for bit, s in enumerate(self.subsets)
+                      if mask & (1 << bit))
+      self._mask_subsets[mask] = subsets
+    return subsets
+
+  def SubsetsForCodepoint(self, cp):
+    return self.SubsetsForMask(self.Mask(cp))
+
+  def SubsetsForCodepoints(self, cps):
+    """Groups codepoints by the subsets they belong to.
+
+    Args:
+      cps: An iterable of int codepoints.
+    Returns:
+      An OrderedDict of subset name => set of the given codepoints in that
+      subset. Subsets none of the codepoints belong to are omitted.
+    """
+    by_mask = collections.defaultdict(set)
+    masks = self._masks
+    for cp in cps:
+      mask = masks.get(cp)
+      if mask:
+        by_mask[mask].add(cp)
+    by_subset = {}
+    for mask, mask_cps in by_mask.items():
+      for subset in self.SubsetsForMask(mask):
+        by_subset.setdefault(subset, set()).update(mask_cps)
+    return collections.OrderedDict(
+        (s, by_subset[s]) for s in self.subsets if s in by_subset)
+
+
+_subset_indexes = {}
+def GetSubsetIndex():
+  """Returns the SubsetIndex for --nam_dir, building it on first use."""
+  enc_path = os.path.expanduser(FLAGS.nam_dir)
+  index = _subset_indexes.get(enc_path)
+  if index is None:
+    index = SubsetIndex(
+        ListSubsets(),
+        lambda subset: CodepointsInSubset(subset, unique_glyphs=True))
+    _subset_indexes[enc_path] = index
+  return index
+
+
 def SubsetsForCodepoint(cp):
   """Returns all the subsets that contains cp or [].
 
@@ -238,14 +337,19 @@ def SubsetsForCodepoint(cp):
   Returns:
     List of lowercase names of subsets or [] if none match.
   """
-  subsets = []
-  for subset in ListSubsets():
-    cps = CodepointsInSubset(subset, unique_glyphs=True)
-    if not cps:
-      continue
-    if cp in cps:
-      subsets.append(subset)
-  return subsets
+  return list(GetSubsetIndex().SubsetsForCodepoint(cp))
+
+
+def SubsetsForCodepoints(cps):
+  """Returns the subsets covered by a collection of codepoints.
+
+  Args:
+    cps: An iterable of int codepoints, e.g. the result of CodepointsInFont.
+  Returns:
+    An OrderedDict of lowercase subset name => set of the codepoints from cps
+    in that subset. Subsets without any of the codepoints are omitted.
+  """
+  return GetSubsetIndex().SubsetsForCodepoints(cps)
 
 
 def SubsetForCodepoint(cp):
@@ -275,12 +379,13 @@ def SubsetForCodepoint(cp):
   return result
 
 
-def CodepointsInSubset(subset, unique_glyphs=False):
+def CodepointsInSubset(subset, unique_glyphs=False, as_ranges=False):
   """Returns the set of codepoints contained in a given subset.
 
   Args:
     subset: The lowercase name of a subset, e.g. latin.
     unique_glyphs: Optional, whether to only include glyphs unique to subset.
+    as_ranges: Optional, whether to return a RangeSet instead of a set.
   Returns:
     A set containing the glyphs in the subset.
   """
@@ -296,30 +401,35 @@ def CodepointsInSubset(subset, unique_glyphs=False):
 
   cps = set()
   for filename in filenames:
-    with codecs.open(filename, encoding='utf-8') as f:
-      for line in f:
-        if not line.startswith('#'):
-          match = _NAMELIST_CODEPOINT_REGEX.match(line[2:7])
-          if match is not None:
-            cps.add(int(match.groups()[0], 16))
+    cps |= ParseNamelistCached(filename)[0]
 
+  if as_ranges:
+    return RangeSet(cps)
   return cps
 
 
-def CodepointsInFont(font_filename):
+def CodepointsInFont(font_filename, as_ranges=False):
   """Returns the set of codepoints present in the font file specified.
 
   Args:
     font_filename: The name of a font file.
+    as_ranges: Optional, whether to return a RangeSet instead of a set.
   Returns:
     A set of integers, each representing a codepoint present in font.
   """
+  # Only the cmap is needed, read it without building a TTFont if we can
+  try:
+    return cmap_reader.codepoints_in_cmap(font_filename, as_ranges=as_ranges)
+  except cmap_reader.UnsupportedFontError:
+    pass
 
   font_cps = set()
   with contextlib.closing(ttLib.TTFont(font_filename)) as font:
     for t in UnicodeCmapTables(font):
       font_cps.update(t.cmap.keys())
 
+  if as_ranges:
+    return RangeSet(font_cps)
   return font_cps
 
 
@@ -392,26 +502,27 @@ def SubsetsInFont(file_path, min_pct, ext_min_pct=None):
   Returns:
     A list of 3-tuples of (subset name, #supported, #in subset).
   """
-  all_cps = CodepointsInFont(file_path)
+  index = GetSubsetIndex()
+  font_subsets = index.SubsetsForCodepoints(CodepointsInFont(file_path))
 
   results = []
   for subset in ListSubsets():
-    subset_cps = CodepointsInSubset(subset, unique_glyphs=True)
-    if not subset_cps:
+    subset_size = index.Size(subset)
+    if not subset_size:
       continue
+    overlap = font_subsets.get(subset, set())
 
     # Khmer includes latin but we only want to report support for non-Latin.
     if subset == 'khmer':
-      subset_cps -= CodepointsInSubset('latin')
-
-    overlap = all_cps & subset_cps
+      overlap = overlap - font_subsets.get('latin', set())
+      subset_size = len(index.Codepoints(subset) - index.Codepoints('latin'))
 
     target_pct = min_pct
     if ext_min_pct is not None and subset.endswith('-ext'):
       target_pct = ext_min_pct
 
-    if 100.0 * len(overlap) / len(subset_cps) > target_pct:
-      results.append((subset, len(overlap), len(subset_cps)))
+    if 100.0 * len(overlap) / subset_size > target_pct:
+      results.append((subset, len(overlap), subset_size))
 
   return results
 
@@ -756,6 +867,70 @@ def ParseNamelist(filename):
     return _ParseNamelist(nam_file)
 
 
+# Bump when the layout of the compiled namelist entries changes
+_NAMELIST_CACHE_VERSION = 1
+
+
+def _NamelistCachePath(filename):
+  cache_dir = disk_cache.cache_dir('namelists')
+  if cache_dir is None:
+    return None
+  key = hashlib.sha1(filename.encode('utf-8')).hexdigest()
+  return os.path.join(cache_dir, key + '.bin')
+
+
+def _LoadCompiledNamelist(cache_path, filename, stamp):
+  try:
+    with open(cache_path, 'rb') as f:
+      entry = marshal.load(f)
+  except (OSError, EOFError, ValueError, TypeError):
+    return None
+  if not isinstance(entry, tuple) or entry[:3] != (
+      _NAMELIST_CACHE_VERSION, filename, stamp):
+    return None
+  _, _, _, packed_cps, header_lines, includes, noncodes = entry
+  cps = array.array('I')
+  cps.frombytes(packed_cps)
+  header = {'lines': list(header_lines), 'includes': set(includes)}
+  return set(cps), header, set(noncodes)
+
+
+def _DumpCompiledNamelist(cache_path, filename, stamp, parsed):
+  cps, header, noncodes = parsed
+  entry = (_NAMELIST_CACHE_VERSION, filename, stamp,
+           array.array('I', sorted(cps)).tobytes(),
+           tuple(header['lines']), tuple(sorted(header['includes'])),
+           tuple(sorted(noncodes)))
+  disk_cache.write_atomic(cache_path, marshal.dumps(entry))
+
+
+def ParseNamelistCached(filename):
+  """Parse a given Namelist file, using the compiled namelist cache.
+
+  The result of ParseNamelist is stored on disk, keyed by the path, mtime and
+  size of the file, so the text is only parsed again once the file changes.
+  Included files have entries of their own, so editing a file only
+  invalidates that file; the files including it are resolved from their
+  still valid entries.
+
+  Args:
+    filename: The path to the Namelist file.
+
+  Returns:
+    The same tuple as ParseNamelist.
+  """
+  filename = os.path.abspath(filename)
+  cache_path = _NamelistCachePath(filename)
+  if cache_path is None:
+    return ParseNamelist(filename)
+  stamp = disk_cache.file_stamp(filename)
+  parsed = _LoadCompiledNamelist(cache_path, filename, stamp)
+  if parsed is None:
+    parsed = ParseNamelist(filename)
+    _DumpCompiledNamelist(cache_path, filename, stamp, parsed)
+  return parsed
+
+
 def _LoadNamelistIncludes(item, unique_glyphs, cache):
   """Load the includes of an encoding Namelist files.
 
@@ -806,7 +981,7 @@ def _ReadNameList(cache, filename, unique_glyphs):
   if filename in cache:
     item = cache[filename]
   else:
-    cps, header, noncodes = ParseNamelist(filename)
+    cps, header, noncodes = ParseNamelistCached(filename)
     item = {
         'fileName': filename,
         'ownCharset': cps,
@@ -899,7 +1074,8 @@ def ReadNameList(nam_filename, unique_glyphs=False, cache=None):
                                   unique_glyphs)
 
 
-def CodepointsInNamelist(nam_filename, unique_glyphs=False, cache=None):
+def CodepointsInNamelist(nam_filename, unique_glyphs=False, cache=None,
+                         as_ranges=False):
   """Returns the set of codepoints contained in a given Namelist file.
 
   This is a replacement CodepointsInSubset and implements the "#$ include"
@@ -909,12 +1085,15 @@ def CodepointsInNamelist(nam_filename, unique_glyphs=False, cache=None):
     nam_filename: The path to the  Namelist file.
     unique_glyphs: Optional, whether to only include glyphs unique to subset.
     cache: Optional, a dict used to cache loaded Namelist files.
+    as_ranges: Optional, whether to return a RangeSet instead of a set.
 
   Returns:
     A set containing the glyphs in the subset.
   """
   key = 'charset' if not unique_glyphs else 'ownCharset'
   result = ReadNameList(nam_filename, unique_glyphs, cache)
+  if as_ranges:
+    return RangeSet(result[key])
   return result[key]
 
 
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# Copyright 2020 The Google Font Tools Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""HTTP requests with an on-disk response cache and rate limiting.
+
+Responses are stored in the gftools cache dir. A stored response is
+returned as is while it is younger than the max_age of the request, and
+revalidated with If-None-Match/If-Modified-Since after that. GitHub
+doesn't count 304 Not Modified responses against the rate limit, so
+repeated runs over the same PR or repo mostly cost nothing.
+
+Requests to each host go through a RateLimiter, which caps how many are
+in flight at once. It also reads the X-RateLimit-* headers of the
+responses, and once a host's limit is used up, callers wait for the
+limit to reset instead of failing.
+"""
+from contextlib import contextmanager
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from urllib.parse import urlparse
+import requests  # type: ignore
+from requests.structures import CaseInsensitiveDict  # type: ignore
+from gftools.util import cache as disk_cache
+
+
+log = logging.getLogger(__name__)
+
+
+__all__ = ["RateLimiter", "CachedSession", "default_session"]
+
+
+class RateLimiter:
+    """Schedule requests to hosts within their rate limits.
+
+    Args:
+        max_concurrent: number of requests in flight to a single host.
+        reserve: once a host has this many requests left, wait for its
+            limit to reset before sending more.
+        max_wait: longest time in seconds to wait for a limit to reset.
+            Callers which would have to wait longer go ahead and get the
+            host's error instead.
+    """
+
+    def __init__(self, max_concurrent=4, reserve=0, max_wait=15 * 60):
+        self.max_concurrent = max_concurrent
+        self.reserve = reserve
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._slots = {}
+        # {host: (requests remaining, epoch seconds when the limit resets)}
+        self._limits = {}
+
+    def _wait_time(self, host):
+        with self._lock:
+            remaining, reset = self._limits.get(host, (None, None))
+        if remaining is None or remaining > self.reserve:
+            return 0
+        wait = reset - time.time()
+        if wait <= 0:
+            return 0
+        return min(wait, self.max_wait)
+
+    @contextmanager
+    def slot(self, url):
+        """Context manager to wrap a request to url in."""
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._slots:
+                self._slots[host] = threading.BoundedSemaphore(self.max_concurrent)
+            slot = self._slots[host]
+        with slot:
+            wait = self._wait_time(host)
+            if wait:
+                log.warning("Rate limit of %s used up, waiting %ds", host, wait)
+                time.sleep(wait)
+                with self._lock:
+                    self._limits.pop(host, None)
+            yield
+
+    def update(self, url, response):
+        """Record the rate limit headers of a response.
+
+        Returns:
+            True if the request was rejected by the rate limit and should
+            be sent again.
+        """
+        host = urlparse(url).netloc
+        headers = response.headers
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        retry_after = headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            remaining, reset = 0, time.time() + int(retry_after)
+        elif remaining is not None and reset is not None:
+            try:
+                remaining, reset = int(remaining), float(reset)
+            except ValueError:
+                return False
+        else:
+            return False
+        with self._lock:
+            self._limits[host] = (remaining, reset)
+        return response.status_code in (403, 429) and remaining == 0
+
+
+def _response_from_cache(url, meta, body):
+    response = requests.Response()
+    response.status_code = meta["status"]
+    response.headers = CaseInsensitiveDict(meta["headers"])
+    response.url = url
+    response.encoding = meta.get("encoding")
+    response._content = body
+    response.from_cache = True
+    return response
+
+
+class CachedSession:
+    """requests.Session wrapper which caches responses on disk and sends
+    requests through a RateLimiter.
+
+    Args:
+        cache_name: name of the cache dir inside the gftools cache, see
+            gftools.util.cache. Responses aren't stored if caching is
+            disabled.
+        session: requests.Session to send requests with.
+        limiter: RateLimiter shared by the requests.
+    """
+
+    def __init__(self, cache_name="http", session=None, limiter=None):
+        self.root = disk_cache.cache_dir(cache_name)
+        self.session = session or requests.Session()
+        self.limiter = limiter or RateLimiter()
+
+    def _key(self, method, url, params, headers, data):
+        # Responses depend on the credentials, but the credentials shouldn't
+        # be stored, so only their hash is part of the key
+        key = json.dumps(
+            [
+                method,
+                requests.Request(method, url, params=params).prepare().url,
+                {k.lower(): v for k, v in (headers or {}).items()},
+                data,
+            ],
+            sort_keys=True,
+        )
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.root, key[:2], key)
+        return base + ".json", base + ".body"
+
+    def _load(self, key):
+        if self.root is None:
+            return None, None
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, encoding="utf-8") as doc:
+                meta = json.load(doc)
+            with open(body_path, "rb") as doc:
+                body = doc.read()
+        except (OSError, ValueError):
+            return None, None
+        return meta, body
+
+    def _store(self, key, meta, body=None):
+        if self.root is None:
+            return
+        meta_path, body_path = self._paths(key)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        if body is not None:
+            disk_cache.write_atomic(body_path, body)
+        disk_cache.write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+
+    def _send(self, method, url, **kwargs):
+        with self.limiter.slot(url):
+            response = self.session.request(method, url, **kwargs)
+        if self.limiter.update(url, response):
+            # Rate limited, the slot waits for the limit to reset
+            log.debug("%s was rate limited, sending it again", url)
+            with self.limiter.slot(url):
+                response = self.session.request(method, url, **kwargs)
+            self.limiter.update(url, response)
+        return response
+
+    def request(
+        self,
+        method,
+        url,
+        params=None,
+        headers=None,
+        json_data=None,
+        max_age=0,
+        stale_if_error=False,
+    ):
+        """Send a request, using the stored response if it is still valid.
+
+        Args:
+            method: "GET" or "POST". POST responses can't be revalidated,
+                so they are only stored if max_age is set, e.g for GraphQL
+                queries.
+            url: the url.
+            params: dict of url query parameters.
+            headers: dict of request headers.
+            json_data: JSON body of the request.
+            max_age: seconds a stored response is used without asking the
+                server whether it has changed.
+            stale_if_error: return the stored response if the server
+                can't be reached.
+
+        Returns:
+            requests.Response. Responses served from the cache have a
+            from_cache attribute set to True.
+        """
+        key = self._key(method, url, params, headers, json_data)
+        meta, body = self._load(key)
+        if meta and time.time() - meta["fetched"] < max_age:
+            return _response_from_cache(url, meta, body)
+
+        headers = dict(headers or {})
+        if meta and method == "GET":
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        try:
+            response = self._send(
+                method, url, params=params, headers=headers, json=json_data
+            )
+        except requests.RequestException as e:
+            if meta and stale_if_error:
+                log.warning("Couldn't revalidate %s, using the stored copy: %s", url, e)
+                return _response_from_cache(url, meta, body)
+            raise
+
+        if response.status_code == 304 and meta:
+            meta["fetched"] = time.time()
+            self._store(key, meta)
+            return _response_from_cache(url, meta, body)
+        if response.status_code != 200:
+            return response
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if max_age or (method == "GET" and (etag or last_modified)):
+            meta = {
+                "status": response.status_code,
+                "headers": dict(response.headers),
+                "encoding": response.encoding,
+                "etag": etag,
+                "last_modified": last_modified,
+                "fetched": time.time(),
+            }
+            self._store(key, meta, response.content)
+        response.from_cache = False
+        return response
+
+    def get(self, url, params=None, headers=None, **kwargs):
+        return self.request("GET", url, params=params, headers=headers, **kwargs)
+
+    def post(self, url, json=None, headers=None, **kwargs):
+        return self.request("POST", url, headers=headers, json_data=json, **kwargs)
+
+
+_default_session = None
+_default_session_lock = threading.Lock()
+
+
+def default_session():
+    """Return the CachedSession shared by gftools."""
+    global _default_session
+    with _default_session_lock:
+        if _default_session is None:
+            _default_session = CachedSession()
+        return _default_session
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# Copyright 2020 The Google Font Tools Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""A compact set of integers, stored as sorted ranges.
+
+Codepoint coverage is mostly made of long runs of consecutive codepoints.
+A CJK subset contains tens of thousands of codepoints but only a few
+hundred ranges, so storing the ranges instead of the ints saves a lot of
+memory and makes set maths proportional to the number of ranges.
+
+>>> a = RangeSet([0x41, 0x42, 0x43, 0x61])
+>>> a.ranges()
+[(65, 67), (97, 97)]
+>>> len(a & RangeSet.from_ranges([(0x42, 0x62)]))
+3
+"""
+from bisect import bisect_right
+from itertools import chain
+
+
+__all__ = ["RangeSet"]
+
+
+class RangeSet(object):
+    """An immutable set of ints stored as sorted, disjoint, non adjacent,
+    inclusive (start, end) ranges.
+
+    Supports the usual set operators (|, &, -, ^, <=, >=, ==, in) with
+    other RangeSets and with any iterable of ints.
+    """
+
+    __slots__ = ("_starts", "_ends", "_len")
+
+    def __init__(self, ints=()):
+        starts = []
+        ends = []
+        for i in sorted(set(ints)):
+            if ends and ends[-1] == i - 1:
+                ends[-1] = i
+            else:
+                starts.append(i)
+                ends.append(i)
+        self._set_ranges(starts, ends)
+
+    @classmethod
+    def from_ranges(cls, ranges):
+        """Build a RangeSet from (start, end) inclusive ranges. The ranges
+        may be unsorted, overlapping or adjacent."""
+        starts = []
+        ends = []
+        for start, end in sorted(ranges):
+            if start > end:
+                raise ValueError(f"Invalid range ({start}, {end})")
+            if ends and start <= ends[-1] + 1:
+                if end > ends[-1]:
+                    ends[-1] = end
+            else:
+                starts.append(start)
+                ends.append(end)
+        result = cls.__new__(cls)
+        result._set_ranges(starts, ends)
+        return result
+
+    @classmethod
+    def _coerce(cls, other):
+        if isinstance(other, RangeSet):
+            return other
+        return cls(other)
+
+    def _set_ranges(self, starts, ends):
+        self._starts = starts
+        self._ends = ends
+        self._len = sum(e - s + 1 for s, e in zip(starts, ends))
+
+    def ranges(self):
+        """Return the list of (start, end) inclusive ranges."""
+        return list(zip(self._starts, self._ends))
+
+    def to_set(self):
+        return set(self)
+
+    def __len__(self):
+        return self._len
+
+    def __bool__(self):
+        return bool(self._starts)
+
+    def __iter__(self):
+        return chain.from_iterable(
+            range(s, e + 1) for s, e in zip(self._starts, self._ends)
+        )
+
+    def __contains__(self, value):
+        idx = bisect_right(self._starts, value) - 1
+        return idx >= 0 and value <= self._ends[idx]
+
+    def __eq__(self, other):
+        if isinstance(other, RangeSet):
+            return self._starts == other._starts and self._ends == other._ends
+        if isinstance(other, (set, frozenset)):
+            return len(other) == self._len and all(i in self for i in other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((tuple(self._starts), tuple(self._ends)))
+
+    def __repr__(self):
+        ranges = ", ".join(
+            f"0x{s:04X}" if s == e else f"0x{s:04X}-0x{e:04X}"
+            for s, e in self.ranges()
+        )
+        return f"RangeSet([{ranges}])"
+
+    def union(self, *others):
+        ranges = self.ranges()
+        for other in others:
+            ranges.extend(self._coerce(other).ranges())
+        return RangeSet.from_ranges(ranges)
+
+    def intersection(self, other):
+        other = self._coerce(other)
+        result = []
+        a, b = self.ranges(), other.ranges()
+        i = j = 0
+        while i < len(a) and j < len(b):
+            start = max(a[i][0], b[j][0])
+            end = min(a[i][1], b[j][1])
+            if start <= end:
+                result.append((start, end))
+            if a[i][1] < b[j][1]:
+                i += 1
+            else:
+                j += 1
+        return RangeSet.from_ranges(result)
+
+    def difference(self, other):
+        other = self._coerce(other)
+        result = []
+        b = other.ranges()
+        j = 0
+        for start, end in self.ranges():
+            # skip ranges of other which end before this range
+            while j < len(b) and b[j][1] < start:
+                j += 1
+            k = j
+            while k < len(b) and b[k][0] <= end:
+                if b[k][0] > start:
+                    result.append((start, b[k][0] - 1))
+                start = b[k][1] + 1
+                k += 1
+            if start <= end:
+                result.append((start, end))
+        return RangeSet.from_ranges(result)
+
+    def symmetric_difference(self, other):
+        other = self._coerce(other)
+        return (self - other) | (other - self)
+
+    def issubset(self, other):
+        return not (self - other)
+
+    def issuperset(self, other):
+        return not (self._coerce(other) - self)
+
+    __or__ = __ror__ = union
+    __and__ = __rand__ = intersection
+    __sub__ = difference
+    __xor__ = __rxor__ = symmetric_difference
+    __le__ = issubset
+    __ge__ = issuperset
+
+    def __rsub__(self, other):
+        return self._coerce(other) - self
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# Copyright 2020 The Google Font Tools Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Locate the data files shipped with gftools and its version.
+
+Use this module instead of pkg_resources, which scans every installed
+distribution when it is imported. importlib.resources only looks at the
+package it is asked about.
+
+importlib.resources.files is new in Python 3.9 and importlib.metadata in
+3.8. Older Pythons find resources next to the package's __file__ and
+versions with the importlib_metadata backport.
+"""
+import atexit
+import contextlib
+import importlib
+import os
+import sys
+
+if sys.version_info >= (3, 9):
+    from importlib.resources import as_file, files
+
+
+__all__ = ["resource_path", "version"]
+
+
+_extracted = None
+
+
+def resource_path(package, *parts):
+    """Return the filesystem path of a data file or directory in a package.
+
+    Args:
+        package: name of the package holding the resource, e.g "gftools".
+        parts: path segments of the resource inside the package, e.g
+            "encodings", "latin_unique-glyphs.nam".
+
+    Returns:
+        str. gftools is installed unzipped, so this is normally the path
+        inside the package directory. If the package is in an archive, the
+        resource is extracted and removed again when the interpreter exits.
+    """
+    if sys.version_info < (3, 9):
+        return _module_resource_path(package, *parts)
+    resource = files(package)
+    for part in parts:
+        resource = resource.joinpath(part)
+    if isinstance(resource, os.PathLike):
+        return os.fspath(resource)
+    global _extracted
+    if _extracted is None:
+        _extracted = contextlib.ExitStack()
+        atexit.register(_extracted.close)
+    return os.fspath(_extracted.enter_context(as_file(resource)))
+
+
+def _module_resource_path(package, *parts):
+    # Python < 3.9 has no importlib.resources.files
+    module = importlib.import_module(package)
+    return os.path.join(os.path.dirname(module.__file__), *parts)
+
+
+def version(distribution="gftools"):
+    """Return the installed version of a distribution, or gftools'
+    build-time version if gftools isn't installed (e.g running from a
+    checkout)."""
+    if sys.version_info >= (3, 8):
+        import importlib.metadata as metadata
+    else:
+        import importlib_metadata as metadata
+
+    try:
+        return metadata.version(distribution)
+    except metadata.PackageNotFoundError:
+        if distribution != "gftools":
+            raise
+        from gftools import __version__
+
+        return __version__
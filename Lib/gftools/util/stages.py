@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# Copyright 2020 The Google Font Tools Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Run a graph of dependent stages concurrently.
+
+A stage is a function which takes no arguments. It starts once all the
+stages it depends on have finished, so stages which don't depend on each
+other run at the same time, up to a worker limit. If a stage fails or is
+skipped, the stages which depend on it are skipped.
+
+Each stage is timed. Stages run in threads, and whatever a stage logs
+from its thread can be written to a log file of its own.
+"""
+from collections import OrderedDict, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import logging
+import os
+import threading
+import time
+import traceback
+
+
+log = logging.getLogger(__name__)
+
+
+__all__ = ["SkipStage", "StageResult", "StageGraph"]
+
+
+class SkipStage(Exception):
+    """Raise in a stage to skip it and the stages which depend on it,
+    e.g because there is nothing to check."""
+
+
+StageResult = namedtuple("StageResult", "name status value seconds error log")
+StageResult.__doc__ = """Outcome of a stage.
+
+status is "ok", "failed" or "skipped". value is what the stage returned,
+error the traceback of a failed stage or the reason a stage was skipped,
+and log the path of the stage's log file, if there is one."""
+
+
+class _ThreadFilter(logging.Filter):
+    def __init__(self, thread_name):
+        super().__init__()
+        self.thread_name = thread_name
+
+    def filter(self, record):
+        return record.threadName == self.thread_name
+
+
+class StageGraph:
+    """Stages and the stages they depend on."""
+
+    def __init__(self):
+        self.stages = OrderedDict()
+
+    def add(self, name, func, deps=()):
+        """Add a stage.
+
+        Args:
+            name: unique name of the stage.
+            func: function called with no arguments to run the stage.
+            deps: names of the stages which must finish first. They must
+                have been added already, which keeps the graph acyclic.
+        """
+        if name in self.stages:
+            raise ValueError(f"Stage {name} already exists")
+        missing = [d for d in deps if d not in self.stages]
+        if missing:
+            raise ValueError(f"Stage {name} depends on unknown stages {missing}")
+        self.stages[name] = (func, tuple(deps))
+
+    def _run_stage(self, name, log_dir):
+        func, _ = self.stages[name]
+        thread = threading.current_thread()
+        thread_name = thread.name
+        thread.name = f"stage-{name}"
+        handler = None
+        log_path = None
+        if log_dir:
+            log_path = os.path.join(log_dir, f"{name}.log")
+            handler = logging.FileHandler(log_path, mode="w")
+            handler.setFormatter(
+                logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+            )
+            handler.addFilter(_ThreadFilter(thread.name))
+            logging.getLogger().addHandler(handler)
+        start = time.perf_counter()
+        try:
+            log.info("Starting stage %s", name)
+            value, status, error = func(), "ok", None
+        except SkipStage as e:
+            value, status, error = None, "skipped", str(e)
+            log.info("Skipped stage %s: %s", name, e)
+        except Exception:
+            value, status, error = None, "failed", traceback.format_exc()
+            log.error("Stage %s failed:\n%s", name, error)
+        seconds = round(time.perf_counter() - start, 3)
+        log.info("Finished stage %s in %ss", name, seconds)
+        if handler:
+            logging.getLogger().removeHandler(handler)
+            handler.close()
+        thread.name = thread_name
+        return StageResult(name, status, value, seconds, error, log_path)
+
+    def run(self, workers=4, log_dir=None):
+        """Run the stages.
+
+        Args:
+            workers: number of stages which may run at once.
+            log_dir: if given, each stage's log records are also written
+                to log_dir/{stage name}.log.
+
+        Returns:
+            OrderedDict of {stage name: StageResult}, in the order the
+            stages were added.
+        """
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        results = {}
+        pending = OrderedDict(self.stages)
+        running = {}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while pending or running:
+                for name, (_, deps) in list(pending.items()):
+                    if any(d not in results for d in deps):
+                        continue
+                    del pending[name]
+                    blocked = [d for d in deps if results[d].status != "ok"]
+                    if blocked:
+                        results[name] = StageResult(
+                            name, "skipped", None, 0,
+                            "{} didn't succeed".format(", ".join(blocked)), None,
+                        )
+                        continue
+                    running[pool.submit(self._run_stage, name, log_dir)] = name
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[running.pop(future)] = future.result()
+        return OrderedDict((name, results[name]) for name in self.stages)
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# Copyright 2020 The Google Font Tools Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Upload large files without holding them in memory.
+
+A multipart/form-data body is encoded chunk by chunk while it is sent,
+using chunked transfer encoding, so neither the body nor the files in it
+are ever held in memory whole. A file's contents come from a function
+returning an iterable of bytes, e.g zip_dir_chunks, which zips a dir on
+the fly. Since the function is called again for each attempt, failed
+uploads can be retried.
+"""
+from collections import namedtuple
+import io
+import logging
+import os
+import time
+from uuid import uuid4
+import zipfile
+import requests
+from gftools.util.downloader import RETRY_STATUSES
+
+
+log = logging.getLogger(__name__)
+
+
+__all__ = ["UploadFile", "MultipartBody", "zip_dir_chunks", "upload"]
+
+
+CHUNK_SIZE = 1024 * 1024
+# Bytes sent between the progress messages logged by default
+PROGRESS_STEP = 10 * 1024 * 1024
+
+
+UploadFile = namedtuple("UploadFile", "field filename content_type chunks")
+UploadFile.__doc__ = """A file in a multipart body.
+
+chunks is a function called with no arguments which returns an iterable
+of the file's bytes. It is called once per upload attempt."""
+
+
+class _ChunkSink(io.RawIOBase):
+    """Unseekable file which collects what is written to it."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def take(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def zip_dir_chunks(src, exclude=(), chunk_size=CHUNK_SIZE):
+    """Zip a dir, yielding the zip's bytes as they are written.
+
+    Args:
+        src: dir to zip. Paths in the zip are relative to it.
+        exclude: names of files and dirs in src to leave out.
+        chunk_size: bytes of a file read at once.
+    """
+    sink = _ChunkSink()
+    # The sink can't seek, so zipfile writes each file's sizes after its
+    # data instead of going back to its header
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as archive:
+        for root, dirs, files in os.walk(src):
+            if os.path.samefile(root, src):
+                dirs[:] = [d for d in dirs if d not in exclude]
+                files = [f for f in files if f not in exclude]
+            dirs.sort()
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                info = zipfile.ZipInfo.from_file(path, os.path.relpath(path, src))
+                info.compress_type = zipfile.ZIP_DEFLATED
+                with open(path, "rb") as doc, archive.open(info, "w") as entry:
+                    for chunk in iter(lambda: doc.read(chunk_size), b""):
+                        entry.write(chunk)
+                        data = sink.take()
+                        if data:
+                            yield data
+                data = sink.take()
+                if data:
+                    yield data
+    data = sink.take()
+    if data:
+        yield data
+
+
+def _quote(value):
+    return value.replace('"', "%22").replace("\r", "%0D").replace("\n", "%0A")
+
+
+class MultipartBody:
+    """A multipart/form-data body, encoded each time it is iterated.
+
+    Args:
+        fields: list of (name, value) string form fields.
+        files: list of UploadFile.
+        boundary: part boundary, random by default.
+    """
+
+    def __init__(self, fields=(), files=(), boundary=None):
+        self.fields = list(fields)
+        self.files = list(files)
+        self.boundary = boundary or uuid4().hex
+        self.content_type = "multipart/form-data; boundary={}".format(self.boundary)
+
+    def _part_header(self, name, filename=None, content_type=None):
+        disposition = 'form-data; name="{}"'.format(_quote(name))
+        if filename is not None:
+            disposition += '; filename="{}"'.format(_quote(filename))
+        lines = ["--" + self.boundary, "Content-Disposition: " + disposition]
+        if content_type:
+            lines.append("Content-Type: " + content_type)
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("utf-8")
+
+    def __iter__(self):
+        for name, value in self.fields:
+            yield self._part_header(name) + str(value).encode("utf-8") + b"\r\n"
+        for upload_file in self.files:
+            yield self._part_header(
+                upload_file.field, upload_file.filename, upload_file.content_type
+            )
+            for chunk in upload_file.chunks():
+                if chunk:
+                    yield chunk
+            yield b"\r\n"
+        yield "--{}--\r\n".format(self.boundary).encode("utf-8")
+
+
+def _log_progress(url):
+    logged = [0]
+
+    def progress(sent):
+        if sent - logged[0] >= PROGRESS_STEP:
+            logged[0] = sent
+            log.info("Uploaded %.1f MB to %s", sent / 1024 / 1024, url)
+    return progress
+
+
+def _counted(body, progress):
+    sent = 0
+    for chunk in body:
+        sent += len(chunk)
+        progress(sent)
+        yield chunk
+
+
+def upload(
+    url,
+    fields=(),
+    files=(),
+    headers=None,
+    session=None,
+    retries=3,
+    backoff=0.5,
+    timeout=300,
+    progress=None,
+):
+    """POST a streamed multipart/form-data body.
+
+    Args:
+        url: url to post to.
+        fields: list of (name, value) form fields.
+        files: list of UploadFile.
+        headers: dict of extra request headers.
+        session: requests.Session to post with.
+        retries: number of times the upload is retried after a
+            connection error or a retryable status code (429 and 5xx).
+        backoff: seconds to wait before the first retry. The wait doubles
+            with each retry.
+        timeout: seconds to wait for the server to respond.
+        progress: function called with the number of bytes of the body
+            sent so far, after each chunk. By default progress is logged
+            every 10 MB.
+
+    Returns:
+        the requests.Response.
+
+    Raises:
+        requests.RequestException: if the upload still fails after the
+            retries.
+    """
+    session = session or requests.Session()
+    progress = progress or _log_progress(url)
+    body = MultipartBody(fields, files)
+    headers = dict(headers or {})
+    headers["Content-Type"] = body.content_type
+    attempt = 0
+    while True:
+        try:
+            response = session.post(
+                url, data=_counted(body, progress), headers=headers, timeout=timeout
+            )
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt >= retries:
+                raise
+            delay = backoff * 2 ** attempt
+            log.warning("Retrying upload to %s in %ss: %s", url, delay, e)
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                response.raise_for_status()
+                return response
+            delay = backoff * 2 ** attempt
+            log.warning(
+                "Retrying upload to %s in %ss: %s", url, delay, response.status_code
+            )
+        time.sleep(delay)
+        attempt += 1
@@ -15,16 +15,21 @@
 #
 from fontTools import ttLib
 import requests
-from io import BytesIO
 from zipfile import ZipFile
 import sys
 import os
 import re
 import shutil
+import tempfile
 import unicodedata
+from urllib.parse import quote
 from unidecode import unidecode
-from collections import namedtuple
-from github import Github
+from collections import namedtuple, OrderedDict
+from fontTools.ttLib.tables._n_a_m_e import makeName
+from gftools.util import family_cache
+from gftools.util.family_index import load_family_index
+from gftools.util.downloader import Downloader
+from gftools.util.http_cache import default_session
 if sys.version_info[0] == 3:
     from configparser import ConfigParser
 else:
@@ -34,16 +39,39 @@ else:
 # HELPER FUNCTIONS
 
 def download_family_from_Google_Fonts(family, dst=None):
-    """Download a font family from Google Fonts"""
-    url = 'https://fonts.google.com/download?family={}'.format(
-        family.replace(' ', '%20')
-    )
-    fonts_zip = ZipFile(download_file(url))
-    if dst:
-        fonts = fonts_from_zip(fonts_zip, dst)
+    """Download a font family from Google Fonts.
+
+    Downloads are kept in the family cache, see gftools.util.family_cache.
+    If dst is given, the fonts are copied to it and their paths returned,
+    otherwise they are returned as SpooledFile objects, like fonts_from_zip
+    returns them. The cached files are never left open."""
+    cache = family_cache.default_cache()
+    if cache is None:
+        url = family_cache.DOWNLOAD_URL.format(family.replace(' ', '%20'))
+        fonts_zip = ZipFile(download_file(url))
+        if dst:
+            fonts = fonts_from_zip(fonts_zip, dst)
+            # Remove static fonts if the family is a variable font
+            return [f for f in fonts if "static" not in f]
+        return fonts_from_zip(fonts_zip)
+
+    fonts = []
+    for name, cached_path in cache.fonts(family):
+        if not dst:
+            font = SpooledFile(name)
+            with open(cached_path, "rb") as cached:
+                shutil.copyfileobj(cached, font, CHUNK_SIZE)
+            font.seek(0)
+            fonts.append(font)
+            continue
         # Remove static fonts if the family is a variable font
-        return [f for f in fonts if "static" not in f]
-    return fonts_from_zip(fonts_zip)
+        if "static" in name:
+            continue
+        target = os.path.join(dst, name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copyfile(cached_path, target)
+        fonts.append(target)
+    return fonts
 
 
 def Google_Fonts_has_family(family):
@@ -51,13 +79,7 @@ def Google_Fonts_has_family(family):
     gf_api_key = load_Google_Fonts_api_key() or os.environ.get("GF_API_KEY")
     if not gf_api_key:
         raise FileNotFoundError("~/.gf-api-key or env not found. See ReadMe to create one")
-    api_url = 'https://www.googleapis.com/webfonts/v1/webfonts?key={}'.format(gf_api_key)
-    r = requests.get(api_url)
-    families_on_gf = [f['family'] for f in r.json()['items']]
-
-    if family in families_on_gf:
-        return True
-    return False
+    return family in load_family_index(gf_api_key)
 
 
 def load_Google_Fonts_api_key():
@@ -89,12 +111,45 @@ def parse_github_dir_url(url):
     return GithubDir(segments[3], segments[4], segments[6], "/".join(segments[7:]))
 
 
+GITHUB_API = "https://api.github.com"
+
+
+def _github_get(path, params=None):
+    """GET a GitHub REST API path through the shared response cache."""
+    headers = {"Authorization": "token {}".format(os.environ["GH_TOKEN"])}
+    response = default_session().get(GITHUB_API + path, params=params, headers=headers)
+    response.raise_for_status()
+    return response.json()
+
+
+def _github_get_pages(path, params=None):
+    """Return the items of all pages of a paginated GitHub API list."""
+    items = []
+    page = 1
+    while True:
+        page_items = _github_get(path, dict(params or {}, per_page=100, page=page))
+        items += page_items
+        if len(page_items) < 100:
+            return items
+        page += 1
+
+
+def _github_dir_files(repo_slug, path, ref):
+    """Return the files in a dir of a github repo as (path, download url)
+    tuples."""
+    contents = _github_get(
+        "/repos/{}/contents/{}".format(repo_slug, quote(path)), {"ref": ref}
+    )
+    return [(f["path"], f["download_url"]) for f in contents if f["type"] == "file"]
+
+
 def download_files_in_github_pr(
     url,
     dst,
     filter_files=[],
     ignore_static_dir=True,
     overwrite=True,
+    downloader=None,
 ):
     """Download files in a github pr e.g
     https://github.com/google/fonts/pull/2072
@@ -108,59 +163,50 @@ def download_files_in_github_pr(
     a /static dir. These dirs are used in family dirs on google/fonts
     e.g ofl/oswald.
     overwrite: bool, set True to overwrite existing contents in dst
+    downloader: gftools.util.downloader.Downloader used to download the
+    files concurrently. A default one is made if None.
 
     Returns
     -------
     list of paths to downloaded files
     """
-    gh = Github(os.environ["GH_TOKEN"])
     url = parse_github_pr_url(url)
-    repo_slug = "{}/{}".format(url.user, url.repo)
-    repo = gh.get_repo(repo_slug)
-    pull = repo.get_pull(url.pull)
-    files = [f for f in pull.get_files()]
+    pull_path = "/repos/{}/{}/pulls/{}".format(url.user, url.repo, url.pull)
+    pull = _github_get(pull_path)
+    files = _github_get_pages(pull_path + "/files")
 
     mkdir(dst, overwrite=overwrite)
+    jobs = []
     # if the pr is from google/fonts or a fork of it, download all the
     # files inside the family dir as well. This way means we can qa
     # the whole family together as a whole unit. It will also download
     # the metadata, license and description files so all Fontbakery
     # checks will be executed.
-    if pull.base.repo.name == "fonts":
-        dirs = set([os.path.dirname(p.filename) for p in files])
-        results = []
+    if pull["base"]["repo"]["name"] == "fonts":
+        dirs = sorted(set([os.path.dirname(p["filename"]) for p in files]))
         for d in dirs:
             if ignore_static_dir and '/static' in d:
                 continue
-            url = os.path.join(
-                pull.head.repo.html_url,
-                "tree",
-                pull.head.ref, # head branch
-                d)
-            results += download_files_in_github_dir(url, dst, overwrite=False)
-        return results
-
-    results = []
-    for f in files:
-        filename = os.path.join(dst, f.filename)
-        if filter_files and not filename.endswith(tuple(filter_files)):
-            continue
-        if ignore_static_dir and "/static" in filename:
-            continue
-        if not overwrite and os.path.exists(filename):
-            continue
-        dst_ = os.path.dirname(filename)
-        mkdir(dst_, overwrite=False)
-        download_file(f.raw_url, filename)
-        results.append(filename)
-    return results
+            dir_files = _github_dir_files(
+                pull["head"]["repo"]["full_name"], d, pull["head"]["ref"]
+            )
+            jobs += _download_jobs(dir_files, dst, overwrite=False)
+    else:
+        if ignore_static_dir:
+            files = [f for f in files
+                     if "/static" not in os.path.join(dst, f["filename"])]
+        jobs = _download_jobs(
+            [(f["filename"], f["raw_url"]) for f in files], dst, filter_files, overwrite
+        )
+    return (downloader or Downloader()).download(jobs)
 
 
 def download_files_in_github_dir(
     url,
     dst,
     filter_files=[],
-    overwrite=True
+    overwrite=True,
+    downloader=None,
 ):
     """Download files in a github dir e.g
     https://github.com/google/fonts/tree/master/ofl/abhayalibre
@@ -171,54 +217,104 @@ def download_files_in_github_dir(
     dst: str, path to output files
     filter_files: list, collection of files to include. None will keep all.
     overwrite: bool, set True to overwrite existing contents in dst
+    downloader: gftools.util.downloader.Downloader used to download the
+    files concurrently. A default one is made if None.
 
     Returns
     -------
     list of paths to downloaded files
     """
-    gh = Github(os.environ["GH_TOKEN"])
     url = parse_github_dir_url(url)
     repo_slug = "{}/{}".format(url.user, url.repo)
-    repo = gh.get_repo(repo_slug)
-    files = [f for f in repo.get_contents(url.dir, ref=url.branch)
-             if f.type == 'file']
+    files = _github_dir_files(repo_slug, url.dir, url.branch)
 
     mkdir(dst, overwrite=overwrite)
-    results = []
-    for f in files:
-        filename = os.path.join(dst, f.path)
+    jobs = _download_jobs(files, dst, filter_files, overwrite)
+    return (downloader or Downloader()).download(jobs)
+
+
+def _download_jobs(files, dst, filter_files=[], overwrite=True):
+    """Return the (url, dst path) jobs for a Downloader to fetch a list of
+    (repo path, url) files into dst, creating the dirs they need."""
+    jobs = []
+    for path, url in files:
+        filename = os.path.join(dst, path)
         if filter_files and not filename.endswith(tuple(filter_files)):
             continue
         if not overwrite and os.path.exists(filename):
             continue
         dst_ = os.path.dirname(filename)
         mkdir(dst_, overwrite=False)
-        download_file(f.download_url, filename)
-        results.append(filename)
-    return results
+        jobs.append((url, filename))
+    return jobs
+
+
+# Files bigger than this are spooled to disk instead of kept in memory
+SPOOL_MAX_SIZE = 4 * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+
+
+class SpooledFile(tempfile.SpooledTemporaryFile):
+    """Temporary file which is kept in memory until it grows bigger than
+    SPOOL_MAX_SIZE. name is the name of the downloaded or unzipped file."""
+
+    def __init__(self, name=None):
+        super().__init__(max_size=SPOOL_MAX_SIZE)
+        self._spooled_name = name
+
+    @property
+    def name(self):
+        return self._spooled_name
+
+    # SpooledTemporaryFile only has these from Python 3.11 onwards but
+    # zipfile.ZipFile needs them
+    def readable(self):
+        return self._file.readable()
+
+    def seekable(self):
+        return self._file.seekable()
+
+    def writable(self):
+        return self._file.writable()
 
 
 def download_file(url, dst_path=None):
-    """Download a file from a url. If no dst_path is specified, store the file
-    as a BytesIO object"""
+    """Download a file from a url in chunks. If no dst_path is specified,
+    return the file as a SpooledFile positioned at its start."""
     request = requests.get(url, stream=True)
-    if not dst_path:
-        return BytesIO(request.content)
-    with open(dst_path, 'wb') as downloaded_file:
-        downloaded_file.write(request.content)
+    request.raise_for_status()
+    with request:
+        if not dst_path:
+            downloaded_file = SpooledFile(url)
+            _copy_chunks(request.iter_content(CHUNK_SIZE), downloaded_file)
+            downloaded_file.seek(0)
+            return downloaded_file
+        with open(dst_path, 'wb') as downloaded_file:
+            _copy_chunks(request.iter_content(CHUNK_SIZE), downloaded_file)
+
+
+def _copy_chunks(chunks, dst):
+    for chunk in chunks:
+        dst.write(chunk)
 
 
 def fonts_from_zip(zipfile, dst=None):
-    """Unzip fonts. If not dst is given unzip as BytesIO objects"""
+    """Unzip fonts. If not dst is given unzip them as SpooledFile objects
+    named after their paths in the zip."""
     fonts = []
     for filename in zipfile.namelist():
         if filename.endswith(".ttf"):
             if dst:
+                # ZipFile.extract copies the member in chunks
                 target = os.path.join(dst, filename)
                 zipfile.extract(filename, dst)
                 fonts.append(target)
             else:
-                fonts.append(BytesIO(zipfile.read(filename)))
+                font = SpooledFile(filename)
+                with zipfile.open(filename) as member:
+                    shutil.copyfileobj(member, font, CHUNK_SIZE)
+                font.seek(0)
+                fonts.append(font)
     return fonts
 
 
@@ -287,6 +383,127 @@ def get_name_record(ttFont, nameID, fallbackID=None, platform=(3, 1, 0x409)):
     return record.toUnicode()
 
 
+class NameIndex:
+    """Index of a font's name records, keyed by
+    (nameID, platformID, platEncID, langID).
+
+    name.getName and name.removeNames scan every record on each call. The
+    index makes lookups O(1) and lets a fix make all its edits in memory,
+    then write them back to the name table once with commit().
+
+    If a font has several records with the same key, the first one is used,
+    like name.getName does, and the others are dropped on commit.
+
+    Args:
+        ttFont: a TTFont instance
+    """
+
+    WIN_ENGLISH = (3, 1, 0x409)
+    MAC_ROMAN = (1, 0, 0)
+
+    def __init__(self, ttFont):
+        self.ttFont = ttFont
+        self._records = OrderedDict()
+        for record in ttFont["name"].names:
+            key = (record.nameID, record.platformID, record.platEncID, record.langID)
+            self._records.setdefault(key, record)
+        self.changed = False
+
+    def __contains__(self, key):
+        return key in self._records
+
+    def __iter__(self):
+        return iter(list(self._records))
+
+    def __len__(self):
+        return len(self._records)
+
+    def get(self, nameID, platformID=3, platEncID=1, langID=0x409):
+        """Return the NameRecord with the given key or None."""
+        return self._records.get((nameID, platformID, platEncID, langID))
+
+    def get_string(self, nameID, platformID=3, platEncID=1, langID=0x409):
+        """Return the string of a name record or None."""
+        record = self.get(nameID, platformID, platEncID, langID)
+        return record.toUnicode() if record else None
+
+    def platforms(self):
+        """Return the set of (platformID, platEncID, langID) which have
+        records."""
+        return set(key[1:] for key in self._records)
+
+    def set(self, string, nameID, platformID=3, platEncID=1, langID=0x409):
+        """Add or replace a name record."""
+        key = (nameID, platformID, platEncID, langID)
+        record = self._records.get(key)
+        if record is not None and record.toUnicode() == string:
+            return
+        self._records[key] = makeName(string, nameID, platformID, platEncID, langID)
+        self.changed = True
+
+    def remove(self, nameID=None, platformID=None, platEncID=None, langID=None):
+        """Remove every record which matches the given fields. Fields which
+        are None match any value.
+
+        Returns:
+            the number of removed records
+        """
+        query = (nameID, platformID, platEncID, langID)
+        return self.remove_where(
+            lambda key, _: all(q is None or q == k for q, k in zip(query, key))
+        )
+
+    def remove_where(self, predicate):
+        """Remove the records for which predicate(key, string) is True.
+
+        Returns:
+            the number of removed records
+        """
+        keys = [
+            key for key, record in self._records.items()
+            if predicate(key, record.toUnicode())
+        ]
+        for key in keys:
+            del self._records[key]
+        self.changed |= bool(keys)
+        return len(keys)
+
+    def rewrite(self, func):
+        """Set every record's string to func(key, string). Records for
+        which func returns None are removed.
+
+        Returns:
+            the number of changed records
+        """
+        changed = 0
+        for key, record in list(self._records.items()):
+            old = record.toUnicode()
+            new = func(key, old)
+            if new is None:
+                del self._records[key]
+            elif new != old:
+                self._records[key] = makeName(new, *key)
+            else:
+                continue
+            changed += 1
+        self.changed |= bool(changed)
+        return changed
+
+    def replace(self, old, new):
+        """Replace old with new in every record's string.
+
+        Returns:
+            the number of changed records
+        """
+        return self.rewrite(lambda key, string: string.replace(old, new))
+
+    def commit(self):
+        """Write the records back to the name table, if they changed."""
+        if self.changed:
+            self.ttFont["name"].names = list(self._records.values())
+            self.changed = False
+
+
 def family_bounding_box(ttFonts):
     y_min = min(f["head"].yMin for f in ttFonts)
     y_max = max(f["head"].yMax for f in ttFonts)
@@ -314,15 +531,18 @@ def validate_family(ttFonts):
     return True
 
 
-def unique_name(ttFont, nameids):
-    font_version = _font_version(ttFont)
+def unique_name(ttFont, nameids, names=None):
+    font_version = _font_version(ttFont, names=names)
     vendor = ttFont["OS/2"].achVendID.strip()
     ps_name = nameids[6]
     return f"{font_version};{vendor};{ps_name}"
 
 
-def _font_version(font, platEncLang=(3, 1, 0x409)):
-    nameRecord = font["name"].getName(5, *platEncLang)
+def _font_version(font, platEncLang=(3, 1, 0x409), names=None):
+    if names is not None:
+        nameRecord = names.get(5, *platEncLang)
+    else:
+        nameRecord = font["name"].getName(5, *platEncLang)
     if nameRecord is None:
         return f'{font["head"].fontRevision:.3f}'
     # "Version 1.101; ttfautohint (v1.8.1.43-b0c9)" --> "1.101"
@@ -425,7 +645,7 @@ def has_mac_names(ttfont):
     """Check if a font has Mac names. Mac names have the following
     field values:
     platformID: 1, encodingID: 0, LanguageID: 0"""
-    for i in range(255):
-        if ttfont['name'].getName(i, 1, 0, 0):
-            return True
-    return False
+    return any(
+        r.platformID == 1 and r.platEncID == 0 and r.langID == 0
+        for r in ttfont['name'].names
+    )
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# Copyright 2020 The Google Font Tools Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Compare reading a font's codepoints with fontTools and with the cmap
+only reader used by gftools.util.google_fonts.CodepointsInFont.
+
+Usage:
+python benchmarks/cmap_reader.py [fonts ...] [--repeat N]
+
+If no fonts are given, a synthetic font which maps the CJK Unified
+Ideographs blocks (~28k codepoints, like Noto Sans CJK) is built in a
+temporary directory.
+"""
+import argparse
+import contextlib
+import os
+import tempfile
+import timeit
+from fontTools import ttLib
+from fontTools.fontBuilder import FontBuilder
+from fontTools.pens.ttGlyphPen import TTGlyphPen
+from gftools.util import cmap_reader
+from gftools.util.google_fonts import UnicodeCmapTables
+
+
+CJK_RANGES = [(0x3400, 0x4DBF), (0x4E00, 0x9FFF)]
+
+
+def build_cjk_font(path):
+    codepoints = [cp for start, end in CJK_RANGES for cp in range(start, end + 1)]
+    glyph_order = [".notdef"] + ["uni%04X" % cp for cp in codepoints]
+    fb = FontBuilder(1000, isTTF=True)
+    fb.setupGlyphOrder(glyph_order)
+    fb.setupCharacterMap({cp: "uni%04X" % cp for cp in codepoints})
+    fb.setupGlyf({g: TTGlyphPen(None).glyph() for g in glyph_order})
+    fb.setupHorizontalMetrics({g: (1000, 0) for g in glyph_order})
+    fb.setupHorizontalHeader(ascent=880, descent=-120)
+    fb.setupNameTable({"familyName": "Bench CJK", "styleName": "Regular"})
+    fb.setupOS2()
+    fb.setupPost()
+    fb.save(path)
+    return path
+
+
+def fonttools_codepoints(path):
+    cps = set()
+    with contextlib.closing(ttLib.TTFont(path)) as font:
+        for table in UnicodeCmapTables(font):
+            cps.update(table.cmap.keys())
+    return cps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("fonts", nargs="*")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fonts = args.fonts or [build_cjk_font(os.path.join(tmp, "BenchCJK.ttf"))]
+        for path in fonts:
+            assert fonttools_codepoints(path) == cmap_reader.codepoints_in_cmap(path)
+            runs = {
+                "fontTools TTFont": lambda: fonttools_codepoints(path),
+                "cmap reader (set)": lambda: cmap_reader.codepoints_in_cmap(path),
+                "cmap reader (ranges)": lambda: cmap_reader.codepoints_in_cmap(
+                    path, as_ranges=True
+                ),
+            }
+            print(os.path.basename(path))
+            baseline = None
+            for name, func in runs.items():
+                best = min(timeit.repeat(func, number=1, repeat=args.repeat))
+                baseline = baseline or best
+                print("  {:<22} {:8.2f} ms  {:6.1f}x".format(
+                    name, best * 1000, baseline / best))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# Copyright 2020 The Google Font Tools Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Compare the startup time of the gftools launcher when subcommands run
+in the launcher's interpreter and when they run in a subprocess.
+
+Usage:
+python benchmarks/launcher_startup.py [subcommands ...] [--repeat N]
+
+Each subcommand is run with --help, with GFTOOLS_DISPATCH set to "process"
+and then to "subprocess". If no subcommands are given, all of them are
+timed.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+
+BIN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "bin")
+LAUNCHER = os.path.join(BIN_DIR, "gftools")
+MODES = ("process", "subprocess")
+
+
+def list_subcommands():
+    output = subprocess.check_output(
+        [sys.executable, LAUNCHER, "--list-subcommands"], universal_newlines=True
+    )
+    return output.split()
+
+
+def time_subcommand(subcommand, mode, repeat):
+    """Return the best wall time of `gftools {subcommand} --help` and the
+    exit status of the last run."""
+    env = dict(os.environ, GFTOOLS_DISPATCH=mode)
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        status = subprocess.call(
+            [sys.executable, LAUNCHER, subcommand, "--help"],
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, status
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("subcommands", nargs="*")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    subcommands = args.subcommands or list_subcommands()
+    totals = dict.fromkeys(MODES, 0.0)
+    print("{:<28} {:>10} {:>12} {:>8}".format("subcommand", *MODES, "speedup"))
+    for subcommand in subcommands:
+        times = {}
+        for mode in MODES:
+            times[mode], status = time_subcommand(subcommand, mode, args.repeat)
+            totals[mode] += times[mode]
+        print("{:<28} {:8.0f}ms {:10.0f}ms {:7.2f}x{}".format(
+            subcommand,
+            times["process"] * 1000,
+            times["subprocess"] * 1000,
+            times["subprocess"] / times["process"],
+            "" if status == 0 else "  (exit status {})".format(status),
+        ))
+    print("{:<28} {:8.0f}ms {:10.0f}ms {:7.2f}x".format(
+        "total",
+        totals["process"] * 1000,
+        totals["subprocess"] * 1000,
+        totals["subprocess"] / totals["process"],
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -14,11 +14,11 @@
 # limitations under the License.
 #
 from __future__ import print_function
-import itertools
 import os
 import sys
 from absl import flags, app
 from gftools.util import google_fonts as fonts
+from gftools.util.coverage import FamilyCoverage
 
 FLAGS = flags.FLAGS
 flags.DEFINE_integer('max_diff_cps', 5,
@@ -33,13 +33,15 @@ def main(argv):
   sys.stderr = open(os.devnull, 'w')
   dirpath = argv[1]
   result = True
+  metadata = fonts.Metadata(dirpath)
   files = []
-  for font in fonts.Metadata(dirpath).fonts:
+  for font in metadata.fonts:
     files.append(os.path.join(dirpath, font.filename))
-  for subset in fonts.Metadata(dirpath).subsets:
+  coverage = FamilyCoverage(files)
+  for subset in metadata.subsets:
     if subset == 'menu':
       continue
-    (file1, file2, diff_size)  = _LeastSimilarCoverage(files, subset)
+    (file1, file2, diff_size)  = _LeastSimilarCoverage(coverage, subset)
     if diff_size > FLAGS.max_diff_cps:
       print('%s coverage for %s failed' % (dirpath, subset))
       print('Difference of codepoints between %s & %s is %d' % (
@@ -50,37 +52,17 @@ def main(argv):
     print('%s passed subset coverage' % (dirpath))
 
 
-def _LeastSimilarCoverage(files, subset):
+def _LeastSimilarCoverage(coverage, subset):
   """Returns pair of fonts having inconsistent coverage for a subset.
 
   Args:
-    files: List of font files
+    coverage: FamilyCoverage of the font files
     subset: Name of subset
   Returns:
     3 tuple of (file1, file2, number of codepoints difference)
   """
-  worst = (None, None, 0)
   subsetcps = fonts.CodepointsInSubset(subset, True)
-  for pair in itertools.combinations(files, 2):
-    inconsistency = _InconsistentSubsetSupport(pair[0], pair[1], subsetcps)
-    if inconsistency > worst[2]:
-      worst = (pair[0], pair[1], inconsistency)
-  return worst
-
-
-def _InconsistentSubsetSupport(file1, file2, subsetcps):
-  """Returns difference in number of codepoints supported.
-
-  Args:
-    file1: Name of font file
-    file2: Name of font file
-    subsetcps: Complete set of codepoints to be supported
-  Returns:
-    Difference in number of codepoints between file1 and file2.
-  """
-  supportcps1 = len(subsetcps.intersection(fonts.CodepointsInFont(file1)))
-  supportcps2 = len(subsetcps.intersection(fonts.CodepointsInFont(file2)))
-  return abs(supportcps1 - supportcps2)
+  return coverage.max_pairwise_difference(subsetcps)
 
 
 if __name__ == '__main__':
@@ -20,9 +20,8 @@ from __future__ import print_function
 import argparse
 import os
 import sys
-import requests
-import json
 from gftools.fonts_public_pb2 import FamilyProto
+from gftools.util.family_index import FamilyIndexError, load_family_index
 from google.protobuf import text_format
 
 description = ("Comparison of category fields of local METADATA.pb files"
@@ -38,16 +37,12 @@ parser.add_argument('--verbose',
                     action="store_true")
 
 
-API_URL = 'https://www.googleapis.com/webfonts/v1/webfonts?key={}'
 def main():
     args = parser.parse_args()
-    response = requests.get(API_URL.format(args.key))
     try:
-        webfontList = response.json()['items']
-        webfontListFamilyNames = [item['family'] for item in webfontList]
-    except (ValueError, KeyError):
-        sys.exit("Unable to load and parse"
-                 " list of families from Google Web Fonts API.")
+        webfonts = load_family_index(args.key)
+    except FamilyIndexError as e:
+        sys.exit(str(e))
 
     for dirpath, dirnames, filenames in os.walk(args.repo):
         metadata_path = os.path.join(dirpath, 'METADATA.pb')
@@ -65,10 +60,8 @@ def main():
                   file=sys.stderr)
             continue
 
-        try:
-            index = webfontListFamilyNames.index(family)
-            webfontsItem = webfontList[index]
-        except ValueError:
+        webfontsItem = webfonts.get(family)
+        if webfontsItem is None:
             if args.verbose:
                 print(('ERROR: Family "{}" could not be found'
                        ' in Google Web Fonts API.').format(family))
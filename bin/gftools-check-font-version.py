@@ -61,7 +61,7 @@ def main():
       web_family = fonts_from_zip(web_family_zip)
       web_family_fonts = [TTFont(f) for f in web_family
                           if f.name.endswith(".ttf")]
-      web_family_name = set(f.reader.file.name.split('-')[0] for f in web_family)
+      web_family_name = set(basename(f.name).split('-')[0] for f in web_family)
       web_family_version = parse_version_head(web_family_fonts)
     print('Google Fonts Version of %s is v%s' % (
       args.family,
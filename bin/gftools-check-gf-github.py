@@ -26,11 +26,11 @@ The title and url of each issues/pr can be displayed by using the
 -v, --verbose option.
 """
 from __future__ import print_function
-import requests
 import re
 from datetime import datetime
 from argparse import (ArgumentParser,
                       RawTextHelpFormatter)
+from gftools.util.http_cache import default_session
 
 
 def get_pagination_urls(request):
@@ -55,7 +55,7 @@ def get_issues_paginate(request_issues, start, end, headers):
   pages_url = get_pagination_urls(request_issues)
 
   for page_url in pages_url:
-    request = requests.get(page_url, headers=headers)
+    request = default_session().get(page_url, headers=headers)
     page_issues = get_issues(request, start, end)
 
     for issue_type in page_issues:
@@ -157,7 +157,7 @@ def main():
   }
   headers = {'Authorization': 'token %s' % args.github_api_token}
 
-  request_issues = requests.get(
+  request_issues = default_session().get(
     repo_url,
     params=request_params,
     headers=headers,
@@ -40,13 +40,10 @@ $ fontbakery family-html-snippet "Exo" "Hello World"
 </html>
 """
 from __future__ import print_function
-import json
-import requests
 import sys
 from argparse import (ArgumentParser,
                       RawTextHelpFormatter)
-
-GF_API = "https://www.googleapis.com/webfonts/v1/webfonts?key={}"
+from gftools.util.family_index import FamilyIndexError, load_family_index
 
 GF_API_WEIGHT_TO_CSS_WEIGHT = {
   "100": "100",
@@ -93,27 +90,10 @@ API_TO_CSS_STYLE_NAME = {
 
 def get_gf_family(family, api_key):
   """Get data of the given family hosted on Google Fonts"""
-  request = requests.get(GF_API.format(api_key))
-
   try:
-    response = json.loads(request.text)
-    if "error" in response:
-      if response["error"]["errors"][0]["reason"] == "keyInvalid":
-        sys.exit(("The Google Fonts API key '{}'"
-                  " was rejected as being invalid !").format(api_key))
-      else:
-        sys.exit(("There were errors in the"
-                  " Google Fonts API request:"
-                  " {}").format(response["error"]))
-    else:
-      gf_families = response
-  except (ValueError, KeyError):
-    sys.exit("Unable to load and parse data from Google Web Fonts API.")
-
-  for item in gf_families['items']:
-    if family == item['family']:
-        return item
-  return False
+    return load_family_index(api_key).get(family, False)
+  except FamilyIndexError as e:
+    sys.exit(str(e))
 
 
 def get_family_styles(gf_family):
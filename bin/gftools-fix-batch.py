@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+gftools fix-batch
+
+Run fix-family over many families in parallel. Each directory which
+contains fonts is a family.
+
+Results are printed as JSON lines as the families finish, and a JSON
+summary of every family can be written with --summary.
+
+With --out, each family is saved under its path relative to the dir
+holding all the families, e.g fonts/ofl/foo and fonts/apache/foo are
+saved to out/ofl/foo and out/apache/foo.
+
+Usage:
+
+# Fix every family found in a google/fonts checkout
+gftools fix-batch fonts/ofl --out fixed --summary summary.json
+
+# Fix the families listed in a manifest, one family dir per line
+gftools fix-batch --manifest families.txt --inplace --jobs 4
+
+# Record what the fixes would change, review it, then apply it
+gftools fix-batch fonts/ofl --dry-run changes.json
+gftools fix-batch --apply changes.json --inplace
+"""
+import argparse
+import json
+import logging
+import sys
+from gftools.changeset import Changeset
+from gftools.fixbatch import find_families, fix_families, read_manifest
+
+
+log = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("trees", nargs="*", help="Dirs to search for families")
+    parser.add_argument(
+        "-m", "--manifest", action="append", default=[],
+        help="File listing family dirs, one per line"
+    )
+    parser.add_argument(
+        "--inplace", action="store_true", default=False, help="Save fixed fonts inplace"
+    )
+    parser.add_argument("-o", "--out", help="Output dir for fixed families")
+    parser.add_argument(
+        "--include-source-fixes",
+        action="store_true",
+        help="Fix font issues that should be fixed in the source files.",
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=None,
+        help="Number of worker processes (default: number of CPUs)"
+    )
+    parser.add_argument("--summary", help="Write a JSON summary to this file")
+    parser.add_argument(
+        "--dry-run", metavar="CHANGESET",
+        help="Don't save fonts, write the changes the fixes would make to "
+        "this file instead"
+    )
+    parser.add_argument(
+        "--apply", metavar="CHANGESET",
+        help="Apply the changes of a --dry-run to the fonts instead of fixing them"
+    )
+    args = parser.parse_args()
+
+    if args.apply:
+        changeset = Changeset.load(args.apply)
+        for path in changeset.apply(inplace=args.inplace, out=args.out):
+            print(path)
+        return
+
+    families = []
+    for tree in args.trees:
+        families.extend(find_families(tree))
+    for manifest in args.manifest:
+        families.extend(read_manifest(manifest))
+    if not families:
+        parser.error("No families found")
+
+    results = []
+    for result in fix_families(
+        families,
+        jobs=args.jobs,
+        include_source_fixes=args.include_source_fixes,
+        inplace=args.inplace,
+        out=args.out,
+        dry_run=bool(args.dry_run),
+    ):
+        print(json.dumps(result), flush=True)
+        results.append(result)
+
+    failed = [r["family"] for r in results if r["error"]]
+    if args.dry_run:
+        changeset = Changeset()
+        for result in sorted(results, key=lambda r: r["family"]):
+            for path, font in result["fonts"].items():
+                changeset.fonts[path] = font["changes"]
+        changeset.save(args.dry_run)
+    if args.summary:
+        summary = {
+            "families": len(results),
+            "failed": failed,
+            "changed": sum(
+                1 for r in results
+                if any(f.get("changes") or f.get("changed") or f.get("added")
+                       or f.get("removed") for f in r["fonts"].values())
+            ),
+            "results": sorted(results, key=lambda r: r["family"]),
+        }
+        with open(args.summary, "w", encoding="utf-8") as doc:
+            json.dump(summary, doc, indent=2)
+    if failed:
+        log.error("%s of %s families failed", len(failed), len(results))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -19,8 +19,7 @@
 from __future__ import print_function, unicode_literals
 import argparse
 import os
-from fontTools import ttLib
-from gftools.fix import add_dummy_dsig
+from gftools.fix import add_dummy_dsig, open_font, save_font, tables_written
 
 
 description = 'Fixes TTF to have a dummy DSIG table'
@@ -46,21 +45,26 @@ def main():
   for path in args.ttf_font:
     if not os.path.exists(path):
       continue
-    font = ttLib.TTFont(path)
+    font = open_font(path)
     has_DSIG = "DSIG" in font
     write_DSIG = args.force or args.autofix and not has_DSIG
 
-    if has_DSIG and args.delete:
+    deleted = has_DSIG and args.delete
+    if deleted:
       del font["DSIG"]
-      font.save(path)
       has_DSIG = False
+    if write_DSIG:
+      add_dummy_dsig(font)
+    if deleted or write_DSIG:
+      # Save once: the font is read lazily, so a second save would copy
+      # its untouched tables from the file the first save replaced
+      save_font(font, path, tables_written([add_dummy_dsig]))
+
+    if deleted:
       print("DELETED: '{}': removed digital "
               "signature (DSIG)".format(path))
 
     if write_DSIG:
-      add_dummy_dsig(font)
-      font.save(path)
-
       if not args.force:
         print("HOTFIX: '{}': Font lacked a digital"
               " signature (DSIG), so we just added a dummy"
@@ -11,12 +11,16 @@ gftools fix-family fonts1.ttf fonts2.ttf
 
 # Fix font issues that should be fixed in the source files
 gftools fix-family fonts1.ttf --include-source-fixes
+
+# Write the changes the fixes would make to a JSON file instead of saving
+# the fonts
+gftools fix-family fonts1.ttf fonts2.ttf --dry-run changes.json
 """
 import argparse
 import logging
 import os
-from fontTools.ttLib import TTFont
 from gftools.fix import *
+from gftools.changeset import dry_run_family
 
 
 log = logging.getLogger(__name__)
@@ -34,14 +38,24 @@ def main():
         action="store_true",
         help="Fix font issues that should be fixed in the source files.",
     )
+    parser.add_argument(
+        "--dry-run", metavar="CHANGESET",
+        help="Don't save fonts, write the changes the fixes would make to "
+        "this file instead. Apply them with gftools fix-batch --apply",
+    )
     args = parser.parse_args()
 
-    fonts = [TTFont(f) for f in args.fonts]
+    if args.dry_run:
+        dry_run_family(args.fonts, args.include_source_fixes).save(args.dry_run)
+        return
+
+    fonts = [open_font(f) for f in args.fonts]
     fix_family(fonts, args.include_source_fixes)
 
+    written = tables_written([fix_family])
     if args.inplace:
         for font in fonts:
-            font.save(font.reader.file.name)
+            save_font(font, font.reader.file.name, written)
     elif args.out:
         if not os.path.isdir(args.out):
             os.mkdir(args.out)
@@ -49,10 +63,10 @@ def main():
             out_path = os.path.join(
                 args.out, os.path.basename(font.reader.file.name)
             )
-            font.save(out_path)
+            save_font(font, out_path, written)
     else:
         for font in fonts:
-            font.save(font.reader.file.name + ".fix")
+            save_font(font, font.reader.file.name + ".fix", written)
 
 
 if __name__ == "__main__":
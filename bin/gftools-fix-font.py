@@ -14,7 +14,6 @@ gftools fix-font font.ttf --include-source-fixes
 """
 import argparse
 import logging
-from fontTools.ttLib import TTFont
 from gftools.fix import *
 
 
@@ -32,14 +31,15 @@ def main():
     )
     args = parser.parse_args()
 
-    font = TTFont(args.font)
+    font = open_font(args.font)
 
     fix_font(font, args.include_source_fixes)
 
+    written = tables_written([fix_font])
     if args.out:
-        font.save(args.out)
+        save_font(font, args.out, written)
     else:
-        font.save(font.reader.file.name + ".fix")
+        save_font(font, font.reader.file.name + ".fix", written)
 
 
 if __name__ == "__main__":
@@ -21,8 +21,13 @@ import argparse
 import os
 import sys
 
-from fontTools.ttLib import TTFont
-from gftools.fix import UNWANTED_TABLES, remove_tables
+from gftools.fix import (
+    UNWANTED_TABLES,
+    open_font,
+    remove_tables,
+    save_font,
+    tables_written,
+)
 
 
 def parse_tables(table_string):
@@ -43,9 +48,9 @@ def main():
     tables = parse_tables(args.tables) if args.tables else None
 
     for fontpath in args.FONTPATH:
-        ttfont = TTFont(fontpath)
+        ttfont = open_font(fontpath)
         remove_tables(ttfont, tables)
-        ttfont.save(fontpath)
+        save_font(ttfont, fontpath, tables_written([remove_tables]))
 
 
 if __name__ == "__main__":
@@ -31,7 +31,7 @@ import os
 from os import listdir
 import sys
 from absl import app
-from gftools.util import google_fonts as fonts
+from gftools.util.coverage import FamilyCoverage
 
 
 def main(argv):
@@ -39,13 +39,13 @@ def main(argv):
     sys.exit('Must have one argument, a directory containing font files.')
 
   dirpath = argv[1]
-  cps = set()
-  for f in _GetFontFiles(dirpath):
-    cps.update(fonts.CodepointsInFont(os.path.join(dirpath, f)))
+  files = _GetFontFiles(dirpath)
+  coverage = FamilyCoverage([os.path.join(dirpath, f) for f in files])
+  gaps = coverage.gaps()
 
-  for f in _GetFontFiles(dirpath):
-    diff = cps - fonts.CodepointsInFont(os.path.join(dirpath, f))
-    if bool(diff):
+  for f in files:
+    diff = gaps[os.path.join(dirpath, f)]
+    if diff:
       print('%s failed' % (f))
       for c in diff:
         print('0x%04X' % (c))
@@ -26,6 +26,7 @@ if int(sys.version[0]) == 2:
 elif int(sys.version[0]) == 3:
     import urllib.parse as urlparse
 from gftools.fonts_public_pb2 import FamilyProto
+from gftools.util.family_index import FamilyIndexError, load_family_index
 from google.protobuf import text_format
 
 description = ("This script compares the info on local METADATA.pb files"
@@ -76,16 +77,12 @@ def getVariantName(item):
     return name
 
 
-API_URL = 'https://www.googleapis.com/webfonts/v1/webfonts?key={}'
 def main():
     args = parser.parse_args()
-    response = requests.get(API_URL.format(args.key))
     try:
-        webfontList = response.json()['items']
-        webfontListFamilyNames = [item['family'] for item in webfontList]
-    except (ValueError, KeyError):
-        sys.exit("Unable to load and parse"
-                 " list of families from Google Web Fonts API.")
+        webfonts = load_family_index(args.key)
+    except FamilyIndexError as e:
+        sys.exit(str(e))
 
     for dirpath, dirnames, filenames in os.walk(args.repo):
         metadata_path = os.path.join(dirpath, 'METADATA.pb')
@@ -103,10 +100,8 @@ def main():
                   file=sys.stderr)
             continue
 
-        try:
-            index = webfontListFamilyNames.index(family)
-            webfontsItem = webfontList[index]
-        except ValueError:
+        webfontsItem = webfonts.get(family)
+        if webfontsItem is None:
             print(('ERROR: Family "{}" could not be found'
                    ' in Google Web Fonts API.').format(family))
             continue
@@ -19,8 +19,11 @@ Compare a pull request against the same family hosted on Google Fonts:
 Compare a github folder of fonts against the same family hosted on Google
 Fonts:
 `gftools qa -gh www.github.com/user/repo/tree/fonts/ttf -gfb -a -o qa`
+
+Checks whose fonts and settings are unchanged since an earlier run with
+the same output dir reuse that run's results. The out/qa_cache.json lists
+which checks were reused. Use --no-cache to run every check.
 """
-from fontTools.ttLib import TTFont
 import argparse
 import shutil
 import os
@@ -42,6 +45,14 @@ from gftools.utils import (
     load_Google_Fonts_api_key,
     mkdir,
 )
+from gftools.util.downloader import Downloader
+from gftools.qa_tasks import TaskErrors, diff_instance, plot_glyphs, run_tasks, split_tasks
+from gftools.util.stages import SkipStage, StageGraph
+from gftools.util.font_descriptor import describe_fonts
+from gftools.util.upload import UploadFile, upload, zip_dir_chunks
+from gftools.qa_cache import (
+    CACHE_DIR_NAME, ResultCache, clean_out_dir, file_sha256, tool_version
+)
 try:
     from diffenator.diff import DiffFonts
     from diffenator.font import DFont
@@ -57,6 +68,16 @@ __version__ = "2.1.3"
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+# The checks which can be selected on the command line, in the order
+# they are added to the stage graph
+AUTO_QA_CHECKS = (
+    "fontbakery",
+    "diffenator",
+    "diffbrowsers",
+    "plot_glyphs",
+    "browser_previews",
+)
+
 
 def load_browserstack_credentials():
     """Return the user's Browserstack credentials"""
@@ -74,9 +95,16 @@ class FontQA:
 
     GFR_URL = "http://35.238.63.0/"
 
-    def __init__(self, fonts, fonts_before=None, out="out"):
+    def __init__(self, fonts, fonts_before=None, out="out", jobs=None, cache=None,
+                 glyphs_page_size=None):
+        # gftools.util.font_descriptor.FontDescriptor lists
         self.fonts = fonts
         self.fonts_before = fonts_before
+        self.jobs = jobs
+        # gftools.qa_cache.ResultCache, checks always run if None
+        self.cache = cache
+        # Glyphs per plot_glyphs image, all glyphs are on one image if None
+        self.glyphs_page_size = glyphs_page_size
 
         self.instances = self._instances_in_fonts(self.fonts)
         self.instances_before = self._instances_in_fonts(self.fonts_before)
@@ -85,7 +113,7 @@ class FontQA:
         self._bstack_auth = load_browserstack_credentials()
         self.out = out
 
-    def _instances_in_fonts(self, ttfonts):
+    def _instances_in_fonts(self, fonts):
         """Get all font instances from a collection of fonts.
 
         This function works for both a static and variable font collections.
@@ -93,26 +121,23 @@ class FontQA:
         using the fvar table. If a font is static, it will only return a
         single instance by using the font's filename.
         """
-        if not ttfonts:
+        if not fonts:
             return None
         results = {}
-        for ttfont in ttfonts:
-            if "fvar" in ttfont:
-                for instance in ttfont['fvar'].instances:
-                    nameid = instance.subfamilyNameID
-                    name = ttfont['name'].getName(nameid, 3, 1, 1033).toUnicode()
-                    name = name.replace(" ", "")
+        for font in fonts:
+            if font.is_variable:
+                for instance in font.instances:
+                    name = instance.name.replace(" ", "")
                     results[name] = {
                         "coordinates": instance.coordinates,
-                        "filename": ttfont.reader.file.name
+                        "filename": font.path
                     }
             else:
-                filename = os.path.basename(ttfont.reader.file.name)
-                name = filename.split("-")[1]
+                name = font.filename.split("-")[1]
                 name = re.sub(".ttf|.otf", "", name)
                 results[name] = {
-                    "coordinates": {"wght": ttfont['OS/2'].usWeightClass},
-                    "filename": ttfont.reader.file.name
+                    "coordinates": {"wght": font.weight_class},
+                    "filename": font.path
                 }
         return results
 
@@ -141,31 +166,63 @@ class FontQA:
             )
         return shared
 
+    def _cached(self, check, version, dst, func, fonts_before=(),
+                fonts_after=(), settings=None, item="all"):
+        """Run func, which writes a check's results to dst, unless the
+        results for these inputs are in the result cache."""
+        if self.cache is None:
+            func()
+            return
+        key = self.cache.key(check, version, fonts_before, fonts_after, settings)
+        if self.cache.cached(check, item, key, dst, func):
+            logger.info("Reused stored %s results for %s", check, item)
+
     def diffenator(self, **kwargs):
         logger.info("Running Diffenator")
         dst = os.path.join(self.out, "Diffenator")
         mkdir(dst)
-        for style in self.matching_instances:
-            font_before = DFont(self.instances_before[style]['filename'])
-            font_after = DFont(self.instances[style]['filename'])
-            out = os.path.join(dst, style)
-            if font_after.is_variable and not font_before.is_variable:
-                font_after.set_variations_from_static(font_before)
-
-            elif not font_after.is_variable and font_before.is_variable:
-                font_before.set_variations_from_static(font_after)
-
-            elif font_after.is_variable and font_before.is_variable:
-                coordinates = self.instances_before[style]['coordinates']
-                font_after.set_variations(coordinates)
-                font_before.set_variations(coordinates)
-
-            # TODO add settings
-            diff = DiffFonts(font_before, font_after, {"render_diffs": True})
-            diff.to_gifs(dst=out)
-            diff.to_txt(20, os.path.join(out, "report.txt"))
-            diff.to_md(20, os.path.join(out, "report.md"))
-            diff.to_html(20, os.path.join(out, "report.html"), image_dir=".")
+        tasks = [
+            {
+                "name": style,
+                "font_before": self.instances_before[style]['filename'],
+                "font_after": self.instances[style]['filename'],
+                "coordinates": self.instances_before[style]['coordinates'],
+                "out": os.path.join(dst, style),
+            }
+            for style in sorted(self.matching_instances)
+        ]
+        # Only diff the instances whose fonts changed since the last run
+        keys = {}
+        if self.cache is not None:
+            version = tool_version("fontdiffenator")
+            for task in tasks:
+                key = self.cache.key(
+                    "diffenator", version, [task["font_before"]], [task["font_after"]],
+                    {"coordinates": task["coordinates"], "render_diffs": True},
+                )
+                stored = self.cache.restore(key, task["out"])
+                if stored is not None:
+                    self.cache.record("diffenator", task["name"], key, stored)
+                else:
+                    keys[task["name"]] = key
+            tasks = [t for t in tasks if t["name"] in keys]
+
+        def store(names):
+            for task in tasks:
+                if task["name"] in keys and task["name"] in names:
+                    self.cache.store(keys[task["name"]], task["out"])
+                    self.cache.record("diffenator", task["name"], keys[task["name"]])
+
+        try:
+            done = run_tasks(diff_instance, tasks, self.jobs, label="Diffenator")
+        except TaskErrors as e:
+            with open(os.path.join(dst, "errors.txt"), "w") as doc:
+                for style, error in sorted(e.errors.items()):
+                    doc.write("{}:\n{}\n".format(style, error))
+            # The other instances were diffed, their results can be reused
+            store([t["name"] for t in tasks if t["name"] not in e.errors])
+            raise
+        store(done)
 
     @staticmethod
     def chunkify(items, size):
@@ -181,61 +238,131 @@ class FontQA:
                     "diffbrowsers#installation on how to add them.")
             return
         dst = os.path.join(self.out, "Diffbrowsers")
-        mkdir(dst)
         browsers_to_test = test_browsers["vf_browsers"]
         fonts = [(k, self.instances_before[k]['filename'],
                      self.instances[k]['filename']) for k in self.matching_instances]
-        font_groups = self.chunkify(sorted(fonts), 4)
-        for group in font_groups:
-            styles = [i[0] for i in group]
-            dir_name = "_".join(styles)
-            fonts_before = [i[1] for i in group]
-            fonts_after = [i[2] for i in group]
-            out = os.path.join(dst, dir_name)
-            diff_browsers = DiffBrowsers(
-                auth=self._bstack_auth,
-                gfr_instance_url=self.GFR_URL,
-                dst_dir=out,
-                browsers=browsers_to_test,
-            )
-            diff_browsers.new_session(set(fonts_before), set(fonts_after))
-            diff_browsers.diff_view("waterfall", styles=styles)
-            info = os.path.join(out, "info.json")
-            json.dump(diff_browsers.stats, open(info, "w"))
-            diff_browsers.diff_view("glyphs_all", pt=16, styles=styles)
+
+        def run():
+            mkdir(dst)
+            font_groups = self.chunkify(sorted(fonts), 4)
+            for group in font_groups:
+                styles = [i[0] for i in group]
+                dir_name = "_".join(styles)
+                fonts_before = [i[1] for i in group]
+                fonts_after = [i[2] for i in group]
+                out = os.path.join(dst, dir_name)
+                diff_browsers = DiffBrowsers(
+                    auth=self._bstack_auth,
+                    gfr_instance_url=self.GFR_URL,
+                    dst_dir=out,
+                    browsers=browsers_to_test,
+                )
+                diff_browsers.new_session(set(fonts_before), set(fonts_after))
+                diff_browsers.diff_view("waterfall", styles=styles)
+                info = os.path.join(out, "info.json")
+                json.dump(diff_browsers.stats, open(info, "w"))
+                diff_browsers.diff_view("glyphs_all", pt=16, styles=styles)
+
+        self._cached(
+            "diffbrowsers", tool_version("gfdiffbrowsers"), dst, run,
+            fonts_before=[f[1] for f in sorted(fonts)],
+            fonts_after=[f[2] for f in sorted(fonts)],
+            settings={"browsers": browsers_to_test, "gfr": self.GFR_URL},
+        )
 
     def fontbakery(self):
         logger.info("Running Fontbakery")
         out = os.path.join(self.out, "Fontbakery")
-        mkdir(out)
-        cmd = (
-            ["fontbakery", "check-googlefonts", "-l", "WARN"]
-            + [f.reader.file.name for f in self.fonts]
-            + ["-C"]
-            + ["--ghmarkdown", os.path.join(out, "report.md")]
+        fonts = [f.path for f in self.fonts]
+
+        def run():
+            mkdir(out)
+            report = os.path.join(out, "report.md")
+            cmd = (
+                ["fontbakery", "check-googlefonts", "-l", "WARN"]
+                + fonts
+                + ["-C"]
+                + ["--ghmarkdown", report]
+            )
+            # Fontbakery exits with an error if checks fail, so only a
+            # missing report means it didn't run. Raising keeps the empty
+            # results out of the result cache.
+            returncode = subprocess.call(cmd)
+            if not os.path.isfile(report):
+                raise Exception(
+                    "Fontbakery wrote no report, it exited with {}".format(returncode)
+                )
+
+        self._cached(
+            "fontbakery", tool_version("fontbakery"), out, run, fonts_after=fonts,
+            settings={
+                "profile": "check-googlefonts",
+                "loglevel": "WARN",
+                "family_files": self._family_files(fonts),
+            },
         )
-        subprocess.call(cmd)
+
+    @staticmethod
+    def _family_files(fonts):
+        """sha256 of the files next to the fonts which aren't fonts, e.g
+        METADATA.pb and OFL.txt, which check-googlefonts reads too."""
+        results = []
+        for font_dir in sorted(set(os.path.dirname(os.path.abspath(f)) for f in fonts)):
+            for name in sorted(os.listdir(font_dir)):
+                path = os.path.join(font_dir, name)
+                if name.endswith((".ttf", ".otf")) or not os.path.isfile(path):
+                    continue
+                results.append([name, file_sha256(path)])
+        return results
 
     def plot_glyphs(self):
         logger.info("Running plot glyphs")
         out = os.path.join(self.out, "plot_glyphs")
-        mkdir(out)
-        fonts = [f.reader.file.name for f in self.fonts]
-        for font in fonts:
-            font_filename = os.path.basename(font)[:-4]
-            dfont = DFont(font)
-            if dfont.is_variable:
-                for _, coords in dfont.instances_coordinates.items():
-                    dfont.set_variations(coords)
-                    img_out = os.path.join(
-                        out,
-                        "%s_%s.png"
-                        % (font_filename, self._instance_coords_to_filename(coords)),
-                    )
-                    dfont.glyphs.to_png(img_out, limit=100000)
-            else:
-                img_out = os.path.join(out, font_filename + ".png")
-                dfont.glyphs.to_png(dst=img_out)
+        fonts = [f.path for f in self.fonts]
+
+        def run():
+            mkdir(out)
+            tasks = []
+            # Each variable font's instances are shared between the
+            # workers, and a worker loads its font once for all of them
+            parts = max(1, (self.jobs or os.cpu_count() or 1) // max(1, len(fonts)))
+            for font in self.fonts:
+                font_filename = font.filename[:-4]
+                if font.is_variable:
+                    images = [
+                        (
+                            os.path.join(out, "%s_%s" % (
+                                font_filename, self._instance_coords_to_filename(coords)
+                            )),
+                            coords,
+                        )
+                        for coords in self._instances_coordinates(font)
+                    ]
+                    limit = 100000
+                else:
+                    images = [(os.path.join(out, font_filename), None)]
+                    limit = 800
+                for i, chunk in enumerate(split_tasks(images, parts)):
+                    tasks.append({
+                        "name": "{} {}".format(font_filename, i),
+                        "font": font.path,
+                        "images": chunk,
+                        "limit": limit,
+                        "page_size": self.glyphs_page_size,
+                    })
+            run_tasks(plot_glyphs, tasks, self.jobs, label="Plot glyphs")
+
+        self._cached(
+            "plot_glyphs", tool_version("fontdiffenator"), out, run,
+            fonts_after=fonts,
+            settings={"page_size": self.glyphs_page_size},
+        )
+
+    @staticmethod
+    def _instances_coordinates(font):
+        """Coordinates of a variable font's named instances, one per
+        instance name like DFont.instances_coordinates."""
+        return list({i.name: i.coordinates for i in font.instances}.values())
 
     def _instance_coords_to_filename(self, d):
         name = ""
@@ -254,22 +381,30 @@ class FontQA:
                     "diffbrowsers#installation on how to add them.")
             return
         out = os.path.join(self.out, "browser_previews")
-        mkdir(out)
         browsers_to_test = test_browsers["vf_browsers"]
-        font_groups = self.chunkify(list([i['filename'] for i in self.instances.values()]), 4)
-        name_groups = self.chunkify(list(self.instances.keys()), 4)
-        for name_group, font_group in zip(name_groups, font_groups):
-            name = "_".join(sorted(name_group))
-            diff_browsers = DiffBrowsers(
-                auth=self._bstack_auth,
-                gfr_instance_url=FontQA.GFR_URL,
-                dst_dir=os.path.join(out, name),
-                browsers=browsers_to_test,
-                gfr_is_local=False,
-            )
-            diff_browsers.new_session(font_group, font_group)
-            diff_browsers.diff_view("waterfall", styles=name_group)
-            diff_browsers.diff_view("glyphs_all", styles=name_group, pt=15)
+
+        def run():
+            mkdir(out)
+            font_groups = self.chunkify(list([i['filename'] for i in self.instances.values()]), 4)
+            name_groups = self.chunkify(list(self.instances.keys()), 4)
+            for name_group, font_group in zip(name_groups, font_groups):
+                name = "_".join(sorted(name_group))
+                diff_browsers = DiffBrowsers(
+                    auth=self._bstack_auth,
+                    gfr_instance_url=FontQA.GFR_URL,
+                    dst_dir=os.path.join(out, name),
+                    browsers=browsers_to_test,
+                    gfr_is_local=False,
+                )
+                diff_browsers.new_session(font_group, font_group)
+                diff_browsers.diff_view("waterfall", styles=name_group)
+                diff_browsers.diff_view("glyphs_all", styles=name_group, pt=15)
+
+        self._cached(
+            "browser_previews", tool_version("gfdiffbrowsers"), out, run,
+            fonts_after=[i['filename'] for i in self.instances.values()],
+            settings={"browsers": browsers_to_test, "gfr": self.GFR_URL},
+        )
 
     def googlefonts_upgrade(self):
         self.fontbakery()
@@ -284,7 +419,14 @@ class FontQA:
     def post_to_github(self, url):
         """Zip and post the check results as a comment to the github
         issue or pr."""
-        report_zip = shutil.make_archive(self.out, "zip", self.out)
+        # The zip is streamed to GFR as it is written, leaving out the
+        # stored results of earlier runs
+        report_zip = UploadFile(
+            "files",
+            os.path.basename(os.path.abspath(self.out)) + ".zip",
+            "application/zip",
+            lambda: zip_dir_chunks(self.out, exclude=[CACHE_DIR_NAME]),
+        )
         uuid = str(uuid4())
         zip_url = self._post_media_to_gfr([report_zip], uuid)
 
@@ -304,14 +446,14 @@ class FontQA:
             )
         self._post_gh_msg(msg, repo_slug, pull)
 
-    def _post_media_to_gfr(self, paths, uuid):
-        """Post images to GF Regression"""
+    def _post_media_to_gfr(self, files, uuid):
+        """Post media, a list of gftools.util.upload.UploadFile, to GF
+        Regression"""
         url_endpoint = self.GFR_URL + "/api/upload-media"
-        payload = [("files", open(path, "rb")) for path in paths]
-        r = requests.post(
+        r = upload(
             url_endpoint,
-            data={"uuid": uuid},
-            files=payload,
+            fields=[("uuid", uuid)],
+            files=files,
             headers={"Access-Token": os.environ["GFR_TOKEN"]},
         )
         return [os.path.join(self.GFR_URL, i) for i in r.json()["items"]]
@@ -338,19 +480,11 @@ class FontQA:
 def family_name_from_fonts(fonts):
     results = []
     for font in fonts:
-        family_name = font["name"].getName(1, 3, 1, 1033)
-        typo_family_name = font["name"].getName(16, 3, 1, 1033)
-
-        if typo_family_name:
-            results.append(typo_family_name.toUnicode())
-        elif family_name:
-            results.append(family_name.toUnicode())
-        else:
+        if not font.family_name:
             raise Exception(
-                "Font: {} has no family name records".format(
-                    os.path.basename(font.reader.file.name)
-                )
+                "Font: {} has no family name records".format(font.filename)
             )
+        results.append(font.family_name)
     if len(set(results)) > 1:
         raise Exception("Multiple family names found: [{}]".format(", ".join(results)))
     return results[0]
@@ -421,6 +555,26 @@ def main():
         "-dm", "--diff-mode", choices=("weak", "normal", "strict"), default="normal"
     )
     parser.add_argument("-re", "--filter-fonts", help="Filter fonts by regex")
+    parser.add_argument(
+        "-j", "--jobs", type=int,
+        help="Number of worker processes, defaults to the number of CPUs"
+    )
+    parser.add_argument(
+        "--stage-workers", type=int, default=4,
+        help="Number of QA stages, e.g Fontbakery and Diffenator, which "
+             "may run at the same time"
+    )
+    parser.add_argument(
+        "--glyphs-page-size", type=int,
+        help="Split the plot_glyphs images into pages of this many glyphs, "
+             "instead of drawing every glyph of a font on one image. Use "
+             "for large fonts, e.g CJK fonts"
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="Run every check, instead of reusing the results stored in "
+             "the output dir by earlier runs on the same fonts"
+    )
     parser.add_argument(
         "-o", "--out", default="out", help="Output path for check results"
     )
@@ -458,91 +612,180 @@ def main():
                         "--help to see all possible commands.")
 
 
-    # Retrieve fonts and store in out dir
-    mkdir(args.out)
+    # The QA runs as a graph of stages. The downloads feed the loading of
+    # the fonts, which feeds the checks. Checks which don't depend on each
+    # other run at the same time.
+    graph = StageGraph()
+    state = {}
+    # The stage logs record the INFO messages of gftools, e.g the stage
+    # timings and what the qa workers log, not just its warnings
+    logging.getLogger("gftools").setLevel(logging.INFO)
+    # While the stages run, their log handlers stop logging.lastResort from
+    # printing warnings and errors, so print them to the console here
+    console = logging.StreamHandler()
+    console.setLevel(logging.WARNING)
+    logging.getLogger().addHandler(console)
+    # The fonts and fonts_before share a downloader so connections to
+    # github are reused
+    downloader = Downloader()
+    # Everything but the stored results of earlier runs is removed
+    clean_out_dir(args.out)
+    cache = None if args.no_cache else ResultCache(args.out)
     fonts_dir = os.path.join(args.out, "fonts")
     mkdir(fonts_dir)
-    if args.fonts:
-        [shutil.copy(f, fonts_dir) for f in args.fonts]
-        fonts = args.fonts
-    elif args.pull_request:
-        fonts = download_files_in_github_pr(
-            args.pull_request,
-            fonts_dir,
-            ignore_static_dir=False,
-        )
-        if not fonts:
-            logger.info("No fonts found in pull request. Skipping")
-            return
-    elif args.github_dir:
-        fonts = download_files_in_github_dir(args.github_dir, fonts_dir)
-        if not fonts:
-            logger.info("No fonts found in github dir. Skipping")
-            return
-    elif args.googlefonts:
-        fonts = download_family_from_Google_Fonts(args.googlefonts, fonts_dir)
-
-    if args.filter_fonts:
-        re_filter = re.compile(args.filter_fonts)
-        fonts = [f for f in fonts if re_filter.search(f)]
-
-    ttfonts = [TTFont(f) for f in fonts if f.endswith((".ttf", ".otf"))
-               and "static" not in f]
-    family_name = family_name_from_fonts(ttfonts)
-    family_on_gf = Google_Fonts_has_family(family_name)
-
-    # Retrieve fonts_before and store in out dir
-    fonts_before = None
-    if any([args.fonts_before, args.pull_request_before, args.github_dir_before]) or \
-           (args.googlefonts_before and family_on_gf):
-        fonts_before_dir = os.path.join(args.out, "fonts_before")
-        mkdir(fonts_before_dir, overwrite=False)
-    if args.fonts_before:
-        [shutil.copy(f, fonts_before_dir) for f in args.fonts_before]
-        fonts_before = args.fonts_before
-    elif args.pull_request_before:
-        fonts_before = download_files_in_github_pr(
-            args.pull_request_before,
-            fonts_before_dir,
-            ignore_static_dir=False
-        )
-    elif args.github_dir_before:
-        fonts_before = download_files_in_github_dir(
-            args.github_dir_before, fonts_before_dir
-        )
-    elif args.googlefonts_before and family_on_gf:
-        fonts_before = download_family_from_Google_Fonts(
-            family_name, fonts_before_dir
+
+    def get_fonts():
+        if args.fonts:
+            [shutil.copy(f, fonts_dir) for f in args.fonts]
+            fonts = args.fonts
+        elif args.pull_request:
+            fonts = download_files_in_github_pr(
+                args.pull_request,
+                fonts_dir,
+                ignore_static_dir=False,
+                downloader=downloader,
+            )
+            if not fonts:
+                raise SkipStage("No fonts found in pull request")
+        elif args.github_dir:
+            fonts = download_files_in_github_dir(
+                args.github_dir, fonts_dir, downloader=downloader
+            )
+            if not fonts:
+                raise SkipStage("No fonts found in github dir")
+        elif args.googlefonts:
+            fonts = download_family_from_Google_Fonts(args.googlefonts, fonts_dir)
+
+        if args.filter_fonts:
+            re_filter = re.compile(args.filter_fonts)
+            fonts = [f for f in fonts if re_filter.search(f)]
+        state["fonts"] = fonts
+
+    def load_fonts():
+        fonts = state["fonts"]
+        # Only the few tables needed to find the family and its instances
+        # are read here, the checks open the fonts themselves
+        state["font_descriptors"] = describe_fonts(
+            [f for f in fonts if "static" not in f]
         )
+        state["family_name"] = family_name_from_fonts(state["font_descriptors"])
+        state["family_on_gf"] = Google_Fonts_has_family(state["family_name"])
+
+    def get_fonts_before():
+        # Retrieve fonts_before and store in out dir
+        family_on_gf = state.get("family_on_gf")
+        fonts_before = None
+        if any([args.fonts_before, args.pull_request_before, args.github_dir_before]) or \
+               (args.googlefonts_before and family_on_gf):
+            fonts_before_dir = os.path.join(args.out, "fonts_before")
+            mkdir(fonts_before_dir, overwrite=False)
+        if args.fonts_before:
+            [shutil.copy(f, fonts_before_dir) for f in args.fonts_before]
+            fonts_before = args.fonts_before
+        elif args.pull_request_before:
+            fonts_before = download_files_in_github_pr(
+                args.pull_request_before,
+                fonts_before_dir,
+                ignore_static_dir=False,
+                downloader=downloader,
+            )
+        elif args.github_dir_before:
+            fonts_before = download_files_in_github_dir(
+                args.github_dir_before, fonts_before_dir, downloader=downloader
+            )
+        elif args.googlefonts_before and family_on_gf:
+            fonts_before = download_family_from_Google_Fonts(
+                state["family_name"], fonts_before_dir
+            )
+        state["fonts_before"] = fonts_before
 
-    if fonts_before:
-        ttfonts_before = [TTFont(f) for f in fonts_before if f.endswith((".ttf", ".otf"))
-                          and "static" not in f]
-        qa = FontQA(ttfonts, ttfonts_before, args.out)
-    else:
-        qa = FontQA(ttfonts, out=args.out)
-
-    if args.auto_qa and family_on_gf:
-        qa.googlefonts_upgrade()
-    elif args.auto_qa and not family_on_gf:
-        qa.googlefonts_new()
-    if args.plot_glyphs:
-        qa.plot_glyphs()
-    if args.browser_previews:
-        qa.browser_previews()
-    if args.fontbakery:
-        qa.fontbakery()
-    if args.diffenator:
-        qa.diffenator()
-    if args.diffbrowsers:
-        qa.diffbrowsers()
+    def load_qa():
+        fonts_before = state["fonts_before"]
+        if fonts_before:
+            descriptors_before = describe_fonts(
+                [f for f in fonts_before if "static" not in f]
+            )
+            state["qa"] = FontQA(
+                state["font_descriptors"], descriptors_before, args.out, jobs=args.jobs, cache=cache,
+                glyphs_page_size=args.glyphs_page_size,
+            )
+        else:
+            state["qa"] = FontQA(
+                state["font_descriptors"], out=args.out, jobs=args.jobs, cache=cache,
+                glyphs_page_size=args.glyphs_page_size,
+            )
+
+    graph.add("fonts", get_fonts)
+    graph.add("load_fonts", load_fonts, deps=["fonts"])
+    # Google Fonts is only asked for the fonts before once the family name
+    # is known, other sources are downloaded alongside the fonts
+    graph.add(
+        "fonts_before",
+        get_fonts_before,
+        deps=["load_fonts"] if args.googlefonts_before else [],
+    )
+    graph.add("qa", load_qa, deps=["load_fonts", "fonts_before"])
+
+    def selected_checks():
+        checks = set()
+        if args.auto_qa and state["family_on_gf"]:
+            checks |= {"fontbakery", "diffenator", "diffbrowsers"}
+        elif args.auto_qa:
+            checks |= {"fontbakery", "plot_glyphs", "browser_previews"}
+        for check in AUTO_QA_CHECKS:
+            if getattr(args, check):
+                checks.add(check)
+        return checks
+
+    def check_stage(check):
+        def run():
+            if check not in selected_checks():
+                return "not selected"
+            getattr(state["qa"], check)()
+        return run
+
+    # Which checks auto qa runs depends on whether the family is on Google
+    # Fonts, so they are all added and skip themselves if not selected
+    checks = [c for c in AUTO_QA_CHECKS if args.auto_qa or getattr(args, c)]
+    for check in checks:
+        graph.add(check, check_stage(check), deps=["qa"])
 
     if args.out_url:
-        qa.post_to_github(args.out_url)
+        post_url = args.out_url
     elif args.out_github and args.pull_request:
-        qa.post_to_github(args.pull_request)
+        post_url = args.pull_request
     elif args.out_github and args.github_dir:
-        qa.post_to_github(args.github_dir)
+        post_url = args.github_dir
+    else:
+        post_url = None
+    if post_url:
+        # The post zips the whole out dir, so it waits for all the checks
+        graph.add(
+            "post_to_github",
+            lambda: state["qa"].post_to_github(post_url),
+            deps=checks,
+        )
+
+    results = graph.run(
+        workers=args.stage_workers, log_dir=os.path.join(args.out, "logs")
+    )
+    with open(os.path.join(args.out, "stages.json"), "w") as doc:
+        json.dump(
+            [{"name": r.name, "status": r.status, "seconds": r.seconds,
+              "error": r.error, "log": r.log} for r in results.values()],
+            doc,
+            indent=2,
+        )
+    for result in results.values():
+        logger.warning("Stage %s: %s in %ss", result.name, result.status, result.seconds)
+    failed = [r.name for r in results.values() if r.status == "failed"]
+    # Results of a failed stage may still be needed by the next run
+    if cache and not failed:
+        cache.prune()
+    if failed:
+        raise Exception("QA stages failed: {}. See {}".format(
+            ", ".join(failed), os.path.join(args.out, "logs"))
+        )
 
 
 if __name__ == "__main__":
@@ -19,6 +19,7 @@
 # Converts a .nam file to a list of ranges.
 import sys
 import tokenize
+from gftools.util.rangeset import RangeSet
 
 
 def get_codepoints(cps):
@@ -35,21 +36,9 @@ def main():
     sys.exit("Usage: rangify <nam file>")
 
   codepoints_data = list(tokenize.tokenize(open(sys.argv[1], 'rb').readline))
-  codepoints = get_codepoints(codepoints_data)
-  codepoints.sort()
+  codepoints = RangeSet(get_codepoints(codepoints_data))
 
-  seqs = []
-  seq = (None,)
-  for cp in codepoints:
-    if seq[0] is None:
-      seq = (cp,cp)
-    elif seq[1] == cp - 1:
-      seq = (seq[0], cp)
-    else:
-      seqs.append(seq)
-      seq = (None,)
-
-  for seq in seqs:
+  for seq in codepoints.ranges():
     print(seq)
 
 if __name__ == '__main__':
@@ -19,12 +19,10 @@ import os
 import sys
 from gftools.util.google_fonts import (CodepointsInFont,
                                        CodepointsInNamelist)
-from pkg_resources import resource_filename
+from gftools.util.resources import resource_path
 
 
-NAM_DIR = os.path.join(
-    resource_filename("gftools", "encodings"), "GF Glyph Sets"
-)
+NAM_DIR = resource_path("gftools", "encodings", "GF Glyph Sets")
 NAM_FILES = [os.path.join(NAM_DIR, f) for f in os.listdir(NAM_DIR)]
 
 
@@ -77,7 +77,7 @@ setup(
         'Flask',
         'absl-py',
         'glyphsLib',
-        'PyGithub',
+        'numpy',
         'pillow',
         'protobuf',
         'requests',
@@ -87,5 +87,7 @@ setup(
         'vttlib',
         'pygit2',
         'strictyaml',
+        # importlib.metadata is in the standard library from Python 3.8
+        'importlib_metadata; python_version < "3.8"',
     ]
     )